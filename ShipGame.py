@@ -7,7 +7,289 @@
 # and can display a player's 10 x 10 game board. In this version of Battleship, players place as many ships on their
 # boards as like as long as all ships have valid lengths (no less than 2, no more than 10), are placed completely on
 # the game board, and don't overlap any part of another ship. Turn taking is not tracked until a torpedo is fired;
-# the player designated "first" always takes the first turn.
+# the player designated "first" always takes the first turn. Larger or smaller boards, with a different maximum ship
+# length, can be played with ShipGame(rows=..., columns=..., max_ship_length=...), which uses SparseGameGrid.
+
+import struct
+
+
+def _create_placement_tables():
+    """A private function, run once when the module is imported, that builds every legal placement of a ship of
+    each length from 2 to 10 on an empty 10 x 10 board. Each placement is stored as a tuple of
+    (coordinate string, orientation, coordinates, cells, mask): the coordinates are the (row, column) tuples the ship
+    occupies on the game grid, the cells number the same squares from 0 to 99 as (row - 1) * 10 + (column - 1), and
+    the mask has the bit of every cell set.
+
+    Parameters: None
+
+    Returns: (dict mapping length to a tuple of placements,
+              dict mapping (coordinate string, orientation, length) and (row, column, orientation, length) to a
+              placement)
+    """
+    by_length = {}
+    lookup = {}
+    for length in range(2, 11):
+        placements = []
+        for row in range(1, 11):
+            for column in range(1, 11):
+                for orientation in "RC":
+                    if orientation == "R" and column + length - 1 <= 10:
+                        coords = tuple((row, num) for num in range(column, column + length))
+                    elif orientation == "C" and row + length - 1 <= 10:
+                        coords = tuple((num, column) for num in range(row, row + length))
+                    else:
+                        continue
+                    cells = tuple((coord[0] - 1) * 10 + coord[1] - 1 for coord in coords)
+                    coord = "ABCDEFGHIJ"[row - 1] + str(column)
+                    placement = (coord, orientation, coords, cells, sum(1 << cell for cell in cells))
+                    placements.append(placement)
+                    lookup[(coord, orientation, length)] = placement
+                    lookup[(row, column, orientation, length)] = placement
+        by_length[length] = tuple(placements)
+    return by_length, lookup
+
+
+_PLACEMENTS_BY_LENGTH, _PLACEMENT_LOOKUP = _create_placement_tables()
+
+
+def _create_square_table():
+    """A private function, run once when the module is imported, that maps every square of the 10 x 10 board to its
+    (row, column) tuple. Each square can be written three ways: as a coordinate string such as "A1", as a cell
+    number from 0 to 99 equal to (row - 1) * 10 + (column - 1), or as the (row, column) tuple itself.
+
+    Parameters: None
+
+    Returns: dict mapping str, int, and tuple coordinates to (row, column) tuples
+    """
+    squares = {}
+    for cell in range(0, 100):
+        square = (cell // 10 + 1, cell % 10 + 1)
+        squares["ABCDEFGHIJ"[square[0] - 1] + str(square[1])] = square
+        squares[cell] = square
+        squares[square] = square
+    return squares
+
+
+_SQUARES = _create_square_table()
+# Every coordinate string of the 10 x 10 board mapped to its cell number, and the reverse. Squares are numbered 0 to 99
+# as cells: square (row, column), with row and column starting at 1, is cell (row - 1) * 10 + (column - 1), so "A1"
+# is cell 0, "A10" is cell 9 and "J10" is cell 99. The other modules number squares the same way.
+COORD_CELLS = {coord: (square[0] - 1) * 10 + square[1] - 1 for coord, square in _SQUARES.items() if type(coord) is str}
+CELL_COORDS = tuple(sorted(COORD_CELLS, key=COORD_CELLS.get))
+
+
+def get_legal_placements(length):
+    """Returns every legal placement of a ship of the given length on an empty board, from the table built when the
+    module is imported. Each placement is a tuple of (coordinate string, orientation, coordinates, cells, mask) as
+    described in _create_placement_tables().
+
+    Parameters: length (int from 2 to 10)
+
+    Returns: tuple of placements
+    """
+    return _PLACEMENTS_BY_LENGTH[length]
+
+
+def get_legal_placement(row, column, orientation, length):
+    """Looks up a single placement in the placement table.
+
+    Parameters: row (int); column (int); orientation (str); length (int)
+
+    Returns: the placement as described in _create_placement_tables(), or None if the ship would not be completely
+    on the board
+    """
+    return _PLACEMENT_LOOKUP.get((row, column, orientation, length))
+
+
+def find_legal_placement(coord, orientation, length):
+    """Looks up a placement on a 10 x 10 board from a coordinate in any form ShipGame.place_ship() accepts: a string
+    such as "A1", a cell number from 0 to 99, or a (row, column) tuple. Coordinates are validated exactly as
+    GameGrid._parse_coord() validates them, so anything place_ship() rejects is rejected here.
+
+    Parameters: coord (str, int, or tuple); orientation (str); length (int)
+
+    Returns: the placement as described in _create_placement_tables(), or None if the coordinate, orientation, or
+    length is invalid or the ship would not be completely on the board
+    """
+    return _find_placement(_COORD_GRID, coord, orientation, length) or None
+
+
+def _fleet_fits(lengths):
+    """A private function that searches for any non-overlapping layout of the given ship lengths, used by
+    random_fleet() to fail fast on fleets that cannot fit on the board. Results are cached per fleet.
+
+    Parameters: lengths (tuple of ints)
+
+    Returns: True (bool) if a layout was found, False (bool) if the fleet cannot fit, or None if the search gave up
+    """
+    if lengths not in _FLEET_FITS_CACHE:
+        try:
+            _FLEET_FITS_CACHE[lengths] = _search_fleet(lengths, None) is not None
+        except _SearchBudgetExceeded:
+            _FLEET_FITS_CACHE[lengths] = None
+    return _FLEET_FITS_CACHE[lengths]
+
+
+class _SearchBudgetExceeded(Exception):
+    """Raised by _search_fleet() when it has tried too many placements."""
+
+
+def _search_fleet(lengths, rng, budget=200000):
+    """A private function that finds a non-overlapping layout of the given ship lengths by backtracking over the
+    squares of the board in order. The first undecided square is either left empty, if the fleet leaves enough
+    squares empty, or is the top or left end of one of the remaining ships. Options are tried in a random order if
+    rng is given.
+
+    Parameters: lengths (tuple of ints); rng (random.Random or None); budget (int), the number of options to try
+    before raising _SearchBudgetExceeded
+
+    Returns: list of placements, or None if the ships cannot be placed
+    """
+    counts = [0] * 11
+    for length in lengths:
+        counts[length] += 1
+    remaining = [budget]
+
+    def search(cell, occupied, ships_left, empty_left):
+        if ships_left == 0:
+            return []
+        while cell < 100 and occupied >> cell & 1:
+            cell += 1
+        if cell == 100:
+            return None
+        row, column = cell // 10 + 1, cell % 10 + 1
+        options = [_PLACEMENT_LOOKUP.get((row, column, orientation, length))
+                   for length in range(10, 1, -1) if counts[length] for orientation in "RC"]
+        options = [placement for placement in options if placement is not None and not placement[4] & occupied]
+        if empty_left:
+            options.append(None)
+        if rng is not None:
+            rng.shuffle(options)
+        for placement in options:
+            remaining[0] -= 1
+            if remaining[0] < 0:
+                raise _SearchBudgetExceeded()
+            if placement is None:
+                rest = search(cell + 1, occupied, ships_left, empty_left - 1)
+            else:
+                counts[len(placement[3])] -= 1
+                rest = search(cell + 1, occupied | placement[4], ships_left - 1, empty_left)
+                counts[len(placement[3])] += 1
+                if rest is not None:
+                    rest.append(placement)
+            if rest is not None:
+                return rest
+        return None
+
+    return search(0, 0, len(lengths), 100 - sum(lengths))
+
+
+_FLEET_FITS_CACHE = {}
+
+
+def random_fleet(lengths, rng, max_attempts=10000):
+    """Generates a uniformly random, non-overlapping layout of ships with the given lengths. Each ship is drawn
+    uniformly from the placement table and the whole layout is drawn again as soon as a ship overlaps another, so
+    every layout is equally likely. A fleet that cannot fit on the board raises ValueError without sampling. Fleets
+    so dense that max_attempts draws all fail are laid out by randomized backtracking instead, which is not uniform,
+    and raise ValueError if the backtracking search gives up.
+
+    Parameters: lengths (list of ints from 2 to 10); rng (random.Random); max_attempts (int)
+
+    Returns: list of (length, coordinate, orientation) tuples in the order of lengths, which can be passed to
+    ShipGame.place_ship() or ShipGame.load_fleet()
+    """
+    for length in lengths:
+        if not 2 <= length <= 10:
+            raise ValueError(f"invalid ship length: {length}")
+    if sum(lengths) > 100 or _fleet_fits(tuple(sorted(lengths, reverse=True))) is False:
+        raise ValueError("fleet cannot fit on the board")
+
+    tables = [(length, _PLACEMENTS_BY_LENGTH[length], len(_PLACEMENTS_BY_LENGTH[length])) for length in lengths]
+    random = rng.random
+    for _ in range(max_attempts):
+        occupied = 0
+        fleet = []
+        for length, placements, count in tables:
+            placement = placements[int(random() * count)]
+            if placement[4] & occupied:
+                break
+            occupied |= placement[4]
+            fleet.append((length, placement[0], placement[1]))
+        else:
+            return fleet
+
+    try:
+        placements = _search_fleet(lengths, rng)
+    except _SearchBudgetExceeded:
+        placements = None
+    if placements is None:
+        raise ValueError("no layout found for the fleet")
+    # Hand the placements back in the order of lengths
+    by_length = {}
+    for placement in placements:
+        by_length.setdefault(len(placement[3]), []).append(placement)
+    fleet = []
+    for length in lengths:
+        placement = by_length[length].pop()
+        fleet.append((length, placement[0], placement[1]))
+    return fleet
+
+
+def iter_snapshots(data):
+    """Restores, one at a time, the games stored back to back in a buffer of snapshots written by
+    ShipGame.to_bytes(). The size of each snapshot is read from its header, so no other index is needed.
+
+    Parameters: data (bytes-like object, such as the contents of a file or a memory-mapped file)
+
+    Returns: generator of ShipGame objects
+    """
+    offset = 0
+    while offset < len(data):
+        yield ShipGame.from_bytes(data, offset)
+        offset += _SNAPSHOT_HEADER.unpack_from(data, offset)[2]
+
+
+def _find_placement(grid, coord, orientation, length):
+    """A private function used by the add_ship_to_grid() methods to look up a ship placement in the placement
+    table. Canonical coordinate strings such as "A1" are looked up directly; any other coordinate is turned into a
+    square with the grid's _parse_coord() first.
+
+    Parameters: grid (GameGrid); coord (str, int, or tuple); orientation (str); length (int)
+
+    Returns: the placement, None if the placement is invalid, or False if the length is not in the table
+    """
+    if type(coord) is str:
+        placement = _PLACEMENT_LOOKUP.get((coord, orientation, length))
+        if placement is not None:
+            return placement
+
+    square = grid._parse_coord(coord)
+    if square is None:
+        return None
+    if not 2 <= length <= 10:
+        return False
+    return _PLACEMENT_LOOKUP.get((square[0], square[1], orientation, length))
+
+
+# Two bit codes for the contents of a square, used by get_packed_squares() and set_packed_squares()
+_SQUARE_CODES = {" ": 0, "S": 1, "X": 2, "*": 3}
+_SQUARE_SYMBOLS = (" ", "S", "X", "*")
+
+# Binary snapshots written by ShipGame.to_bytes() start with a header of format version, flags, and record size.
+# The flags hold the game state in bits 0-1, the current turn in bit 2 (set for "second"), the grid type in bit 3
+# (set for BitGameGrid), and the maximum ship length in bits 4-7 (0 for the default of 10 or more, which allow the
+# same ships on a 10 x 10 board). Each player then has 25 bytes of packed squares and a ship count, followed by 4
+# bytes per remaining ship: start cell (bits 0-6) and orientation (bit 7, set for "C"), length, and a 16 bit mask of
+# which of the ship's squares have been hit.
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<BBH")
+_SNAPSHOT_SQUARES = struct.Struct("<25sB")
+_SNAPSHOT_SHIP = struct.Struct("<BBH")
+_GAME_STATES = ("UNFINISHED", "FIRST_WON", "SECOND_WON")
+_EMPTY_ROW = (" ",) * 10
+_ROW_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_HEADER_LINES = {}      # Maps number of columns to the rendered column numbers, see GameGrid.render()
 
 
 class GameGrid:
@@ -18,6 +300,8 @@ class GameGrid:
     This class is responsible for validating coordinates used to place ships and fire torpedoes, it also displays the
     placement of a player’s ships and the coordinates of where the player’s opponent fired a torpedo.
     """
+    __slots__ = ("_grid", "_row_cache", "_board_cache")
+
     def __init__(self):
         """Creates a new, empty instance of the GameGrid object, stored in the private data member _grid.
 
@@ -26,6 +310,8 @@ class GameGrid:
         Returns: None
         """
         self._grid = self._create_new_grid()
+        self._row_cache = None      # Rendered rows for each view, indexed [hide_ships][row], once render() is called
+        self._board_cache = None    # Rendered board for each view, indexed [hide_ships]
 
     def _create_new_grid(self):
         """A private method used by the __init__() method to create a blank game grid.
@@ -37,11 +323,98 @@ class GameGrid:
         """
         grid = [[str(num) for num in range(0, 11)]]  # Create a list of numbers up to 10
         for letter in "ABCDEFGHIJ":
-            row = [" " for num in range(0, 10)]  # Create a list of "empty" spaces to represent a blank board
-            row.insert(0, letter)
-            grid.append(row)
+            grid.append([letter] + [" "] * 10)  # Row letter followed by "empty" spaces to represent a blank board
         return grid
 
+    def clear(self):
+        """Empties every square of the grid in place, so the grid can be reused for a new game.
+
+        Parameters: None
+
+        Returns: None
+        """
+        for row in range(1, 11):
+            self._grid[row][1:] = _EMPTY_ROW
+        self._invalidate_all_rows()
+
+    def clone(self):
+        """Returns an independent copy of the grid. The row of column numbers never changes, so it is shared.
+
+        Parameters: None
+
+        Returns: GameGrid object
+        """
+        copy = GameGrid.__new__(type(self))
+        grid = self._grid
+        copy._grid = [grid[0]] + [row[:] for row in grid[1:]]
+        copy._row_cache = None
+        copy._board_cache = None
+        return copy
+
+    def _invalidate_row(self, row):
+        """A private method that drops the rendered copies of a row whose squares have changed.
+
+        Parameters: row (int)
+
+        Returns: None
+        """
+        if self._row_cache is not None:
+            self._row_cache[0][row] = self._row_cache[1][row] = None
+            self._board_cache[0] = self._board_cache[1] = None
+
+    def _invalidate_all_rows(self):
+        """A private method that drops every rendered row.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._row_cache = None
+        self._board_cache = None
+
+    def _get_row(self, row):
+        """A private method used by render() to get one row of the grid: the row name followed by the symbol of
+        every square.
+
+        Parameters: row (int), starting at 1
+
+        Returns: list of str
+        """
+        return self._grid[row]
+
+    def render(self, hide_ships=False):
+        """Returns the game grid as text, one line per row, in the format printed by ShipGame.show_game_grid().
+        Rendered rows are cached, and placing a ship or recording a torpedo only re-renders the rows it changed, so
+        rendering the same board for many viewers is cheap. Changes made directly to the list returned by
+        get_grid() are not seen by the cache.
+
+        Parameters: hide_ships (bool), show unhit ship squares as water, as the opponent sees the board
+
+        Returns: rendered board (str)
+        """
+        view = 1 if hide_ships else 0
+        if self._row_cache is None:
+            num_rows, num_columns = self.get_size()
+            header = _HEADER_LINES.get(num_columns)
+            if header is None:
+                header = _HEADER_LINES[num_columns] = " ".join([str(num) for num in range(0, num_columns + 1)])
+            self._row_cache = [[header] + [None] * num_rows, [header] + [None] * num_rows]
+            self._board_cache = [None, None]
+        board = self._board_cache[view]
+        if board is not None:
+            return board
+
+        lines = self._row_cache[view]
+        get_row = self._get_row
+        for row in range(1, len(lines)):
+            if lines[row] is None:
+                squares = get_row(row)
+                if hide_ships and "S" in squares:
+                    squares = [squares[0]] + [" " if square == "S" else square for square in squares[1:]]
+                lines[row] = " ".join(squares)
+        board = self._board_cache[view] = "\n".join(lines)
+        return board
+
     def get_grid(self):
         """Returns the game grid.
 
@@ -51,6 +424,66 @@ class GameGrid:
         """
         return self._grid
 
+    def get_size(self):
+        """Returns the size of the grid.
+
+        Parameters: None
+
+        Returns: (number of rows, number of columns) tuple
+        """
+        return 10, 10
+
+    def get_square(self, square):
+        """Returns the symbol shown on one square: " " for water, "S" for an unhit ship square, "X" for a hit, and
+        "*" for a miss.
+
+        Parameters: square (valid (row, column) tuple)
+
+        Returns: symbol (str)
+        """
+        return self._grid[square[0]][square[1]]
+
+    def set_square(self, square, symbol):
+        """Sets the symbol shown on one square, without any validation. It is used by ShipGame.undo_last_torpedo()
+        to restore a square to the symbol it had before a torpedo.
+
+        Parameters: square (valid (row, column) tuple); symbol (str), as returned by get_square()
+
+        Returns: None
+        """
+        self._grid[square[0]][square[1]] = symbol
+        self._invalidate_row(square[0])
+
+    def get_packed_squares(self):
+        """Returns the contents of every square packed into one integer, two bits per square: square
+        (row, column) is bits 2 * ((row - 1) * 10 + column - 1) and up, holding 0 for water, 1 for an unhit ship
+        square (S), 2 for a hit (X), and 3 for a miss (*). It is used by ShipGame.to_bytes().
+
+        Parameters: None
+
+        Returns: packed squares (int)
+        """
+        packed = 0
+        for row in range(1, 11):
+            grid_row = self._grid[row]
+            for column in range(1, 11):
+                packed |= _SQUARE_CODES[grid_row[column]] << (2 * ((row - 1) * 10 + column - 1))
+        return packed
+
+    def set_packed_squares(self, packed):
+        """Replaces the contents of every square with squares packed by get_packed_squares(). It is used by
+        ShipGame.from_bytes().
+
+        Parameters: packed squares (int)
+
+        Returns: None
+        """
+        for row in range(1, 11):
+            grid_row = self._grid[row]
+            for column in range(1, 11):
+                grid_row[column] = _SQUARE_SYMBOLS[packed >> (2 * ((row - 1) * 10 + column - 1)) & 3]
+        self._invalidate_all_rows()
+
     def _validate_row(self, row):
         """A private method that takes the row as a letter, turns it into the correct integer, and determines whether
         the row is on the grid. It is used by the add_ship_to_grid() method.
@@ -73,12 +506,43 @@ class GameGrid:
 
         Returns: None if provided column is invalid, column as integer if provided column is valid
         """
-        valid_column = int(column)
+        try:
+            valid_column = int(column)
+        except ValueError:
+            return None
         if 1 <= valid_column <= 10:
             return valid_column
         else:
             return None
 
+    def _parse_coord(self, coord):
+        """A private method that turns a coordinate into the square it names. Coordinates are looked up in the
+        precomputed table of every square, so a coordinate string such as "A1", a cell number from 0 to 99, or a
+        (row, column) tuple is found without parsing, and anything that is not a square of the grid is rejected
+        in constant time. Strings that name a square in another way, such as "B03", are parsed with
+        _validate_row() and _validate_column(). The type is checked before the lookup, as in
+        SparseGameGrid._parse_coord(), so values that are equal to a key of the table without being a coordinate,
+        such as True, 1.0, or (1.0, 2), are rejected.
+
+        Parameters: coord (str, int, or tuple)
+
+        Returns: (row, column) tuple, or None if the coordinate is invalid
+        """
+        coord_type = type(coord)
+        if coord_type is tuple:
+            if len(coord) != 2 or type(coord[0]) is not int or type(coord[1]) is not int:
+                return None
+        elif coord_type is not str and coord_type is not int:
+            return None
+        square = _SQUARES.get(coord)
+        if square is not None or coord_type is not str or not coord:
+            return square
+        row = self._validate_row(coord[0])
+        column = self._validate_column(coord[1:])
+        if row is None or column is None:
+            return None
+        return row, column
+
     def _validate_ship_placement(self, coord_list):
         """A private method that determines whether a player’s ship placement is valid. Ship placement is invalid if
         the ship goes off the edge of the player's grid or overlaps a ship already on the player’s grid. This method
@@ -99,79 +563,750 @@ class GameGrid:
             elif self._grid[row][col] == "S":
                 return False
 
-        # If none of the coordinates of the new ship invalidate the placement, add ship to grid
-        for coord in coord_list:
-            row = coord[0]
-            col = coord[1]
-            self._grid[row][col] = "S"
-        return True
+        # If none of the coordinates of the new ship invalidate the placement, add ship to grid
+        for coord in coord_list:
+            row = coord[0]
+            col = coord[1]
+            self._grid[row][col] = "S"
+            self._invalidate_row(row)
+        return True
+
+    def add_ship_to_grid(self, coord, orientation, length):
+        """Attempts to place the player’s ship on the game grid. It uses the private methods _validate_row(),
+        _validate_column(), and _validate_ship_placement() to ensure that a ship placement is legal per the rules of
+        this Battleship game---that is, a ship cannot be placed so that any part of the ship will be off the player’s
+        grid and a ship cannot overlap another ship. If the ship placement is valid, the method will update _grid data
+        member, marking the positions occupied by the ship with an S in each spot.
+
+        Parameters: A single coordinate as a string, representing a Ship’s starting coordinate; orientation as a string,
+        indicating whether the Ship will be placed horizontally or vertically on the grid; length as an int.
+
+        Returns: If the ship placement was valid and the ship was placed on the grid:
+                    returns list of valid ship coordinates
+                 If the ship placement was invalid:
+                    returns empty list
+        """
+        placement = _find_placement(self, coord, orientation, length)
+        if placement is None:
+            return []   # Empty lists are falsy
+        elif placement:
+            # Every placement in the table is on the grid, so only overlap remains to be checked
+            if self._validate_ship_placement(placement[2]):
+                return list(placement[2])
+            return []
+
+        # Lengths outside the placement table are laid out square by square
+        row, column = self._parse_coord(coord)
+        # Coordinates stored as tuples in format (row, column)
+        coords_list = []
+        # Create a list of all coordinates occupied by the ship
+        if orientation == 'C':
+            for num in range(row, row + length):
+                coord_tuple = (num, column)
+                coords_list.append(coord_tuple)
+        elif orientation == 'R':
+            for num in range(column, column + length):
+                coord_tuple = (row, num)
+                coords_list.append(coord_tuple)
+        # Ensure all coordinates occupied by ship are valid/not already occupied
+        is_ship_placed = self._validate_ship_placement(coords_list)
+        if is_ship_placed:
+            return coords_list
+        else:
+            return []
+
+    def _overlaps_ship(self, placement):
+        """A private method used by add_fleet_to_grid() to determine whether a placement from the placement table
+        covers a square holding a ship that has not been hit there.
+
+        Parameters: placement (tuple from the placement table)
+
+        Returns: bool
+        """
+        grid = self._grid
+        for row, column in placement[2]:
+            if grid[row][column] == "S":
+                return True
+        return False
+
+    def add_fleet_to_grid(self, fleet):
+        """Places a whole fleet on the grid, or none of it. Every ship must be completely on the grid and must not
+        overlap another ship of the fleet or a ship already on the grid, following the rules of add_ship_to_grid().
+        Nothing is placed until every ship has been checked.
+
+        Parameters: fleet (list of (length, coordinate, orientation) tuples)
+
+        Returns: list of the coordinate lists of the ships, in fleet order, or an empty list if any ship is invalid
+        """
+        placements = []
+        taken = 0       # Mask of the squares of the fleet's ships checked so far
+        for length, coord, orientation in fleet:
+            placement = _find_placement(self, coord, orientation, length)
+            if not placement or placement[4] & taken or self._overlaps_ship(placement):
+                return []
+            taken |= placement[4]
+            placements.append(placement)
+        for placement in placements:
+            self.add_placement(placement)
+        return [list(placement[2]) for placement in placements]
+
+    def add_placement(self, placement):
+        """Marks the squares of a placement from the placement table with an S without validating them. It is used
+        to load layouts from random_fleet(), which never overlap.
+
+        Parameters: placement (tuple from the placement table)
+
+        Returns: None
+        """
+        for row, column in placement[2]:
+            self._grid[row][column] = "S"
+            self._invalidate_row(row)
+
+    def add_torpedo_hit(self, torpedo_coord):
+        """Handles validating and adding a torpedo hit to a Player’s grid. It uses the private methods _validate_row()
+        and _validate_column() to ensure that the given coordinates are on the grid and then adds the torpedo hit to
+        the grid. A torpedo that missed and hit the water is represented by an asterisk (*) and a hit on a Ship is
+        represented by an X. Note that this method only validates the torpedo coordinates and updates the graphic
+        representation of the Player’s grid, it does not actually determine whether a Ship was hit/sunk.
+
+        Parameters: A single coordinate to represent where the torpedo hit: a string such as "A1", a cell number from
+        0 to 99, or a (row, column) tuple.
+
+        Returns: If the torpedo coordinate is valid, returns valid row, column (tuple).
+                 If the torpedo coordinate is invalid, returns None.
+
+        Note that the return value is not dependent on whether a ship was hit, only on whether the torpedo coordinates
+        are valid.
+        """
+        square = self._parse_coord(torpedo_coord)
+        if square is None:
+            return None
+        self._mark_torpedo(square)
+        return square
+
+    def _mark_torpedo(self, square):
+        """A private method that adds a torpedo to a square that has already been validated: a ship square becomes
+        an X and a water square becomes an asterisk (*). Used by add_torpedo_hit() and by ShipGame, which validates
+        the coordinates itself.
+
+        Parameters: square ((row, column) tuple), as returned by _parse_coord()
+
+        Returns: None
+        """
+        # Update the player's grid to show the torpedo hit
+        row, col = square
+        grid_square = self._grid[row][col]
+        if grid_square == "S":
+            self._grid[row][col] = "X"
+            self._invalidate_row(row)
+        elif grid_square == " ":
+            self._grid[row][col] = "*"
+            self._invalidate_row(row)
+
+
+# An empty grid whose _parse_coord() validates coordinates for find_legal_placement()
+_COORD_GRID = GameGrid()
+
+
+class BitGameGrid(GameGrid):
+    """An alternative to GameGrid that stores a player's 10 x 10 game board as three integer bitmasks instead of a
+    2D list of strings: one for the squares occupied by ships, one for torpedo hits, and one for misses. Square
+    (row, column) is bit (row - 1) * 10 + (column - 1) of each mask.
+
+    Checking a ship placement for overlap is a single mask AND and recording a torpedo is a single bit set. The
+    2D list returned by get_grid() is built on demand, so it is a snapshot of the board rather than the live board.
+    Coordinates are validated and returned exactly as they are by GameGrid.
+    """
+    __slots__ = ("_ships", "_hits", "_misses")
+
+    def __init__(self):
+        """Creates a new, empty instance of the BitGameGrid object, stored in the private data members _ships,
+        _hits, and _misses.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._ships = 0
+        self._hits = 0
+        self._misses = 0
+        self._row_cache = None
+        self._board_cache = None
+
+    def clear(self):
+        """Empties every square of the grid, so the grid can be reused for a new game.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._ships = self._hits = self._misses = 0
+        self._invalidate_all_rows()
+
+    def clone(self):
+        """Returns an independent copy of the grid.
+
+        Parameters: None
+
+        Returns: BitGameGrid object
+        """
+        copy = BitGameGrid.__new__(type(self))
+        copy._ships = self._ships
+        copy._hits = self._hits
+        copy._misses = self._misses
+        copy._row_cache = None
+        copy._board_cache = None
+        return copy
+
+    def get_square(self, square):
+        """Returns the symbol shown on one square, as GameGrid.get_square() does.
+
+        Parameters: square (valid (row, column) tuple)
+
+        Returns: symbol (str)
+        """
+        bit = 1 << ((square[0] - 1) * 10 + square[1] - 1)
+        if self._ships & bit:
+            return "X" if self._hits & bit else "S"
+        return "*" if self._misses & bit else " "
+
+    def set_square(self, square, symbol):
+        """Sets the symbol shown on one square, as GameGrid.set_square() does, by setting or clearing its bit in
+        each mask.
+
+        Parameters: square (valid (row, column) tuple); symbol (str), as returned by get_square()
+
+        Returns: None
+        """
+        bit = 1 << ((square[0] - 1) * 10 + square[1] - 1)
+        self._ships = self._ships | bit if symbol in ("S", "X") else self._ships & ~bit
+        self._hits = self._hits | bit if symbol == "X" else self._hits & ~bit
+        self._misses = self._misses | bit if symbol == "*" else self._misses & ~bit
+        self._invalidate_row(square[0])
+
+    def _get_row(self, row):
+        """A private method used by render() to get one row of the grid as in GameGrid._get_row().
+
+        Parameters: row (int), starting at 1
+
+        Returns: list of str
+        """
+        squares = ["ABCDEFGHIJ"[row - 1]]
+        ships, hits, misses = self._ships, self._hits, self._misses
+        for bit in range((row - 1) * 10, row * 10):
+            square = 1 << bit
+            if ships & square:
+                squares.append("X" if hits & square else "S")
+            else:
+                squares.append("*" if misses & square else " ")
+        return squares
+
+    def get_grid(self):
+        """Builds and returns the game grid in the same 2D list format used by GameGrid.
+
+        Parameters: None
+
+        Returns: 2D list representing a player’s 10 x 10 game grid
+        """
+        grid = self._create_new_grid()
+        ships, hits, misses = self._ships, self._hits, self._misses
+        for bit in range(0, 100):
+            square = 1 << bit
+            if ships & square:
+                grid[bit // 10 + 1][bit % 10 + 1] = "X" if hits & square else "S"
+            elif misses & square:
+                grid[bit // 10 + 1][bit % 10 + 1] = "*"
+        return grid
+
+    def get_packed_squares(self):
+        """Returns the contents of every square packed into one integer, in the format described in
+        GameGrid.get_packed_squares().
+
+        Parameters: None
+
+        Returns: packed squares (int)
+        """
+        packed = 0
+        ships, hits, misses = self._ships, self._hits, self._misses
+        for bit in range(0, 100):
+            square = 1 << bit
+            if ships & square:
+                packed |= (2 if hits & square else 1) << (2 * bit)
+            elif misses & square:
+                packed |= 3 << (2 * bit)
+        return packed
+
+    def set_packed_squares(self, packed):
+        """Replaces the contents of every square with squares packed by get_packed_squares().
+
+        Parameters: packed squares (int)
+
+        Returns: None
+        """
+        self._ships = self._hits = self._misses = 0
+        for bit in range(0, 100):
+            code = packed >> (2 * bit) & 3
+            if code == 1:
+                self._ships |= 1 << bit
+            elif code == 2:
+                self._ships |= 1 << bit
+                self._hits |= 1 << bit
+            elif code == 3:
+                self._misses |= 1 << bit
+        self._invalidate_all_rows()
+
+    def add_ship_to_grid(self, coord, orientation, length):
+        """Attempts to place the player’s ship on the game grid, following the same rules as
+        GameGrid.add_ship_to_grid(). The ship's mask is taken from the placement table and placed only if it does
+        not overlap an unhit ship square.
+
+        Parameters: A single coordinate as a string, representing a Ship’s starting coordinate; orientation as a string,
+        indicating whether the Ship will be placed horizontally or vertically on the grid; length as an int.
+
+        Returns: If the ship placement was valid and the ship was placed on the grid:
+                    returns list of valid ship coordinates
+                 If the ship placement was invalid:
+                    returns empty list
+        """
+        placement = _find_placement(self, coord, orientation, length)
+        if placement is None:
+            return []
+        elif placement:
+            ship_mask = placement[4]
+            coords_list = placement[2]
+        elif length == 1 and orientation in ("R", "C"):
+            # Lengths outside the placement table only fit on the grid as a single square
+            row, column = self._parse_coord(coord)
+            ship_mask = 1 << ((row - 1) * 10 + (column - 1))
+            coords_list = ((row, column),)
+        else:
+            return []
+
+        # Ships must not overlap any unhit square of another ship
+        if ship_mask & self._ships & ~self._hits:
+            return []
+        self._ships |= ship_mask
+        self._hits &= ~ship_mask
+        self._misses &= ~ship_mask
+        for row in {row for row, _ in coords_list}:
+            self._invalidate_row(row)
+        return list(coords_list)
+
+    def _overlaps_ship(self, placement):
+        """A private method used by add_fleet_to_grid(), see GameGrid._overlaps_ship().
+
+        Parameters: placement (tuple from the placement table)
+
+        Returns: bool
+        """
+        return bool(placement[4] & self._ships & ~self._hits)
+
+    def add_placement(self, placement):
+        """Adds the mask of a placement from the placement table to the ship squares without validating it.
+
+        Parameters: placement (tuple from the placement table)
+
+        Returns: None
+        """
+        self._ships |= placement[4]
+        self._hits &= ~placement[4]
+        self._misses &= ~placement[4]
+        for row in {row for row, _ in placement[2]}:
+            self._invalidate_row(row)
+
+    def add_torpedo_hit(self, torpedo_coord):
+        """Handles validating and adding a torpedo hit to a Player’s grid, following the same rules as
+        GameGrid.add_torpedo_hit(). A hit on a ship square sets its bit in _hits, any other square is recorded
+        in _misses.
+
+        Parameters: A single coordinate as a string to represent where the torpedo hit.
+
+        Returns: If the torpedo coordinate is valid, returns valid row, column (tuple).
+                 If the torpedo coordinate is invalid, returns None.
+        """
+        coords = self._parse_coord(torpedo_coord)
+        if coords is None:
+            return None
+        self._mark_torpedo(coords)
+        return coords
+
+    def _mark_torpedo(self, coords):
+        """A private method that adds a torpedo to a square that has already been validated, as
+        GameGrid._mark_torpedo() does.
+
+        Parameters: coords ((row, column) tuple), as returned by _parse_coord()
+
+        Returns: None
+        """
+        row, col = coords
+        square = 1 << ((row - 1) * 10 + (col - 1))
+        if self._ships & square:
+            if not self._hits & square:
+                self._hits |= square
+                self._invalidate_row(row)
+        elif not self._misses & square:
+            self._misses |= square
+            self._invalidate_row(row)
+
+
+def row_letters(row):
+    """Returns the letters naming a row of a game grid. Rows are named like spreadsheet columns: A to Z for rows 1
+    to 26, then AA, AB, and so on, so the first ten rows keep the names used by the 10 x 10 board.
+
+    Parameters: row (int), starting at 1
+
+    Returns: row name (str)
+    """
+    letters = ""
+    while row > 0:
+        row, remainder = divmod(row - 1, 26)
+        letters = _ROW_LETTERS[remainder] + letters
+    return letters
+
+
+def coord_to_str(row, column):
+    """Turns a (row, column) pair on the 10 x 10 game grid, both starting at 1, into a coordinate string such as
+    "A1". Used by ShipGame_tournament and ShipGame_verify.
+
+    Parameters: row (int); column (int)
+
+    Returns: coordinate (str)
+    """
+    return "ABCDEFGHIJ"[row - 1] + str(column)
+
+
+def game_seed(seed, game_number):
+    """Returns the seed for one numbered game of a seeded run, such as a tournament or a verification run, so that
+    the game can be replayed on its own with random.Random(game_seed(seed, game_number)).
+
+    Parameters: seed (int), the seed of the run; game_number (int)
+
+    Returns: seed (str)
+    """
+    return f"{seed}:{game_number}"
+
+
+class SparseGameGrid(GameGrid):
+    """An alternative to GameGrid for boards of any size. Only the squares that hold a ship or have been fired at
+    are stored, as sets of (row, column) tuples, so the memory used grows with the number of ship squares and
+    torpedoes rather than with the size of the board, and placing a ship or recording a torpedo takes the same time
+    on a 1000 x 1000 board as on a 10 x 10 one.
+
+    Rows are named with one or more letters as described in row_letters() and columns are numbered from 1, so a
+    coordinate is the row name followed by the column number, such as "A1" or "ALL1000". The 2D list returned by
+    get_grid() is built on demand and holds every square, so it is only practical for small boards.
+    """
+    __slots__ = ("_rows", "_columns", "_ships", "_hits", "_misses")
+
+    def __init__(self, rows=10, columns=10):
+        """Creates a new, empty instance of the SparseGameGrid object with the given size.
+
+        Parameters: rows (int); columns (int)
+
+        Returns: None
+        """
+        if rows < 1 or columns < 1:
+            raise ValueError(f"invalid board size: {rows} x {columns}")
+        self._rows = rows
+        self._columns = columns
+        self._ships = set()         # Squares occupied by ships, hit or not
+        self._hits = set()          # Ship squares hit by a torpedo
+        self._misses = set()        # Water squares hit by a torpedo
+        self._row_cache = None
+        self._board_cache = None
+
+    def get_size(self):
+        """Returns the size of the grid.
+
+        Parameters: None
+
+        Returns: (number of rows, number of columns) tuple
+        """
+        return self._rows, self._columns
+
+    def clear(self):
+        """Empties every square of the grid, so the grid can be reused for a new game.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._ships.clear()
+        self._hits.clear()
+        self._misses.clear()
+        self._invalidate_all_rows()
+
+    def clone(self):
+        """Returns an independent copy of the grid.
+
+        Parameters: None
+
+        Returns: SparseGameGrid object
+        """
+        copy = SparseGameGrid.__new__(type(self))
+        copy._rows = self._rows
+        copy._columns = self._columns
+        copy._ships = set(self._ships)
+        copy._hits = set(self._hits)
+        copy._misses = set(self._misses)
+        copy._row_cache = None
+        copy._board_cache = None
+        return copy
+
+    def get_square(self, square):
+        """Returns the symbol shown on one square, as GameGrid.get_square() does.
+
+        Parameters: square (valid (row, column) tuple)
+
+        Returns: symbol (str)
+        """
+        if square in self._ships:
+            return "X" if square in self._hits else "S"
+        return "*" if square in self._misses else " "
+
+    def set_square(self, square, symbol):
+        """Sets the symbol shown on one square, as GameGrid.set_square() does, by adding it to or removing it from
+        each set of squares.
+
+        Parameters: square (valid (row, column) tuple); symbol (str), as returned by get_square()
+
+        Returns: None
+        """
+        for squares, present in ((self._ships, symbol in ("S", "X")), (self._hits, symbol == "X"),
+                                 (self._misses, symbol == "*")):
+            if present:
+                squares.add(square)
+            else:
+                squares.discard(square)
+        self._invalidate_row(square[0])
+
+    def _get_row(self, row):
+        """A private method used by render() to get one row of the grid as in GameGrid._get_row().
+
+        Parameters: row (int), starting at 1
+
+        Returns: list of str
+        """
+        squares = [row_letters(row)]
+        ships, hits, misses = self._ships, self._hits, self._misses
+        for column in range(1, self._columns + 1):
+            square = (row, column)
+            if square in ships:
+                squares.append("X" if square in hits else "S")
+            else:
+                squares.append("*" if square in misses else " ")
+        return squares
+
+    def get_grid(self):
+        """Builds and returns the game grid in the same 2D list format used by GameGrid, with one row per board row
+        and one column per board column.
+
+        Parameters: None
+
+        Returns: 2D list representing the player’s game grid
+        """
+        grid = [[str(num) for num in range(0, self._columns + 1)]]
+        for row in range(1, self._rows + 1):
+            grid.append([row_letters(row)] + [" "] * self._columns)
+        for row, column in self._ships:
+            grid[row][column] = "X" if (row, column) in self._hits else "S"
+        for row, column in self._misses:
+            grid[row][column] = "*"
+        return grid
+
+    def _split_coord(self, coord):
+        """A private method that splits a coordinate into its row name, the leading letters, and the rest, which
+        _validate_column() reads as the column number. The rest is converted with int() as GameGrid does, so
+        coordinates such as "A1 " or "A+1" name the same square on both grids.
+
+        Parameters: coord (str)
+
+        Returns: (row (str), column (str)) tuple
+        """
+        column = coord.lstrip(_ROW_LETTERS)
+        return coord[:len(coord) - len(column)], column
+
+    def _validate_row(self, row):
+        """A private method that turns a row name into the row number and determines whether the row is on the grid.
+
+        Parameters: row (str)
+
+        Returns: None if provided row is invalid, row as integer if provided row is valid
+        """
+        if not row or row.strip(_ROW_LETTERS):
+            return None
+        valid_row = 0
+        for letter in row:
+            valid_row = valid_row * 26 + _ROW_LETTERS.index(letter) + 1
+            if valid_row > self._rows:
+                return None
+        return valid_row
+
+    def _validate_column(self, column):
+        """A private method that casts the column to an integer and determines whether the column is on the grid.
+
+        Parameters: Column (str)
+
+        Returns: None if provided column is invalid, column as integer if provided column is valid
+        """
+        try:
+            valid_column = int(column)
+        except ValueError:
+            return None
+        if 1 <= valid_column <= self._columns:
+            return valid_column
+        return None
+
+    def _parse_coord(self, coord):
+        """A private method that turns a coordinate into the square it names, as GameGrid._parse_coord() does. The
+        board is too large for a table of every square, so strings are parsed, cell numbers (from 0 to
+        rows * columns - 1, numbered row by row) are divided by the number of columns, and tuples are checked
+        against the size of the board.
+
+        Parameters: coord (str, int, or tuple)
+
+        Returns: (row, column) tuple, or None if the coordinate is invalid
+        """
+        coord_type = type(coord)
+        if coord_type is str:
+            row_name, column_name = self._split_coord(coord)
+            row = self._validate_row(row_name)
+            column = self._validate_column(column_name)
+            if row is None or column is None:
+                return None
+            return row, column
+        elif coord_type is int:
+            if 0 <= coord < self._rows * self._columns:
+                row, column = divmod(coord, self._columns)
+                return row + 1, column + 1
+        elif coord_type is tuple and len(coord) == 2 and type(coord[0]) is int and type(coord[1]) is int:
+            if 1 <= coord[0] <= self._rows and 1 <= coord[1] <= self._columns:
+                return coord
+        return None
+
+    def add_ship_to_grid(self, coord, orientation, length):
+        """Attempts to place the player’s ship on the game grid, following the same rules and returning the same
+        values as GameGrid.add_ship_to_grid().
+
+        Parameters: A single coordinate as a string, representing a Ship’s starting coordinate; orientation as a string,
+        indicating whether the Ship will be placed horizontally or vertically on the grid; length as an int.
+
+        Returns: list of valid ship coordinates if the ship was placed, or an empty list if the placement was invalid
+        """
+        coords_list = self._find_ship_squares(coord, orientation, length)
+        # Ships must not overlap any unhit square of another ship
+        if coords_list is None or self._has_unhit_ship(coords_list):
+            return []
+        self._mark_ship(coords_list)
+        return coords_list
+
+    def _find_ship_squares(self, coord, orientation, length):
+        """A private method that finds the squares a ship would occupy, without placing it.
+
+        Parameters: coord (str); orientation (str); length (int)
+
+        Returns: list of (row, column) tuples, or None if the ship would not be completely on the grid
+        """
+        square = self._parse_coord(coord)
+        if square is None or length < 1:
+            return None
+        row, column = square
+        if orientation == "C" and row + length - 1 <= self._rows:
+            return [(num, column) for num in range(row, row + length)]
+        elif orientation == "R" and column + length - 1 <= self._columns:
+            return [(row, num) for num in range(column, column + length)]
+        return None
+
+    def _has_unhit_ship(self, coords):
+        """A private method that determines whether any of the squares holds a ship that has not been hit there.
+
+        Parameters: coords (list of (row, column) tuples)
+
+        Returns: bool
+        """
+        ships, hits = self._ships, self._hits
+        for square in coords:
+            if square in ships and square not in hits:
+                return True
+        return False
+
+    def _mark_ship(self, coords):
+        """A private method that marks the squares of a validated ship.
+
+        Parameters: coords (list of (row, column) tuples)
 
-    def add_ship_to_grid(self, coord, orientation, length):
-        """Attempts to place the player’s ship on the game grid. It uses the private methods _validate_row(),
-        _validate_column(), and _validate_ship_placement() to ensure that a ship placement is legal per the rules of
-        this Battleship game---that is, a ship cannot be placed so that any part of the ship will be off the player’s
-        grid and a ship cannot overlap another ship. If the ship placement is valid, the method will update _grid data
-        member, marking the positions occupied by the ship with an S in each spot.
+        Returns: None
+        """
+        self._ships.update(coords)
+        self._hits.difference_update(coords)
+        self._misses.difference_update(coords)
+        for row in range(coords[0][0], coords[-1][0] + 1):
+            self._invalidate_row(row)
 
-        Parameters: A single coordinate as a string, representing a Ship’s starting coordinate; orientation as a string,
-        indicating whether the Ship will be placed horizontally or vertically on the grid; length as an int.
+    def add_fleet_to_grid(self, fleet):
+        """Places a whole fleet on the grid, or none of it, as GameGrid.add_fleet_to_grid() does.
 
-        Returns: If the ship placement was valid and the ship was placed on the grid:
-                    returns list of valid ship coordinates
-                 If the ship placement was invalid:
-                    returns empty list
+        Parameters: fleet (list of (length, coordinate, orientation) tuples)
+
+        Returns: list of the coordinate lists of the ships, in fleet order, or an empty list if any ship is invalid
         """
-        row = self._validate_row(coord[0])
-        column = self._validate_column(coord[1:])
-        if row is None or column is None:
-            return []   # Empty lists are falsy
+        fleet_coords = []
+        taken = set()
+        for length, coord, orientation in fleet:
+            coords = self._find_ship_squares(coord, orientation, length)
+            if coords is None or self._has_unhit_ship(coords) or not taken.isdisjoint(coords):
+                return []
+            taken.update(coords)
+            fleet_coords.append(coords)
+        for coords in fleet_coords:
+            self._mark_ship(coords)
+        return fleet_coords
+
+    def add_placement(self, placement):
+        """Marks the squares of a placement from the placement table as ship squares without validating them. As on
+        a GameGrid, torpedoes already fired at those squares are cleared.
+
+        Parameters: placement (tuple from the placement table)
 
-        # Coordinates stored as tuples in format (row, column)
-        coords_list = []
-        # Create a list of all coordinates occupied by the ship
-        if orientation == 'C':
-            for num in range(row, row + length):
-                coord_tuple = (num, column)
-                coords_list.append(coord_tuple)
-        elif orientation == 'R':
-            for num in range(column, column + length):
-                coord_tuple = (row, num)
-                coords_list.append(coord_tuple)
-        # Ensure all coordinates occupied by ship are valid/not already occupied
-        is_ship_placed = self._validate_ship_placement(coords_list)
-        if is_ship_placed:
-            return coords_list
-        else:
-            return []
+        Returns: None
+        """
+        self._ships.update(placement[2])
+        self._hits.difference_update(placement[2])
+        self._misses.difference_update(placement[2])
+        for row, _ in placement[2]:
+            self._invalidate_row(row)
 
     def add_torpedo_hit(self, torpedo_coord):
-        """Handles validating and adding a torpedo hit to a Player’s grid. It uses the private methods _validate_row()
-        and _validate_column() to ensure that the given coordinates are on the grid and then adds the torpedo hit to
-        the grid. A torpedo that missed and hit the water is represented by an asterisk (*) and a hit on a Ship is
-        represented by an X. Note that this method only validates the torpedo coordinates and updates the graphic
-        representation of the Player’s grid, it does not actually determine whether a Ship was hit/sunk.
+        """Validates a torpedo coordinate and records the torpedo as a hit if it landed on a ship square, or as a
+        miss otherwise. Returns the same values as GameGrid.add_torpedo_hit().
 
         Parameters: A single coordinate as a string to represent where the torpedo hit.
 
         Returns: If the torpedo coordinate is valid, returns valid row, column (tuple).
                  If the torpedo coordinate is invalid, returns None.
-
-        Note that the return value is not dependent on whether a ship was hit, only on whether the torpedo coordinates
-        are valid.
         """
-        row = self._validate_row(torpedo_coord[0])
-        col = self._validate_column(torpedo_coord[1:])
-        if row is None or col is None:
+        square = self._parse_coord(torpedo_coord)
+        if square is None:
             return None
+        self._mark_torpedo(square)
+        return square
 
-        # Update the player's grid to show the torpedo hit
-        grid_square = self._grid[row][col]
-        if grid_square == "S":
-            self._grid[row][col] = "X"
-        elif grid_square == " ":
-            self._grid[row][col] = "*"
+    def _mark_torpedo(self, square):
+        """A private method that adds a torpedo to a square that has already been validated, as
+        GameGrid._mark_torpedo() does.
 
-        return row, col
+        Parameters: square ((row, column) tuple), as returned by _parse_coord()
+
+        Returns: None
+        """
+        row = square[0]
+        if square in self._ships:
+            if square not in self._hits:
+                self._hits.add(square)
+                self._invalidate_row(row)
+        elif square not in self._misses:
+            self._misses.add(square)
+            self._invalidate_row(row)
 
 
 class Ship:
@@ -182,6 +1317,8 @@ class Ship:
     This class is used by the ShipGame class and the Player class when placing Ships on the game board, firing
     torpedoes, and determining whether a win has occurred.
     """
+    __slots__ = ("_length", "_is_sunk", "_hits", "_coords_on_grid")
+
     def __init__(self, length):
         """Creates a new Ship object and initializes the private data members _length, _is_sunk, _hits,
         and _coords_on_grid.
@@ -243,6 +1380,32 @@ class Ship:
         if len(self._hits) == self._length:
             self._is_sunk = True
 
+    def remove_last_hit(self):
+        """Takes back the most recent torpedo hit on the Ship, which is then no longer sunk. It is used by
+        Player.undo_torpedo().
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._hits.pop()
+        self._is_sunk = False
+
+    def clone(self):
+        """Returns a copy of the Ship with its own list of hits. A Ship's coordinates never change once it is
+        placed, so the copy shares them.
+
+        Parameters: None
+
+        Returns: Ship object
+        """
+        copy = Ship.__new__(Ship)
+        copy._length = self._length
+        copy._is_sunk = self._is_sunk
+        copy._hits = self._hits[:]
+        copy._coords_on_grid = self._coords_on_grid
+        return copy
+
     def set_coords_on_grid(self, coord_list):
         """This is the setter method for the data member _coords_on_grid. Once a ship is placed on a player’s GameGrid,
         the coordinates occupied by the ship are added to _coords_on_grid.
@@ -260,13 +1423,50 @@ class Player:
     class uses the GameGrid class for the Player’s game board, the Ship class when tracking how many Ships the Player
     has. It is used by the ShipGame class.
     """
-    def __init__(self, player):
+    __slots__ = ("_player_grid", "_player_number", "_ships", "_ship_index", "_intact_cells")
+
+    def __init__(self, player, grid_type=GameGrid, rows=10, columns=10):
         """Creates a new Player object and initializes the private data members _player_grid, _player_number,
-        and _ships.
+        _ships, _ship_index, and _intact_cells.
+
+        Parameters: player (str); grid_type (the class used for the player's game board: GameGrid, BitGameGrid, or
+        SparseGameGrid); rows (int); columns (int), the board size, which must be 10 x 10 unless grid_type is
+        SparseGameGrid
         """
-        self._player_grid = GameGrid()
+        self._player_grid = grid_type() if (rows, columns) == (10, 10) else grid_type(rows, columns)
         self._player_number = player    # Number is the string "first" or "second"
         self._ships = []
+        self._ship_index = {}           # Maps each unhit (row, column) coordinate to the Ship occupying it
+        self._intact_cells = 0          # Number of ship squares that have not been hit yet
+
+    def reset(self):
+        """Removes all of the player's ships and empties the player's GameGrid, so the Player can be reused for a
+        new game.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._player_grid.clear()
+        self._ships.clear()
+        self._ship_index.clear()
+        self._intact_cells = 0
+
+    def clone(self):
+        """Returns an independent copy of the player, with a copy of its GameGrid and of each remaining Ship.
+
+        Parameters: None
+
+        Returns: Player object
+        """
+        copy = Player.__new__(Player)
+        copy._player_grid = self._player_grid.clone()
+        copy._player_number = self._player_number
+        ship_copies = {ship: ship.clone() for ship in self._ships}
+        copy._ships = list(ship_copies.values())
+        copy._ship_index = {coord: ship_copies[ship] for coord, ship in self._ship_index.items()}
+        copy._intact_cells = self._intact_cells
+        return copy
 
     def get_player_grid(self):
         """Returns the player's game grid.
@@ -295,6 +1495,40 @@ class Player:
         Returns: None
         """
         self._ships.append(ship_obj)
+        hits = ship_obj.get_hits()
+        for coord in ship_obj.get_coords_on_grid():
+            # A ship may be placed over a square that was already hit; that square now belongs to the new ship
+            if coord not in hits:
+                self._ship_index[coord] = ship_obj
+                self._intact_cells += 1
+
+    def load_fleet(self, fleet):
+        """Places a fleet generated by random_fleet() on the player's GameGrid and adds its ships to the player.
+        The placements are looked up in the placement table instead of being parsed and validated one by one, so
+        the fleet must not overlap itself or any ship already on the grid.
+
+        On a SparseGameGrid, which has no placement table, each ship is placed with add_ship_to_grid() instead. A
+        ship that is off the grid, or that cannot be placed on a SparseGameGrid, raises ValueError.
+
+        Parameters: fleet (list of (length, coordinate, orientation) tuples)
+
+        Returns: None
+        """
+        sparse = isinstance(self._player_grid, SparseGameGrid)
+        for length, coord, orientation in fleet:
+            if sparse:
+                coords = self._player_grid.add_ship_to_grid(coord, orientation, length)
+                if not coords:
+                    raise ValueError(f"invalid ship placement: {(length, coord, orientation)}")
+            else:
+                placement = _find_placement(self._player_grid, coord, orientation, length)
+                if not placement:
+                    raise ValueError(f"invalid ship placement: {(length, coord, orientation)}")
+                self._player_grid.add_placement(placement)
+                coords = list(placement[2])
+            new_ship = Ship(length)
+            new_ship.set_coords_on_grid(coords)
+            self.add_ship(new_ship)
 
     def get_ships(self):
         """Returns a Player’s ships. It is used by ShipGame to determine whether a win has occurred.
@@ -305,6 +1539,58 @@ class Player:
         """
         return self._ships
 
+    def get_num_intact_cells(self):
+        """Returns the number of squares occupied by the player's ships that have not been hit by a torpedo.
+
+        Parameters: None
+
+        Returns: number of unhit ship squares (int)
+        """
+        return self._intact_cells
+
+    def get_ship_at(self, coord):
+        """Returns the Ship occupying a square that has not been hit yet.
+
+        Parameters: coord ((row, column) tuple)
+
+        Returns: Ship object, or None if the square holds no unhit ship
+        """
+        return self._ship_index.get(coord)
+
+    def receive_torpedo(self, hit_coord):
+        """Resolves a torpedo fired at the player's GameGrid. The Ship occupying the coordinate (if any) is found
+        in constant time through _ship_index and given the hit; if the hit sinks the Ship, it is removed from the
+        player's list of ships.
+
+        Parameters: coordinate where the torpedo hit as a (row, column) tuple
+
+        Returns: Ship object that was hit, or None if the torpedo missed or the square was already hit
+        """
+        hit_ship = self._ship_index.pop(hit_coord, None)
+        if hit_ship is None:
+            return None
+
+        hit_ship.add_hit(hit_coord)
+        self._intact_cells -= 1
+        if hit_ship.get_is_sunk():
+            self._ships.remove(hit_ship)
+        return hit_ship
+
+    def undo_torpedo(self, hit_coord, hit_ship, sunk_index=None):
+        """Takes back a torpedo that hit one of the player's ships, the reverse of receive_torpedo(). It is used by
+        ShipGame.undo_last_torpedo().
+
+        Parameters: hit_coord ((row, column) tuple); hit_ship (Ship object returned by receive_torpedo());
+        sunk_index (int or None), the position the Ship had in the list of ships if the torpedo sank it
+
+        Returns: None
+        """
+        hit_ship.remove_last_hit()
+        if sunk_index is not None:
+            self._ships.insert(sunk_index, hit_ship)
+        self._ship_index[hit_coord] = hit_ship
+        self._intact_cells += 1
+
     def remove_sunken_ships(self):
         """Removes any sunken ships from player's list of ships.
 
@@ -312,9 +1598,7 @@ class Player:
 
         Returns: None
         """
-        for ship in self._ships:
-            if ship.get_is_sunk():
-                self._ships.remove(ship)
+        self._ships[:] = [ship for ship in self._ships if not ship.get_is_sunk()]
 
 
 class ShipGame:
@@ -326,13 +1610,275 @@ class ShipGame:
     The ShipGame class is responsible for tracking the current state of the game (unfinished or which player won),
     the current turn, and the game players.
     """
-    def __init__(self):
+    __slots__ = ("_game_state", "_current_turn", "_players", "_max_ship_length", "_history", "_move_log",
+                 "_game_id", "_event_stream", "_instrumentation")
+
+    def __init__(self, grid_type=None, rows=10, columns=10, max_ship_length=10):
         """Creates a new Battleship game and initializes the private data members _game_state, _current_turn,
-        and _players.
+        _players, and _max_ship_length.
+
+        Parameters: grid_type (the class used for both players' game boards: GameGrid, BitGameGrid, SparseGameGrid,
+        or None to use GameGrid for 10 x 10 boards and SparseGameGrid for any other size); rows (int);
+        columns (int); max_ship_length (int), the longest ship place_ship() accepts
         """
+        if grid_type is None:
+            grid_type = GameGrid if (rows, columns) == (10, 10) else SparseGameGrid
+        elif (rows, columns) != (10, 10) and not issubclass(grid_type, SparseGameGrid):
+            raise ValueError(f"{grid_type.__name__} only supports 10 x 10 boards")
+        if max_ship_length < 2:
+            raise ValueError(f"invalid maximum ship length: {max_ship_length}")
         self._game_state = "UNFINISHED"     # Game always starts as unfinished
         self._current_turn = "first"        # First player always starts
-        self._players = {"first": Player("first"), "second": Player("second")}
+        self._players = {"first": Player("first", grid_type, rows, columns),
+                         "second": Player("second", grid_type, rows, columns)}
+        self._max_ship_length = max_ship_length
+        self._history = None                # Accepted torpedoes that can be undone, once enable_undo() is called
+        self._move_log = None               # Optional log that receives every accepted move
+        self._game_id = 0
+        self._event_stream = None           # Optional stream that receives an event for every torpedo
+        self._instrumentation = None        # Measurements, only kept while instrumentation is enabled
+
+    def reset(self):
+        """Returns the game to the state of a new game, reusing its Player and GameGrid objects: both players' ships
+        and boards are cleared, the game is unfinished, and it is the first player's turn. The game stops logging
+        moves and publishing events, and undo and instrumentation are disabled.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._game_state = "UNFINISHED"
+        self._current_turn = "first"
+        self._players["first"].reset()
+        self._players["second"].reset()
+        self._history = None
+        self._move_log = None
+        self._game_id = 0
+        self._event_stream = None
+        if self._instrumentation is not None:
+            self.disable_instrumentation()
+
+    def clone(self):
+        """Returns an independent copy of the game for search-based AIs, which try moves on copies of a game. Ship
+        layouts never change once placed, so they are shared with the copy; the boards, the hits on each ship, and
+        the lists of remaining ships are copied. The copy does not log moves, publish events, or record
+        instrumentation, and keeps undo enabled, with an empty history, if this game has it enabled.
+
+        Parameters: None
+
+        Returns: ShipGame object
+        """
+        copy = ShipGame.__new__(ShipGame)
+        copy._game_state = self._game_state
+        copy._current_turn = self._current_turn
+        copy._players = {"first": self._players["first"].clone(), "second": self._players["second"].clone()}
+        copy._max_ship_length = self._max_ship_length
+        copy._history = None if self._history is None else []
+        copy._move_log = None
+        copy._game_id = 0
+        copy._event_stream = None
+        copy._instrumentation = None
+        return copy
+
+    def enable_undo(self):
+        """Starts recording every accepted torpedo so that it can be taken back with undo_last_torpedo(). Placing a
+        ship clears the record, so torpedoes fired before a ship was placed cannot be undone.
+
+        Parameters: None
+
+        Returns: None
+        """
+        if self._history is None:
+            self._history = []
+
+    def undo_last_torpedo(self):
+        """Takes back the most recent accepted torpedo, restoring the boards, ships, current turn, and game state
+        exactly as they were before it was fired. A move log cannot take a move back, so torpedoes cannot be undone
+        while one is set; search on a clone() instead, which does not log moves.
+
+        Parameters: None
+
+        Returns: True (bool) if a torpedo was undone, or False (bool) if undo is not enabled or there is nothing to
+        undo
+        """
+        if not self._history:
+            return False
+        if self._move_log is not None:
+            raise ValueError("torpedoes cannot be undone while a move log is set")
+        player, square, previous_symbol, hit_ship, sunk_index = self._history.pop()
+        target_player = self._players["second"] if player == "first" else self._players["first"]
+        target_player.get_player_grid().set_square(square, previous_symbol)
+        if hit_ship is not None:
+            target_player.undo_torpedo(square, hit_ship, sunk_index)
+        self._game_state = "UNFINISHED"
+        self._current_turn = player
+        if self._event_stream is not None:
+            self._event_stream.publish_undo(player, square, previous_symbol)
+        return True
+
+    def to_bytes(self):
+        """Writes the game to a compact binary snapshot in the versioned format described at _SNAPSHOT_VERSION:
+        the game state, the current turn, the maximum ship length, both players' squares, and the position and hits
+        of every ship that has not been sunk. A game with two fleets of five ships takes 96 bytes. Hits on a ship
+        are restored in board order rather than in the order they were fired.
+
+        Parameters: None
+
+        Returns: snapshot (bytes)
+        """
+        players = (self._players["first"], self._players["second"])
+        if isinstance(players[0].get_player_grid(), SparseGameGrid):
+            raise ValueError("snapshots only support GameGrid and BitGameGrid boards")
+        flags = _GAME_STATES.index(self._game_state) | (4 if self._current_turn == "second" else 0)
+        if isinstance(players[0].get_player_grid(), BitGameGrid):
+            flags |= 8
+        if self._max_ship_length < 10:
+            flags |= self._max_ship_length << 4
+        parts = [b""]
+        for current_player in players:
+            ships = current_player.get_ships()
+            squares = current_player.get_player_grid().get_packed_squares().to_bytes(25, "little")
+            parts.append(_SNAPSHOT_SQUARES.pack(squares, len(ships)))
+            for ship in ships:
+                coords = ship.get_coords_on_grid()
+                hits = ship.get_hits()
+                start = (coords[0][0] - 1) * 10 + coords[0][1] - 1
+                if len(coords) > 1 and coords[1][1] == coords[0][1]:
+                    start |= 128    # Vertical ship
+                hit_mask = sum(1 << index for index, coord in enumerate(coords) if coord in hits)
+                parts.append(_SNAPSHOT_SHIP.pack(start, len(coords), hit_mask))
+        size = _SNAPSHOT_HEADER.size + sum(len(part) for part in parts)
+        parts[0] = _SNAPSHOT_HEADER.pack(_SNAPSHOT_VERSION, flags, size)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """Restores a game from a snapshot written by to_bytes(). The snapshot is read in place with
+        struct.unpack_from(), so data may be a large buffer, such as a memory-mapped file, holding many snapshots.
+
+        Parameters: data (bytes-like object); offset (int), where the snapshot starts in data
+
+        Returns: ShipGame object
+        """
+        version, flags, size = _SNAPSHOT_HEADER.unpack_from(data, offset)
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version: {version}")
+        game = cls(BitGameGrid if flags & 8 else GameGrid, max_ship_length=flags >> 4 or 10)
+        game._game_state = _GAME_STATES[flags & 3]
+        game._current_turn = "second" if flags & 4 else "first"
+        offset += _SNAPSHOT_HEADER.size
+        for player in ("first", "second"):
+            current_player = game._players[player]
+            squares, num_ships = _SNAPSHOT_SQUARES.unpack_from(data, offset)
+            offset += _SNAPSHOT_SQUARES.size
+            current_player.get_player_grid().set_packed_squares(int.from_bytes(squares, "little"))
+            for _ in range(num_ships):
+                start, length, hit_mask = _SNAPSHOT_SHIP.unpack_from(data, offset)
+                offset += _SNAPSHOT_SHIP.size
+                row, column = (start & 127) // 10 + 1, (start & 127) % 10 + 1
+                coords = _PLACEMENT_LOOKUP[(row, column, "C" if start & 128 else "R", length)][2]
+                new_ship = Ship(length)
+                new_ship.set_coords_on_grid(list(coords))
+                for index, coord in enumerate(coords):
+                    if hit_mask >> index & 1:
+                        new_ship.add_hit(coord)
+                current_player.add_ship(new_ship)
+        return game
+
+    def set_move_log(self, move_log, game_id):
+        """Sends every accepted place_ship() and fire_torpedo() call of this game to an append-only move log, such
+        as ShipGame_log.MoveLog, tagged with the game id. Passing None stops logging. Log records hold squares of a
+        10 x 10 board and a 4 byte game id, so other boards and ids are rejected here rather than failing part way
+        through a move. While a log is set, undo_last_torpedo() raises ValueError.
+
+        Parameters: move_log (object with log_place_ship() and log_fire_torpedo() methods, or None); game_id (int)
+
+        Returns: None
+        """
+        if move_log is not None:
+            if self._players["first"].get_player_grid().get_size() != (10, 10):
+                raise ValueError("move logs only support 10 x 10 boards")
+            if not 0 <= game_id < 1 << 32:
+                raise ValueError(f"invalid game id for a move log: {game_id}")
+        self._move_log = move_log
+        self._game_id = game_id
+
+    def set_event_stream(self, event_stream):
+        """Publishes an event for every accepted torpedo of this game, and for every torpedo that is undone, to an
+        event stream such as ShipGame_events.GameEventStream. Passing None stops publishing.
+
+        Parameters: event_stream (object with publish_torpedo() and publish_undo() methods, or None)
+
+        Returns: None
+        """
+        self._event_stream = event_stream
+
+    def get_event_stream(self):
+        """Returns the event stream set with set_event_stream().
+
+        Parameters: None
+
+        Returns: event stream, or None
+        """
+        return self._event_stream
+
+    def enable_instrumentation(self, callback=None):
+        """Starts measuring this game's calls: accepted and rejected calls by reason, latency histograms of the
+        public methods, and the time spent in each phase of fire_torpedo() and place_ship(). The game is switched
+        to ShipGame_instrumentation.InstrumentedShipGame, so a game that never enables instrumentation runs the
+        plain methods at no cost.
+
+        Parameters: callback (function or None), called after every instrumented call as described in
+        ShipGame_instrumentation.GameInstrumentation
+
+        Returns: None
+        """
+        from ShipGame_instrumentation import GameInstrumentation, InstrumentedShipGame
+
+        if type(self) not in (ShipGame, InstrumentedShipGame):
+            raise TypeError("instrumentation is only available for ShipGame objects")
+        self._instrumentation = GameInstrumentation(callback)
+        self.__class__ = InstrumentedShipGame
+
+    def disable_instrumentation(self):
+        """Stops measuring this game's calls and discards the measurements.
+
+        Parameters: None
+
+        Returns: None
+        """
+        self._instrumentation = None
+        self.__class__ = ShipGame
+
+    def get_instrumentation_snapshot(self):
+        """Returns a copy of the measurements taken since instrumentation was enabled.
+
+        Parameters: None
+
+        Returns: dict as described in ShipGame_instrumentation.GameInstrumentation.snapshot(), or None if
+        instrumentation is not enabled
+        """
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.snapshot()
+
+    def get_max_ship_length(self):
+        """Returns the length of the longest ship that can be placed.
+
+        Parameters: None
+
+        Returns: maximum ship length (int)
+        """
+        return self._max_ship_length
+
+    def get_player(self, player):
+        """Returns the Player object for the specified player.
+
+        Parameters: player (str)
+
+        Returns: Player object
+        """
+        return self._players[player]
 
     def show_game_grid(self, player):
         """Prints the GameGrid for the specified player.
@@ -342,10 +1888,19 @@ class ShipGame:
         Returns: None (prints the player’s GameGrid but does not return it)
         """
         current_player = self._players[player]
-        current_grid = current_player.get_player_grid().get_grid()
         print(f"Current game board for the {current_player.get_player_number()} player:")
-        for row in current_grid:
-            print(" ".join(row))
+        print(current_player.get_player_grid().render())
+
+    def render_game_grid(self, player, opponent_view=False):
+        """Returns the GameGrid for the specified player as text, as printed by show_game_grid(). The text is cached
+        by the GameGrid, see GameGrid.render().
+
+        Parameters: player (str); opponent_view (bool), hide the player's unhit ship squares, showing only what the
+        opponent's torpedoes have revealed
+
+        Returns: rendered board (str)
+        """
+        return self._players[player].get_player_grid().render(opponent_view)
 
     def place_ship(self, player, ship_length, ship_coords, ship_orientation):
         """Attempts to place a ship on a player’s GameGrid. It ensures that the ship is a valid length, creates a new
@@ -355,32 +1910,95 @@ class ShipGame:
 
         Turn taking is not checked during ship placement.
 
-        Parameters: player (str); ship_length (int); ship_coords (str); ship_orientation (str)
+        Parameters: player (str); ship_length (int); ship_coords (str such as "A1", cell number (int), or
+        (row, column) tuple, see GameGrid._parse_coord()); ship_orientation (str)
 
         Returns: True (bool) if the ship length and coordinates are valid and the ship is successfully placed on the
         Player’s GameGrid or False (bool) if the ship length or coordinates are invalid.
         """
-        if 2 > ship_length or ship_length > 10:
+        if not self._is_valid_length(ship_length):
             return False
 
-        new_ship = Ship(ship_length)
         current_player = self._players[player]
         if current_player:
-            ship_validation = current_player.get_player_grid().add_ship_to_grid(ship_coords,
+            complete_coords = current_player.get_player_grid().add_ship_to_grid(ship_coords,
                                                                                 ship_orientation,
                                                                                 ship_length
                                                                                 )
-            if not ship_validation:
+            if not complete_coords:
                 return False
-            else:
-                complete_coords = ship_validation
-                new_ship.set_coords_on_grid(complete_coords)
-                current_player.add_ship(new_ship)
-                return True
+            self._register_ship(player, ship_length, complete_coords, ship_orientation)
+            return True
         else:
             # If the player number was not "first" or "second", player is invalid
             return False
 
+    def _is_valid_length(self, ship_length):
+        """A private method that checks a ship length against the limits of this game: at least 2 and at most the
+        maximum ship length. Used by place_ship(), place_fleet(), and InstrumentedShipGame.place_ship().
+
+        Parameters: ship_length (int)
+
+        Returns: True (bool) if ships of this length may be placed, False (bool) otherwise
+        """
+        return 2 <= ship_length <= self._max_ship_length
+
+    def _register_ship(self, player, ship_length, complete_coords, ship_orientation):
+        """A private method that does the bookkeeping for a ship that has been placed on a player's GameGrid: a new
+        Ship is created and added to the player's list of ships, the undo history is cleared, and the placement is
+        sent to the move log, if one is set.
+
+        Parameters: player (str); ship_length (int); complete_coords (list of (row, column) tuples), as returned by
+        add_ship_to_grid(); ship_orientation (str)
+
+        Returns: None
+        """
+        new_ship = Ship(ship_length)
+        new_ship.set_coords_on_grid(complete_coords)
+        self._players[player].add_ship(new_ship)
+        if self._history:
+            self._history.clear()
+        if self._move_log is not None:
+            self._move_log.log_place_ship(self._game_id, player, ship_length, complete_coords[0], ship_orientation)
+
+    def place_fleet(self, player, fleet):
+        """Places a whole fleet on a player’s GameGrid in one call, or none of it. Every ship must have a valid
+        length and a valid placement, as in place_ship(), and must not overlap another ship of the fleet. The
+        player's GameGrid is not changed unless every ship is valid.
+
+        Parameters: player (str); fleet (list of (length, coordinate, orientation) tuples)
+
+        Returns: True (bool) if the fleet was placed, or False (bool) if any ship was invalid
+        """
+        current_player = self._players[player]
+        for length, _, _ in fleet:
+            if not self._is_valid_length(length):
+                return False
+        fleet_coords = current_player.get_player_grid().add_fleet_to_grid(fleet)
+        if fleet and not fleet_coords:
+            return False
+
+        for (length, _, orientation), coords in zip(fleet, fleet_coords):
+            self._register_ship(player, length, coords, orientation)
+        return True
+
+    def load_fleet(self, player, fleet):
+        """Places a whole fleet generated by random_fleet() on a player’s GameGrid without validating each ship
+        through place_ship(). See Player.load_fleet().
+
+        Parameters: player (str); fleet (list of (length, coordinate, orientation) tuples)
+
+        Returns: None
+        """
+        current_player = self._players[player]
+        current_player.load_fleet(fleet)
+        if self._history:
+            self._history.clear()
+        if self._move_log is not None and fleet:
+            for ship, (length, coord, orientation) in zip(current_player.get_ships()[-len(fleet):], fleet):
+                self._move_log.log_place_ship(self._game_id, player, length, ship.get_coords_on_grid()[0],
+                                              orientation)
+
     def get_current_state(self):
         """Returns the current state of the game. Either the game is unfinished or a player has won.
         The game cannot end in a draw.
@@ -398,35 +2016,103 @@ class ShipGame:
         from the opponent’s ship list. If the hit results in the opponent’s final ship sinking, the game state is
         updated to reflect that the current player won.
 
-        Parameters: player (str), target_coords (str)
+        Parameters: player (str), target_coords (str such as "A1", cell number (int), or (row, column) tuple, see
+        GameGrid._parse_coord())
 
         Returns: True (bool) if the torpedo coordinates are valid or False (bool) if the torpedo coordinates are
         invalid or if the torpedo was fired out of turn or after a game finished.
 
         Note that the return value is not dependent on whether the torpedo hit a ship.
         """
-        if self.get_current_state() != "UNFINISHED" or self._current_turn != player:
+        if self._check_turn(player) is not None:
             return False
 
         # Target_player is the opponent of the player who is taking a turn/firing the torpedo
         target_player = self._players["second"] if player == "first" else self._players["first"]
-        torpedo_valid = target_player.get_player_grid().add_torpedo_hit(target_coords)
-        if not torpedo_valid:
+        # Coordinates are a tuple in the format (row, column)
+        validated_coords = target_player.get_player_grid()._parse_coord(target_coords)
+        if validated_coords is None:
             return False
+        self._accept_torpedo(player, target_player, validated_coords)
+        return True
+
+    def _check_turn(self, player):
+        """A private method that checks whether a player may fire a torpedo now. It is the first step of every
+        firing path.
+
+        Parameters: player (str)
+
+        Returns: None if the player may fire, or the reason they may not: "game_over" (str) or "out_of_turn" (str)
+        """
+        if self._game_state != "UNFINISHED":
+            return "game_over"
+        if self._current_turn != player:
+            return "out_of_turn"
+        return None
+
+    def _accept_torpedo(self, player, target_player, square):
+        """A private method that does the bookkeeping for a torpedo that has passed _check_turn() and whose
+        coordinates are valid. Every firing path ends here: fire_torpedo(), fire_sequence(), and
+        InstrumentedShipGame.fire_torpedo(). The torpedo is marked on the opponent's GameGrid and the hit is given to
+        the Ship on the square, if any. The game is won if the opponent has no ships left, and the turn passes to the
+        opponent otherwise. While undo is enabled, what the torpedo changes is recorded first so that
+        undo_last_torpedo() can take it back, and the torpedo is sent to the move log and the event stream, if they
+        are set.
+
+        Parameters: player (str), the player firing; target_player (Player), the opponent; square ((row, column)
+        tuple), a square of the opponent's grid as returned by its _parse_coord()
+
+        Returns: None
+        """
+        target_grid = target_player.get_player_grid()
+        if self._history is not None:
+            hit_ship = target_player.get_ship_at(square)
+            sunk_index = None
+            if hit_ship is not None and len(hit_ship.get_hits()) + 1 == hit_ship.get_length():
+                sunk_index = target_player.get_ships().index(hit_ship)
+            self._history.append((player, square, target_grid.get_square(square), hit_ship, sunk_index))
+        target_grid._mark_torpedo(square)
+        # The player looks up the ship at the coordinates and removes it from its ship list if it sank
+        hit_ship = target_player.receive_torpedo(square)
+        if not target_player.get_ships():
+            self._game_state = "SECOND_WON" if player == "second" else "FIRST_WON"
         else:
-            # Coordinates are a tuple in the format (row, column)
-            validated_coords = torpedo_valid
-            for player_ship in target_player.get_ships():
-                if validated_coords in player_ship.get_coords_on_grid():
-                    # The ship object ensures that coordinates are not duplicated when adding a hit
-                    player_ship.add_hit(validated_coords)
-            target_player.remove_sunken_ships()
-            if self.get_num_ships_remaining(target_player.get_player_number()) == 0:
-                self._game_state = "SECOND_WON" if player == "second" else "FIRST_WON"
-            else:
-                # Swap turns if the game was not won
-                self._current_turn = "first" if self._current_turn == "second" else "second"
-            return True
+            # Swap turns if the game was not won
+            self._current_turn = "first" if player == "second" else "second"
+        if self._move_log is not None:
+            self._move_log.log_fire_torpedo(self._game_id, player, square)
+        if self._event_stream is not None:
+            self._event_stream.publish_torpedo(player, square, target_grid.get_square(square), hit_ship,
+                                               self._game_state)
+
+    def fire_sequence(self, moves):
+        """Fires a sequence of torpedoes in one call. Each move is handled exactly as fire_torpedo() would handle it,
+        so moves out of turn, with invalid coordinates, or after the game has ended are rejected and the following
+        moves are still tried. A coordinate that makes fire_torpedo() raise an exception raises it here too, after
+        the earlier moves have been applied.
+
+        Parameters: moves (list of (player (str), target_coords (str)) tuples)
+
+        Returns: list of the result of each move, True (bool) or False (bool) as returned by fire_torpedo()
+        """
+        # The steps of fire_torpedo() are bound once for the whole sequence
+        check_turn = self._check_turn
+        accept_torpedo = self._accept_torpedo
+        first = self._players["first"]
+        second = self._players["second"]
+        results = []
+        for player, target_coords in moves:
+            if check_turn(player) is not None:
+                results.append(False)
+                continue
+            target_player = second if player == "first" else first
+            validated_coords = target_player.get_player_grid()._parse_coord(target_coords)
+            if validated_coords is None:
+                results.append(False)
+                continue
+            accept_torpedo(player, target_player, validated_coords)
+            results.append(True)
+        return results
 
     def get_num_ships_remaining(self, player):
         """Returns the number of ships the specified player has left on their GameGrid. This uses the Player class’s
@@ -439,3 +2125,60 @@ class ShipGame:
         selected_player = self._players[player]
         if selected_player is not None:
             return len(selected_player.get_ships())
+
+
+class GamePool:
+    """Recycles finished games so that programs hosting many short games, such as ShipGame_server, do not allocate
+    two Players, two GameGrids and their Ships for every new game. Released games are reset and handed out again by
+    acquire().
+    """
+    __slots__ = ("_grid_type", "_max_size", "_free")
+
+    def __init__(self, grid_type=GameGrid, max_size=1024):
+        """Creates an empty pool.
+
+        Parameters: grid_type (GameGrid or BitGameGrid), the board class of the games handed out; max_size (int),
+        the most released games kept for reuse
+        """
+        self._grid_type = grid_type
+        self._max_size = max_size
+        self._free = []
+
+    def get_num_free(self):
+        """Returns the number of released games waiting to be reused.
+
+        Parameters: None
+
+        Returns: number of games (int)
+        """
+        return len(self._free)
+
+    def acquire(self):
+        """Returns a new game, reusing a released game if there is one.
+
+        Parameters: None
+
+        Returns: ShipGame object
+        """
+        if self._free:
+            return self._free.pop()
+        return ShipGame(self._grid_type)
+
+    def release(self, game):
+        """Resets a game that is no longer used and keeps it for reuse. The game must not be used by the caller
+        afterwards. Games that acquire() would not hand out, because they have a different board class, board size,
+        or maximum ship length, are left to the garbage collector, as are games released when the pool is full.
+
+        Parameters: game (ShipGame)
+
+        Returns: None
+        """
+        if len(self._free) >= self._max_size:
+            return
+        player_grid = game.get_player("first").get_player_grid()
+        if type(player_grid) is not self._grid_type or player_grid.get_size() != (10, 10):
+            return
+        if game._max_ship_length != 10:
+            return
+        game.reset()
+        self._free.append(game)
@@ -0,0 +1,620 @@
+# Description: A hunt/target opponent for ShipGame that fires at the square most likely to hold a ship. It keeps a
+# heatmap counting, for every square, the ship placements that cover it and are still consistent with the torpedo
+# results seen so far. Placements that cover unresolved hits are weighted more heavily, which makes the AI finish off
+# a ship once it has found it. The heatmap is updated incrementally after each torpedo: only the placements that cover
+# the square that was fired at change, so choosing a target stays cheap. Fleets of any size with ship lengths from
+# 2 to 10 are supported.
+#
+# MonteCarloTargetingAI estimates the same probabilities by sampling whole opponent fleets that are consistent with
+# its view of the opponent's board, and fires at the square covered by the most samples. Sampling runs for a fixed
+# time per move on a MonteCarloSampler, which spreads it over a pool of worker processes that write their counts
+# into one shared memory block.
+#
+# Squares are numbered as cells 0 to 99, as described next to COORD_CELLS in ShipGame.py.
+
+import asyncio
+import os
+import random
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from ShipGame import ShipGame, get_legal_placements
+
+HIT_WEIGHT = 20     # Each unresolved hit covered by a placement multiplies the placement's weight by this
+
+
+def _create_cell_placements():
+    """A private function used to list, for every cell and every ship length from 2 to 10, which placements in
+    _PLACEMENTS cover the cell.
+
+    Parameters: None
+
+    Returns: dict mapping length to a list of 100 lists of placement ids
+    """
+    cell_placements = {}
+    for length, placements in _PLACEMENTS.items():
+        covering = [[] for _ in range(100)]
+        for placement_id, cells in enumerate(placements):
+            for cell in cells:
+                covering[cell].append(placement_id)
+        cell_placements[length] = covering
+    return cell_placements
+
+
+_PLACEMENTS = {length: [placement[3] for placement in get_legal_placements(length)] for length in range(2, 11)}
+_CELL_PLACEMENTS = _create_cell_placements()
+# Bitmask of the cells of every legal placement of each ship length, in the order of get_legal_placements()
+PLACEMENT_MASKS = {length: tuple(placement[4] for placement in get_legal_placements(length)) for length in range(2, 11)}
+_SAMPLE_COUNTS = struct.Struct("101q")      # Samples covering each of the 100 cells, then the number of samples
+
+
+class ProbabilityTargetingAI:
+    """Chooses torpedo targets from a heatmap of how likely each square is to hold one of the opponent's remaining
+    ships.
+
+    For every ship length still afloat the AI tracks which placements are still possible (they do not cover a miss or
+    a sunk ship) and how many unresolved hits each one covers. A possible placement covering h hits has weight
+    HIT_WEIGHT ** h, and the heat of a square is the sum, over the remaining ships, of the weights of the possible
+    placements covering it. Recording a torpedo result only touches the placements covering that square.
+    """
+    def __init__(self, fleet_lengths, rng=None):
+        """Creates a new AI for an opponent whose fleet has the given ship lengths.
+
+        Parameters: fleet_lengths (list of ints from 2 to 10); rng (random.Random or None), used to break ties
+        """
+        self._rng = rng if rng is not None else random.Random()
+        self._ships_left = {}           # Maps length to number of ships of that length still afloat
+        for length in fleet_lengths:
+            if not 2 <= length <= 10:
+                raise ValueError(f"invalid ship length: {length}")
+            self._ships_left[length] = self._ships_left.get(length, 0) + 1
+        self._possible = {}             # Maps length to a list of flags, one per placement
+        self._hit_counts = {}           # Maps length to the number of unresolved hits covered by each placement
+        self._length_heat = {}          # Maps length to the heat contributed by one ship of that length
+        self._heat = [0] * 100
+        self._fired = [False] * 100
+        self._hits = set()              # Hits that are not part of a sunk ship yet
+        for length, count in self._ships_left.items():
+            self._possible[length] = [True] * len(_PLACEMENTS[length])
+            self._hit_counts[length] = [0] * len(_PLACEMENTS[length])
+            self._length_heat[length] = [len(covering) for covering in _CELL_PLACEMENTS[length]]
+            for cell in range(100):
+                self._heat[cell] += count * self._length_heat[length][cell]
+
+    def get_heatmap(self):
+        """Returns the current heat of every square.
+
+        Parameters: None
+
+        Returns: 10 x 10 list of ints, indexed [row - 1][column - 1]
+        """
+        return [self._heat[row * 10:row * 10 + 10] for row in range(10)]
+
+    def get_ships_left(self):
+        """Returns the lengths of the opponent's ships that have not been sunk.
+
+        Parameters: None
+
+        Returns: dict mapping length (int) to number of ships (int)
+        """
+        return {length: count for length, count in self._ships_left.items() if count}
+
+    def choose_target(self):
+        """Returns the square with the highest heat that has not been fired at yet. Ties are broken at random.
+
+        Parameters: None
+
+        Returns: (row, column) tuple, both starting at 1
+        """
+        heat = self._heat
+        fired = self._fired
+        best_heat = -1
+        best_cells = []
+        for cell in range(100):
+            if fired[cell]:
+                continue
+            if heat[cell] > best_heat:
+                best_heat = heat[cell]
+                best_cells = [cell]
+            elif heat[cell] == best_heat:
+                best_cells.append(cell)
+        cell = best_cells[0] if len(best_cells) == 1 else self._rng.choice(best_cells)
+        return cell // 10 + 1, cell % 10 + 1
+
+    def _change_weight(self, length, cells, weight_change):
+        """A private method that adds weight_change to the weight of one placement of the given length, updating
+        the heat of the squares it covers.
+
+        Parameters: length (int); cells (tuple of ints); weight_change (int)
+
+        Returns: None
+        """
+        length_heat = self._length_heat[length]
+        heat_change = weight_change * self._ships_left[length]
+        for cell in cells:
+            length_heat[cell] += weight_change
+            self._heat[cell] += heat_change
+
+    def _block_cell(self, cell):
+        """A private method that rules out every placement covering a square that cannot hold a remaining ship.
+
+        Parameters: cell (int)
+
+        Returns: None
+        """
+        for length, possible in self._possible.items():
+            placements = _PLACEMENTS[length]
+            hit_counts = self._hit_counts[length]
+            for placement_id in _CELL_PLACEMENTS[length][cell]:
+                if possible[placement_id]:
+                    possible[placement_id] = False
+                    self._change_weight(length, placements[placement_id], -HIT_WEIGHT ** hit_counts[placement_id])
+
+    def record_miss(self, row, column):
+        """Records a torpedo that missed.
+
+        Parameters: row (int); column (int)
+
+        Returns: None
+        """
+        cell = (row - 1) * 10 + (column - 1)
+        self._fired[cell] = True
+        self._block_cell(cell)
+
+    def record_hit(self, row, column):
+        """Records a torpedo that hit a ship without sinking it.
+
+        Parameters: row (int); column (int)
+
+        Returns: None
+        """
+        cell = (row - 1) * 10 + (column - 1)
+        if self._fired[cell]:
+            return
+        self._fired[cell] = True
+        self._hits.add(cell)
+        for length, possible in self._possible.items():
+            placements = _PLACEMENTS[length]
+            hit_counts = self._hit_counts[length]
+            for placement_id in _CELL_PLACEMENTS[length][cell]:
+                if possible[placement_id]:
+                    old_weight = HIT_WEIGHT ** hit_counts[placement_id]
+                    hit_counts[placement_id] += 1
+                    self._change_weight(length, placements[placement_id], old_weight * (HIT_WEIGHT - 1))
+
+    def record_sunk(self, ship_coords):
+        """Records a torpedo that sank a ship. The squares of the sunk ship can no longer hold any other ship, and
+        one ship of its length is removed from the remaining fleet.
+
+        Parameters: ship_coords (list of (row, column) tuples occupied by the sunk ship)
+
+        Returns: None
+        """
+        cells = [(row - 1) * 10 + (column - 1) for row, column in ship_coords]
+        for cell in cells:
+            self._fired[cell] = True
+            self._hits.discard(cell)
+            self._block_cell(cell)
+
+        length = len(cells)
+        if self._ships_left.get(length):
+            length_heat = self._length_heat[length]
+            for cell in range(100):
+                self._heat[cell] -= length_heat[cell]
+            self._ships_left[length] -= 1
+
+    def observe(self, target, is_hit, sunk_ship):
+        """Records the result of a torpedo, using the same interface as the firing strategies of
+        ShipGame_tournament.
+
+        Parameters: target ((row, column) tuple); is_hit (bool); sunk_ship (the Ship sunk by the torpedo, or None)
+
+        Returns: None
+        """
+        if sunk_ship is not None:
+            self.record_sunk(sunk_ship.get_coords_on_grid())
+        elif is_hit:
+            self.record_hit(*target)
+        else:
+            self.record_miss(*target)
+
+
+class ProbabilityFiring(ProbabilityTargetingAI):
+    """ProbabilityTargetingAI packaged as a firing strategy for ShipGame_tournament."""
+    def __init__(self, rng, lengths):
+        """Creates the strategy for one game.
+
+        Parameters: rng (random.Random); lengths (list of ints), the lengths of the opponent's ships
+        """
+        super().__init__(lengths, rng)
+
+    def next_target(self):
+        """Returns the next square to fire at as a (row, column) tuple."""
+        return self.choose_target()
+
+
+def sample_layout(rng, lengths, blocked, hits):
+    """Places a random fleet of ships with the given lengths that is consistent with the torpedo results seen so
+    far: no ship covers a blocked square (a miss or a square of a sunk ship), ships do not overlap, and every
+    unresolved hit is covered. Ships are first placed over the hits, then the rest of the fleet is placed at random.
+    As in ShipGame.place_ship(), ships of any length from 2 to 10 may be used. The samples are not uniform over the
+    consistent fleets: placing the ships that cover hits first, and retrying a ship's placement rather than the
+    whole fleet, favours some fleets over others, so the counts are estimates of where ships are likely to be
+    rather than exact probabilities.
+
+    Parameters: rng (random.Random); lengths (list of ints), the ships still afloat; blocked (int), mask of cells
+    that cannot hold a ship; hits (list of ints), cells of unresolved hits
+
+    Returns: mask of the cells covered by the fleet (int), or None if this attempt found no consistent fleet
+    """
+    ships_left = list(lengths)
+    occupied = blocked
+    uncovered = list(hits)
+    while uncovered:
+        cell = uncovered[rng.randrange(len(uncovered))]
+        options = [(length, mask) for length in set(ships_left) for mask in
+                   (PLACEMENT_MASKS[length][placement_id] for placement_id in _CELL_PLACEMENTS[length][cell])
+                   if not mask & occupied]
+        if not options:
+            return None
+        length, mask = options[rng.randrange(len(options))]
+        ships_left.remove(length)
+        occupied |= mask
+        uncovered = [hit for hit in uncovered if not mask >> hit & 1]
+
+    rng.shuffle(ships_left)
+    for length in ships_left:
+        masks = PLACEMENT_MASKS[length]
+        for _ in range(20):
+            mask = masks[rng.randrange(len(masks))]
+            if not mask & occupied:
+                break
+        else:
+            options = [mask for mask in masks if not mask & occupied]
+            if not options:
+                return None
+            mask = options[rng.randrange(len(options))]
+        occupied |= mask
+    return occupied & ~blocked
+
+
+def _sample_into(buffer, slot, view, time_budget, max_samples, seed):
+    """A private function that samples fleets consistent with a view until time_budget seconds have passed or
+    max_samples fleets have been sampled, and writes how many samples covered each cell, followed by the number of
+    samples, into slot number slot of buffer.
+
+    Parameters: buffer (writable buffer); slot (int); view ((lengths, blocked, hits) tuple); time_budget (float);
+    max_samples (int or None); seed (str)
+
+    Returns: None
+    """
+    lengths, blocked, hits = view
+    rng = random.Random(seed)
+    counts = [0] * 100
+    samples = 0
+    clock = time.perf_counter
+    deadline = clock() + time_budget
+    while clock() < deadline and (max_samples is None or samples < max_samples):
+        layout = sample_layout(rng, lengths, blocked, hits)
+        if layout is None:
+            continue
+        samples += 1
+        while layout:
+            lowest = layout & -layout
+            counts[lowest.bit_length() - 1] += 1
+            layout ^= lowest
+    _SAMPLE_COUNTS.pack_into(buffer, slot * _SAMPLE_COUNTS.size, *counts, samples)
+
+
+_worker_results = None      # The shared memory block of a MonteCarloSampler, in its worker processes
+
+
+def _attach_results(name):
+    """A private function run once in every worker process of a MonteCarloSampler to attach its shared memory."""
+    global _worker_results
+    _worker_results = shared_memory.SharedMemory(name=name)
+
+
+def _sample_task(slot, view, time_budget, max_samples, seed):
+    """A private function run by the worker processes of a MonteCarloSampler; see _sample_into()."""
+    _sample_into(_worker_results.buf, slot, view, time_budget, max_samples, seed)
+
+
+class MonteCarloSampler:
+    """Samples opponent fleets that are consistent with a view of the opponent's board, for a fixed time per call,
+    on a pool of worker processes. Each worker writes its counts into its own slot of one shared memory block, so
+    results are not sent back through the pool. The pool and the shared memory are created once and reused for
+    every call until close() is called. Calls from several threads, such as the sessions of a server using
+    MonteCarloTargetingAI.choose_target_async(), take turns, since they share the slots.
+    """
+    def __init__(self, workers=None, time_budget=0.05, max_samples=None, seed=None):
+        """Creates a sampler.
+
+        Parameters: workers (int or None), number of worker processes, None for one per CPU, 0 to sample in the
+        calling process; time_budget (float), seconds spent sampling per call; max_samples (int or None), samples
+        per worker per call, which makes the results reproducible; seed (int or None)
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self._workers = workers
+        self._time_budget = time_budget
+        self._max_samples = max_samples
+        self._seed = random.randrange(1 << 32) if seed is None else seed
+        self._num_calls = 0
+        self._lock = threading.Lock()   # Held for a whole call to sample(), which uses every slot
+        self._results = None
+        self._executor = None
+        if workers:
+            self._results = shared_memory.SharedMemory(create=True, size=_SAMPLE_COUNTS.size * workers)
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_attach_results,
+                                                 initargs=(self._results.name,))
+
+    def sample(self, lengths, blocked, hits):
+        """Samples fleets consistent with a view of the opponent's board, as described in sample_layout().
+
+        Parameters: lengths (list of ints), the ships still afloat; blocked (int), mask of cells that cannot hold
+        a ship; hits (list of ints), cells of unresolved hits
+
+        Returns: (list of the number of samples covering each cell, number of samples) tuple
+        """
+        view = (tuple(lengths), blocked, tuple(hits))
+        with self._lock:
+            self._num_calls += 1
+            seeds = [f"{self._seed}:{self._num_calls}:{slot}" for slot in range(max(self._workers, 1))]
+            if not self._workers:
+                buffer = bytearray(_SAMPLE_COUNTS.size)
+                _sample_into(buffer, 0, view, self._time_budget, self._max_samples, seeds[0])
+            else:
+                buffer = self._results.buf
+                futures = [self._executor.submit(_sample_task, slot, view, self._time_budget, self._max_samples,
+                                                 seeds[slot]) for slot in range(self._workers)]
+                wait(futures)
+                for future in futures:
+                    future.result()
+
+            counts = [0] * 100
+            samples = 0
+            for slot in range(max(self._workers, 1)):
+                slot_counts = _SAMPLE_COUNTS.unpack_from(buffer, slot * _SAMPLE_COUNTS.size)
+                for cell in range(100):
+                    counts[cell] += slot_counts[cell]
+                samples += slot_counts[100]
+        return counts, samples
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory.
+
+        Parameters: None
+
+        Returns: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._results.close()
+            self._results.unlink()
+            self._results = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MonteCarloTargetingAI:
+    """Chooses torpedo targets by sampling opponent fleets that are consistent with the torpedo results seen so far
+    and firing at the square that holds a ship in the most samples. It has the same interface as
+    ProbabilityTargetingAI. The opponent's fleet is assumed to have been placed before the first torpedo.
+    """
+    def __init__(self, fleet_lengths, rng=None, sampler=None, endgame=None):
+        """Creates a new AI for an opponent whose fleet has the given ship lengths.
+
+        Parameters: fleet_lengths (list of ints from 2 to 10); rng (random.Random or None), used to break ties;
+        sampler (MonteCarloSampler or None), by default sampling runs in this process for 50 ms per move;
+        endgame (ShipGame_endgame.EndgameSolver or None), tried before sampling on every move, so the AI fires
+        the best torpedo once few consistent fleets are left
+        """
+        for length in fleet_lengths:
+            if not 2 <= length <= 10:
+                raise ValueError(f"invalid ship length: {length}")
+        self._rng = rng if rng is not None else random.Random()
+        self._sampler = sampler if sampler is not None else MonteCarloSampler(0, seed=self._rng.randrange(1 << 32))
+        self._endgame = endgame
+        self._ships_left = list(fleet_lengths)
+        self._fired = 0                 # Mask of cells fired at
+        self._blocked = 0               # Mask of misses and squares of sunk ships
+        self._hits = []                 # Hits that are not part of a sunk ship yet
+        self._last_samples = 0
+
+    @classmethod
+    def from_game(cls, game, player, rng=None, sampler=None, endgame=None):
+        """Creates an AI for a game that is already under way, from the given player's view of the opponent's
+        GameGrid as described by ShipGame_endgame.board_from_game(), instead of recording every earlier torpedo.
+
+        Parameters: game (ShipGame with 10 x 10 boards); player (str), the player firing the torpedoes; rng, sampler,
+        and endgame as in MonteCarloTargetingAI()
+
+        Returns: MonteCarloTargetingAI object
+        """
+        from ShipGame_endgame import board_from_game     # ShipGame_endgame imports this module
+
+        lengths, blocked, hits = board_from_game(game, player)
+        ai = cls(lengths, rng, sampler, endgame)
+        ai._fired = blocked | hits
+        ai._blocked = blocked
+        ai._hits = [cell for cell in range(100) if hits >> cell & 1]
+        return ai
+
+    def get_ships_left(self):
+        """Returns the lengths of the opponent's ships that have not been sunk.
+
+        Parameters: None
+
+        Returns: dict mapping length (int) to number of ships (int)
+        """
+        ships_left = {}
+        for length in self._ships_left:
+            ships_left[length] = ships_left.get(length, 0) + 1
+        return ships_left
+
+    def get_last_num_samples(self):
+        """Returns the number of fleets sampled to choose the last target.
+
+        Parameters: None
+
+        Returns: number of samples (int)
+        """
+        return self._last_samples
+
+    def choose_target(self):
+        """Returns the square that holds a ship in the most sampled fleets, among the squares that have not been
+        fired at yet. Ties are broken at random, so a random square is chosen if no consistent fleet was found.
+        If the AI has an endgame solver that can solve the board, the solver's target is returned instead and no
+        fleet is sampled.
+
+        Parameters: None
+
+        Returns: (row, column) tuple, both starting at 1
+        """
+        if self._endgame is not None and self._ships_left:
+            solved = self._endgame.solve(self._ships_left, self._blocked, sum(1 << hit for hit in self._hits))
+            if solved is not None:
+                self._last_samples = 0
+                return solved[1]
+        counts, self._last_samples = self._sampler.sample(self._ships_left, self._blocked, self._hits)
+        best_count = -1
+        best_cells = []
+        for cell in range(100):
+            if self._fired >> cell & 1:
+                continue
+            if counts[cell] > best_count:
+                best_count = counts[cell]
+                best_cells = [cell]
+            elif counts[cell] == best_count:
+                best_cells.append(cell)
+        cell = best_cells[0] if len(best_cells) == 1 else self._rng.choice(best_cells)
+        return cell // 10 + 1, cell % 10 + 1
+
+    async def choose_target_async(self):
+        """Runs choose_target() in the event loop's default executor, so a server can wait for it without blocking
+        its other sessions.
+
+        Parameters: None
+
+        Returns: (row, column) tuple, both starting at 1
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.choose_target)
+
+    def record_miss(self, row, column):
+        """Records a torpedo that missed.
+
+        Parameters: row (int); column (int)
+
+        Returns: None
+        """
+        cell = 1 << ((row - 1) * 10 + (column - 1))
+        self._fired |= cell
+        self._blocked |= cell
+
+    def record_hit(self, row, column):
+        """Records a torpedo that hit a ship without sinking it.
+
+        Parameters: row (int); column (int)
+
+        Returns: None
+        """
+        cell = (row - 1) * 10 + (column - 1)
+        if not self._fired >> cell & 1:
+            self._fired |= 1 << cell
+            self._hits.append(cell)
+
+    def record_sunk(self, ship_coords):
+        """Records a torpedo that sank a ship. The squares of the sunk ship can no longer hold any other ship, and
+        one ship of its length is removed from the remaining fleet.
+
+        Parameters: ship_coords (list of (row, column) tuples occupied by the sunk ship)
+
+        Returns: None
+        """
+        cells = [(row - 1) * 10 + (column - 1) for row, column in ship_coords]
+        for cell in cells:
+            self._fired |= 1 << cell
+            self._blocked |= 1 << cell
+        self._hits = [hit for hit in self._hits if hit not in cells]
+        if len(cells) in self._ships_left:
+            self._ships_left.remove(len(cells))
+
+    def observe(self, target, is_hit, sunk_ship):
+        """Records the result of a torpedo, as ProbabilityTargetingAI.observe() does.
+
+        Parameters: target ((row, column) tuple); is_hit (bool); sunk_ship (the Ship sunk by the torpedo, or None)
+
+        Returns: None
+        """
+        if sunk_ship is not None:
+            self.record_sunk(sunk_ship.get_coords_on_grid())
+        elif is_hit:
+            self.record_hit(*target)
+        else:
+            self.record_miss(*target)
+
+
+def benchmark(num_games=200, lengths=(5, 4, 3, 3, 2), seed=0, ai_type=None):
+    """Measures the mean number of torpedoes an AI needs to sink a randomly placed fleet, and the mean time it
+    spends per torpedo choosing the target and recording the result.
+
+    Parameters: num_games (int); lengths (list of ints); seed (int); ai_type (function or None), called with
+    (lengths, rng) to create the AI for each game, ProbabilityTargetingAI by default
+
+    Returns: (mean torpedoes to sink the fleet (float), mean microseconds per decision (float))
+    """
+    from ShipGame_tournament import random_placement     # ShipGame_tournament imports this module
+
+    rng = random.Random(seed)
+    total_shots = 0
+    total_time = 0.0
+    for _ in range(num_games):
+        game = ShipGame()
+        for placement in random_placement(lengths, rng):
+            game.place_ship("second", *placement)
+        opponent = game.get_player("second")
+        ai = (ai_type or ProbabilityTargetingAI)(lengths, rng)
+        while opponent.get_ships():
+            started = time.perf_counter()
+            target = ai.choose_target()
+            total_time += time.perf_counter() - started
+            coords = opponent.get_player_grid().add_torpedo_hit(target)
+            hit_ship = opponent.receive_torpedo(coords)
+            started = time.perf_counter()
+            ai.observe(target, hit_ship is not None, hit_ship if hit_ship and hit_ship.get_is_sunk() else None)
+            total_time += time.perf_counter() - started
+            total_shots += 1
+    return total_shots / num_games, total_time / total_shots * 1e6
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure how quickly the targeting AIs sink a random fleet.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--monte-carlo", action="store_true", help="use MonteCarloTargetingAI")
+    parser.add_argument("--workers", type=int, default=None, help="sampling processes for --monte-carlo")
+    parser.add_argument("--budget", type=float, default=0.05, help="seconds of sampling per move for --monte-carlo")
+    parser.add_argument("--endgame", action="store_true", help="solve endgames exactly with --monte-carlo")
+    args = parser.parse_args()
+
+    if args.monte_carlo:
+        from ShipGame_endgame import EndgameSolver
+
+        shared_solver = EndgameSolver() if args.endgame else None
+        with MonteCarloSampler(args.workers, args.budget, seed=0) as shared_sampler:
+            mean_shots, micro_seconds = benchmark(args.games, ai_type=lambda lengths, rng: MonteCarloTargetingAI(
+                lengths, rng, shared_sampler, shared_solver))
+    else:
+        mean_shots, micro_seconds = benchmark(args.games)
+    print(f"mean shots to sink the fleet: {mean_shots:.2f}")
+    print(f"time per decision: {micro_seconds:.1f} us")
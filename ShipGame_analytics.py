@@ -0,0 +1,280 @@
+# Description: Aggregate statistics over any number of finished games: where torpedoes are fired and where they hit,
+# where ships are placed, how many torpedoes it takes to sink a ship of each length, and how often the player who
+# moves first wins. Games are streamed one at a time through generators and added to GameStats, whose counters are
+# NumPy arrays of fixed size, so memory does not grow with the number of games. Files of games are processed in
+# parallel, one file (shard) per task, and the partial GameStats of the shards are merged.
+#
+# Games can be read from move logs written by ShipGame_log.MoveLog, which give every statistic, or from ShipGame
+# objects and files of ShipGame.to_bytes() snapshots, which only hold the final boards: they give the torpedo and ship
+# square heatmaps and the results, but not the lengths of sunk ships or the order of the torpedoes.
+#
+# Squares are numbered as cells 0 to 99, as described next to COORD_CELLS in ShipGame.py.
+# Player "first" is index 0 and player "second" is index 1.
+#
+# Usage:
+#   python ShipGame_analytics.py moves1.log moves2.log ... [--workers N]
+#   python ShipGame_analytics.py --snapshots games1.bin games2.bin ... [--workers N]
+
+import mmap
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ShipGame import BitGameGrid, GamePool, iter_snapshots
+from ShipGame_log import FIRE_TORPEDO, iter_records
+
+STATE_NAMES = ("UNFINISHED", "FIRST_WON", "SECOND_WON")
+MAX_SHOTS = 255     # Ships sunk by a later torpedo are counted with the ships sunk by torpedo number MAX_SHOTS
+_PLAYERS = ("first", "second")
+_ORIENTATIONS = ("R", "C")
+_STATE_INDEX = {name: index for index, name in enumerate(STATE_NAMES)}
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+
+def _unpack_squares(packed):
+    """A private function that turns the packed squares of GameGrid.get_packed_squares() into an array holding the
+    code of every cell: 0 for water, 1 for an unhit ship square, 2 for a hit, and 3 for a miss.
+
+    Parameters: packed (int)
+
+    Returns: NumPy array of 100 uint8 codes
+    """
+    data = np.frombuffer(packed.to_bytes(25, "little"), dtype=np.uint8)
+    return ((data[:, None] >> _SHIFTS) & 3).reshape(100)
+
+
+class GameStats:
+    """Counters for a stream of games. Every counter is a NumPy array whose size does not depend on the number of
+    games:
+
+    states[state]                       games that ended in each state of STATE_NAMES
+    shots[player, cell]                 torpedoes fired by the player at each cell of the opponent's board
+    hits[player, cell]                  of those, torpedoes that hit an unhit ship square
+    ship_squares[player, cell]          games in which the player had a ship on the cell
+    ship_squares_by_length[length, cell]  ships of each length placed on the cell (move logs only)
+    sink_shots[length, shots]           ships of each length sunk by the attacker's torpedo number shots, counting
+                                        every torpedo the attacker fired in the game (move logs only)
+    """
+    def __init__(self):
+        """Creates empty counters."""
+        self.states = np.zeros(3, dtype=np.int64)
+        self.shots = np.zeros((2, 100), dtype=np.int64)
+        self.hits = np.zeros((2, 100), dtype=np.int64)
+        self.ship_squares = np.zeros((2, 100), dtype=np.int64)
+        self.ship_squares_by_length = np.zeros((11, 100), dtype=np.int64)
+        self.sink_shots = np.zeros((11, MAX_SHOTS + 1), dtype=np.int64)
+        self.rejected_records = 0
+
+    def get_num_games(self):
+        """Returns the number of games counted.
+
+        Parameters: None
+
+        Returns: number of games (int)
+        """
+        return int(self.states.sum())
+
+    def add_game(self, game):
+        """Counts one game from its final boards.
+
+        Parameters: game (ShipGame with 10 x 10 boards)
+
+        Returns: None
+        """
+        self.states[_STATE_INDEX[game.get_current_state()]] += 1
+        for index, player in enumerate(_PLAYERS):
+            grid = game.get_player(player).get_player_grid()
+            if grid.get_size() != (10, 10):
+                raise ValueError("statistics are only kept for 10 x 10 boards")
+            codes = _unpack_squares(grid.get_packed_squares())
+            # Torpedoes on this player's board were fired by the opponent
+            self.shots[1 - index] += codes >= 2
+            self.hits[1 - index] += codes == 2
+            self.ship_squares[index] += (codes == 1) | (codes == 2)
+
+    def add_games(self, games):
+        """Counts every game of an iterable, such as the generator returned by ShipGame.iter_snapshots().
+
+        Parameters: games (iterable of ShipGame objects)
+
+        Returns: self (GameStats)
+        """
+        for game in games:
+            self.add_game(game)
+        return self
+
+    def add_log(self, records):
+        """Counts the games of a move log by replaying them. Records of different games may be interleaved; a game
+        is counted and dropped as soon as it is won, so only the games still being played are kept in memory.
+        Games that are unfinished when the records run out are counted as unfinished. Records that the game
+        rejects are counted in rejected_records and skipped.
+
+        Parameters: records (iterable of records, such as the generator returned by ShipGame_log.iter_records())
+
+        Returns: self (GameStats)
+        """
+        pool = GamePool(BitGameGrid)
+        live = {}               # Maps game id to [ShipGame, torpedoes fired by first, torpedoes fired by second]
+        shots = []              # Flat indices into the counters, added with np.bincount() in batches
+        hits = []
+        ship_squares = []
+        ship_squares_by_length = []
+        sink_shots = []
+
+        def flush():
+            for counter, indices in ((self.shots, shots), (self.hits, hits), (self.ship_squares, ship_squares),
+                                     (self.ship_squares_by_length, ship_squares_by_length),
+                                     (self.sink_shots, sink_shots)):
+                if indices:
+                    counter += np.bincount(indices, minlength=counter.size).reshape(counter.shape)
+                    indices.clear()
+
+        for game_id, kind, player, length, orientation, row, column in records:
+            entry = live.get(game_id)
+            if entry is None:
+                entry = live[game_id] = [pool.acquire(), 0, 0]
+            game = entry[0]
+            cell = (row - 1) * 10 + column - 1
+            if kind == FIRE_TORPEDO:
+                target_player = game.get_player(_PLAYERS[1 - player])
+                hit_ship = target_player.get_ship_at((row, column))
+                if not game.fire_torpedo(_PLAYERS[player], (row, column)):
+                    self.rejected_records += 1
+                    continue
+                entry[1 + player] += 1
+                shots.append(player * 100 + cell)
+                if hit_ship is not None:
+                    hits.append(player * 100 + cell)
+                    if hit_ship.get_is_sunk():
+                        sink_shots.append(hit_ship.get_length() * (MAX_SHOTS + 1) + min(entry[1 + player], MAX_SHOTS))
+                state = game.get_current_state()
+                if state != "UNFINISHED":
+                    self.states[_STATE_INDEX[state]] += 1
+                    pool.release(game)
+                    del live[game_id]
+            elif game.place_ship(_PLAYERS[player], length, (row, column), _ORIENTATIONS[orientation]):
+                for ship_row, ship_column in game.get_player(_PLAYERS[player]).get_ships()[-1].get_coords_on_grid():
+                    ship_cell = (ship_row - 1) * 10 + ship_column - 1
+                    ship_squares.append(player * 100 + ship_cell)
+                    ship_squares_by_length.append(length * 100 + ship_cell)
+            else:
+                self.rejected_records += 1
+            if len(shots) + len(ship_squares) >= 1 << 16:
+                flush()
+        self.states[_STATE_INDEX["UNFINISHED"]] += len(live)
+        flush()
+        return self
+
+    def merge(self, other):
+        """Adds the counters of another GameStats to this one.
+
+        Parameters: other (GameStats)
+
+        Returns: self (GameStats)
+        """
+        for name in ("states", "shots", "hits", "ship_squares", "ship_squares_by_length", "sink_shots"):
+            getattr(self, name)[...] += getattr(other, name)
+        self.rejected_records += other.rejected_records
+        return self
+
+    def first_mover_win_rate(self, z=1.96):
+        """Returns how often the player who moves first wins a finished game, with its Wilson score confidence
+        interval.
+
+        Parameters: z (float), 1.96 for a 95% interval
+
+        Returns: (proportion, lower bound, upper bound) as floats
+        """
+        from ShipGame_tournament import wilson_interval
+
+        finished = int(self.states[1] + self.states[2])
+        return wilson_interval(int(self.states[1]), finished, z)
+
+    def mean_sink_shots(self):
+        """Returns the mean number of torpedoes the attacker had fired when a ship of each length sank.
+
+        Parameters: None
+
+        Returns: dict mapping length (int) to mean (float), for the lengths of which a ship was sunk
+        """
+        means = {}
+        shot_numbers = np.arange(MAX_SHOTS + 1)
+        for length in range(2, 11):
+            count = self.sink_shots[length].sum()
+            if count:
+                means[length] = float((self.sink_shots[length] * shot_numbers).sum() / count)
+        return means
+
+
+def _analyze_shard(path, kind):
+    """A private function run by the worker processes to count the games of one file.
+
+    Parameters: path (str); kind (str), "log" or "snapshots"
+
+    Returns: GameStats
+    """
+    stats = GameStats()
+    if kind == "log":
+        return stats.add_log(iter_records(path))
+    with open(path, "rb") as snapshot_file:
+        if snapshot_file.seek(0, 2) == 0:
+            return stats
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return stats.add_games(iter_snapshots(mapped))
+
+
+def analyze_files(paths, kind="log", max_workers=None, on_shard=None):
+    """Counts the games of many files, one file per task, across a pool of worker processes, and merges the
+    results.
+
+    Parameters: paths (list of str); kind (str), "log" for move logs or "snapshots" for files of ShipGame.to_bytes()
+    snapshots; max_workers (int or None), 0 counts every file in this process; on_shard (function or None), called
+    with the merged GameStats each time a file is finished
+
+    Returns: GameStats
+    """
+    if kind not in ("log", "snapshots"):
+        raise ValueError(f"unknown kind of file: {kind}")
+    stats = GameStats()
+    if max_workers == 0:
+        for path in paths:
+            stats.merge(_analyze_shard(path, kind))
+            if on_shard is not None:
+                on_shard(stats)
+        return stats
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_analyze_shard, path, kind) for path in paths]
+        for future in as_completed(futures):
+            stats.merge(future.result())
+            if on_shard is not None:
+                on_shard(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Aggregate statistics over files of finished ShipGame games.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--snapshots", action="store_true", help="the files hold snapshots instead of move logs")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = analyze_files(args.files, "snapshots" if args.snapshots else "log", args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"{result.get_num_games()} games in {elapsed:.1f} s: "
+          + ", ".join(f"{name} {int(count)}" for name, count in zip(STATE_NAMES, result.states)))
+    rate, low, high = result.first_mover_win_rate()
+    print(f"first player wins {rate:.3f} [{low:.3f}, {high:.3f}] of finished games")
+    for sink_length, mean in result.mean_sink_shots().items():
+        print(f"    length {sink_length} ships sunk after {mean:.1f} torpedoes on average")
+    if result.rejected_records:
+        print(f"{result.rejected_records} rejected records skipped")
+    for title, counts in (("torpedoes fired", result.shots.sum(axis=0)),
+                          ("ship squares", result.ship_squares.sum(axis=0))):
+        print(title)
+        for board_row in counts.reshape(10, 10) / max(result.get_num_games(), 1):
+            print("    " + " ".join(f"{value:5.2f}" for value in board_row))
@@ -0,0 +1,269 @@
+# Description: A vectorized Battleship engine that plays many games at once. Each game follows the same rules as
+# ShipGame (see ShipGame.py), but the boards, hits, ships and game states of all games are stored as stacked NumPy
+# arrays, so one call to fire_torpedoes() applies one shot in every game in a single vectorized step. This is used to
+# evaluate strategies over very large numbers of games.
+#
+# Squares are numbered as cells 0 to 99, as described next to COORD_CELLS in ShipGame.py.
+# Player "first" is index 0 and player "second" is index 1.
+
+import numpy as np
+
+from ShipGame import find_legal_placement, get_legal_placements, _fleet_fits
+
+STATE_NAMES = ("UNFINISHED", "FIRST_WON", "SECOND_WON")
+_PLAYER_INDEX = {"first": 0, "second": 1}
+_MAX_SHIPS = 50     # A 10 x 10 board cannot hold more than 50 ships of length 2
+
+
+# Cells of every legal placement of each ship length, as arrays of shape (number of placements, length)
+_PLACEMENT_TABLE = {length: np.array([placement[3] for placement in get_legal_placements(length)], dtype=np.int16)
+                    for length in range(2, 11)}
+
+
+class BatchShipGame:
+    """Represents many games of Battleship played in lockstep. Every game follows the rules of ShipGame: ships are
+    placed without overlapping an unhit ship square, player "first" fires first, players alternate turns, repeated
+    shots at a square are allowed, and a player wins by sinking all of their opponent's ships.
+
+    The state of all games is held in stacked arrays: the ship id on every square (-1 for water), which squares have
+    been fired at, the number of unhit squares left on every ship, the number of ships left per player, the current
+    turn, and the game state (an index into STATE_NAMES).
+    """
+    def __init__(self, num_games):
+        """Creates num_games new, empty games.
+
+        Parameters: num_games (int)
+        """
+        self._num_games = num_games
+        self._ship_ids = np.full((num_games, 2, 100), -1, dtype=np.int8)
+        self._shots = np.zeros((num_games, 2, 100), dtype=bool)
+        self._remaining = np.zeros((num_games, 2, _MAX_SHIPS), dtype=np.int8)
+        self._ship_counts = np.zeros((num_games, 2), dtype=np.int16)     # Ships placed, used to assign ship ids
+        self._ships_left = np.zeros((num_games, 2), dtype=np.int16)
+        self._turns = np.zeros(num_games, dtype=np.int8)
+        self._states = np.zeros(num_games, dtype=np.int8)
+
+    def get_num_games(self):
+        """Returns the number of games in the batch.
+
+        Parameters: None
+
+        Returns: number of games (int)
+        """
+        return self._num_games
+
+    def place_ship(self, game, player, ship_length, ship_coords, ship_orientation):
+        """Attempts to place a ship on a player's board in one game of the batch, using the same rules and
+        coordinate format as ShipGame.place_ship().
+
+        A game holds at most _MAX_SHIPS ships per player; once a player's ship table is full, placing another ship
+        returns False, even over squares that have been fired at.
+
+        Parameters: game (int); player (str); ship_length (int); ship_coords (str such as "A1", cell number (int),
+        or (row, column) tuple); ship_orientation (str)
+
+        Returns: True (bool) if the ship was placed or False (bool) if the ship length or coordinates are invalid.
+        """
+        if 2 > ship_length or ship_length > 10:
+            return False
+        placement = find_legal_placement(ship_coords, ship_orientation, ship_length)
+        if placement is None:
+            return False
+        cells = list(placement[3])
+
+        board = _PLAYER_INDEX[player]
+        if self._ship_counts[game, board] >= _MAX_SHIPS:
+            return False
+        ship_ids = self._ship_ids[game, board]
+        shots = self._shots[game, board]
+        # Ships must not overlap any unhit square of another ship
+        if ((ship_ids[cells] >= 0) & ~shots[cells]).any():
+            return False
+
+        ship_id = self._ship_counts[game, board]
+        ship_ids[cells] = ship_id
+        shots[cells] = False    # A ship placed over a square that was already fired at starts out unhit
+        self._remaining[game, board, ship_id] = ship_length
+        self._ship_counts[game, board] += 1
+        self._ships_left[game, board] += 1
+        return True
+
+    def load_ship_boards(self, player, ship_ids):
+        """Replaces the player's board in every game with the given ship layouts. This is meant for setting up
+        games before any torpedo is fired, and does not validate the layouts.
+
+        Parameters: player (str); ship_ids (array of shape (num_games, 100) holding the ship id on every square,
+        numbered from 0, or -1 for water)
+
+        Returns: None
+        """
+        board = _PLAYER_INDEX[player]
+        ship_ids = np.asarray(ship_ids, dtype=np.int8)
+        self._ship_ids[:, board] = ship_ids
+        self._shots[:, board] = False
+
+        # Count the squares of every ship in every game with a single bincount over (game, ship id) pairs
+        games, cells = np.nonzero(ship_ids >= 0)
+        counts = np.bincount(games * _MAX_SHIPS + ship_ids[games, cells],
+                             minlength=self._num_games * _MAX_SHIPS).reshape(self._num_games, _MAX_SHIPS)
+        self._remaining[:, board] = counts
+        self._ship_counts[:, board] = ship_ids.max(axis=1) + 1
+        self._ships_left[:, board] = (counts > 0).sum(axis=1)
+
+    def fire_torpedoes(self, targets):
+        """Fires one torpedo in every game, from the player whose turn it is at the opponent's board. Torpedoes are
+        rejected in finished games and when the target is not on the board, exactly as ShipGame.fire_torpedo()
+        rejects them; a rejected torpedo does not change the game.
+
+        Parameters: targets (array of shape (num_games,) holding the target cell of every game, or -1 to skip a game)
+
+        Returns: array of shape (num_games,) holding True (bool) where the torpedo was accepted
+        """
+        targets = np.asarray(targets)
+        accepted = (self._states == 0) & (targets >= 0) & (targets < 100)
+        games = np.nonzero(accepted)[0]
+        shooters = self._turns[games]
+        boards = 1 - shooters
+        cells = targets[games]
+
+        ship_ids = self._ship_ids[games, boards, cells]
+        new_hits = (ship_ids >= 0) & ~self._shots[games, boards, cells]
+        self._shots[games, boards, cells] = True
+
+        # Every game fires at most one torpedo, so the (game, board, ship) indices below are all distinct
+        hit_games, hit_boards, hit_ships = games[new_hits], boards[new_hits], ship_ids[new_hits]
+        self._remaining[hit_games, hit_boards, hit_ships] -= 1
+        sunk = self._remaining[hit_games, hit_boards, hit_ships] == 0
+        self._ships_left[hit_games[sunk], hit_boards[sunk]] -= 1
+
+        won = self._ships_left[games, boards] == 0
+        self._states[games[won]] = shooters[won] + 1
+        self._turns[games[~won]] = boards[~won]
+        return accepted
+
+    def get_state_codes(self):
+        """Returns the state of every game as an index into STATE_NAMES.
+
+        Parameters: None
+
+        Returns: array of shape (num_games,) holding 0 (UNFINISHED), 1 (FIRST_WON) or 2 (SECOND_WON)
+        """
+        return self._states
+
+    def get_current_state(self, game):
+        """Returns the current state of one game.
+
+        Parameters: game (int)
+
+        Returns: FIRST_WON (str), SECOND_WON (str), or UNFINISHED (str)
+        """
+        return STATE_NAMES[self._states[game]]
+
+    def get_current_turns(self):
+        """Returns whose turn it is in every game.
+
+        Parameters: None
+
+        Returns: array of shape (num_games,) holding 0 for "first" or 1 for "second"
+        """
+        return self._turns
+
+    def get_num_ships_remaining(self, player):
+        """Returns the number of ships the specified player has left in every game.
+
+        Parameters: player (str)
+
+        Returns: array of shape (num_games,)
+        """
+        return self._ships_left[:, _PLAYER_INDEX[player]]
+
+    def get_shots(self, player):
+        """Returns which squares of the player's board have been fired at in every game.
+
+        Parameters: player (str)
+
+        Returns: bool array of shape (num_games, 100)
+        """
+        return self._shots[:, _PLAYER_INDEX[player]]
+
+
+def random_ship_boards(num_games, lengths, rng, max_attempts=10000):
+    """Generates a uniformly random, non-overlapping layout of the given ship lengths for each of num_games boards.
+    Every ship of every board is drawn uniformly from all of its placements; boards whose ships overlap are redrawn
+    as a whole, so every layout is equally likely. A fleet that cannot fit on the board raises ValueError without
+    sampling, as in ShipGame.random_fleet(), and so does a fleet so dense that some board is still overlapping
+    after max_attempts draws.
+
+    Parameters: num_games (int); lengths (list of ints from 2 to 10); rng (numpy.random.Generator);
+    max_attempts (int)
+
+    Returns: array of shape (num_games, 100) holding the ship id on every square, or -1 for water
+    """
+    for length in lengths:
+        if not 2 <= length <= 10:
+            raise ValueError(f"invalid ship length: {length}")
+    if sum(lengths) > 100 or _fleet_fits(tuple(sorted(lengths, reverse=True))) is False:
+        raise ValueError("fleet does not fit on a 10 x 10 board")
+    boards = np.full((num_games, 100), -1, dtype=np.int8)
+    pending = np.arange(num_games)
+    for _ in range(max_attempts):
+        if not len(pending):
+            return boards
+        draw = np.full((len(pending), 100), -1, dtype=np.int8)
+        rows = np.arange(len(pending))[:, None]
+        fleet_cells = []
+        for ship_id, length in enumerate(lengths):
+            placements = _PLACEMENT_TABLE[length]
+            cells = placements[rng.integers(0, len(placements), size=len(pending))]
+            draw[rows, cells] = ship_id
+            fleet_cells.append(cells)
+        # A layout is valid when no cell appears twice among the cells of all of its ships
+        fleet_cells = np.sort(np.concatenate(fleet_cells, axis=1), axis=1)
+        valid = ~(fleet_cells[:, 1:] == fleet_cells[:, :-1]).any(axis=1)
+        boards[pending[valid]] = draw[valid]
+        pending = pending[~valid]
+    if len(pending):
+        raise ValueError(f"no layout found for the fleet in {max_attempts} attempts")
+    return boards
+
+
+def simulate_random_games(num_games, lengths, seed=None, chunk_size=100000):
+    """Plays num_games games in which both players use a random layout of the given ship lengths and fire at the
+    opponent's squares in a random order without repeating a square. Games are played chunk_size at a time to bound
+    memory use.
+
+    Parameters: num_games (int); lengths (list of ints); seed (int or None); chunk_size (int)
+
+    Returns: dict with "FIRST_WON", "SECOND_WON" and "UNFINISHED" game counts (int) and "shots", an array holding
+    the number of torpedoes the winner fired in every game
+    """
+    rng = np.random.default_rng(seed)
+    results = {name: 0 for name in STATE_NAMES}
+    shots = []
+    for start in range(0, num_games, chunk_size):
+        size = min(chunk_size, num_games - start)
+        batch = BatchShipGame(size)
+        batch.load_ship_boards("first", random_ship_boards(size, lengths, rng))
+        batch.load_ship_boards("second", random_ship_boards(size, lengths, rng))
+
+        # Every player fires at the opponent's squares in the order of a random permutation
+        firing_order = np.argsort(rng.random((size, 2, 100), dtype=np.float32), axis=2).astype(np.int16)
+        shots_fired = np.zeros((size, 2), dtype=np.int16)
+        games = np.arange(size)
+        for _ in range(200):
+            unfinished = batch.get_state_codes() == 0
+            if not unfinished.any():
+                break
+            turns = batch.get_current_turns()
+            next_shot = np.minimum(shots_fired[games, turns], 99)
+            targets = np.where(unfinished, firing_order[games, turns, next_shot], -1)
+            accepted = batch.fire_torpedoes(targets)
+            shots_fired[games[accepted], turns[accepted]] += 1
+
+        states = batch.get_state_codes()
+        for code, name in enumerate(STATE_NAMES):
+            results[name] += int((states == code).sum())
+        finished = states > 0
+        shots.append(shots_fired[games[finished], states[finished] - 1])
+    results["shots"] = np.concatenate(shots) if shots else np.zeros(0, dtype=np.int16)
+    return results
@@ -0,0 +1,232 @@
+# Description: Benchmarks for ShipGame. Each benchmark times one operation (placing a ship or a fleet, firing a
+# torpedo that misses, hits, sinks a ship or wins the game, firing a whole game's moves with fire_sequence(), showing
+# a board, or playing a whole game) on freshly prepared games, and reports operations per second, memory blocks
+# allocated and kept per operation, and peak memory per operation as measured by tracemalloc. Results can be saved as
+# a JSON baseline, and two saved runs can be compared to flag regressions.
+#
+# Usage:
+#   python ShipGame_benchmarks.py [--quick] [--only NAME ...] [--save results.json]
+#   python ShipGame_benchmarks.py --compare baseline.json results.json [--threshold 0.1]
+
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from ShipGame import ShipGame, GameGrid, BitGameGrid, random_fleet
+
+FLEET = [5, 4, 3, 3, 2]
+_TARGETS = [row + str(column) for row in "ABCDEFGHIJ" for column in range(1, 11)]
+
+
+def _new_game_with_ships(first_ships, second_ships, grid_type=GameGrid):
+    """A private function that creates a game with the given (length, coordinate, orientation) ships."""
+    game = ShipGame(grid_type)
+    for placement in first_ships:
+        game.place_ship("first", *placement)
+    for placement in second_ships:
+        game.place_ship("second", *placement)
+    return game
+
+
+def _play_random_game(rng):
+    """A private function that plays one game with random fleets and random firing orders."""
+    game = ShipGame()
+    game.load_fleet("first", random_fleet(FLEET, rng))
+    game.load_fleet("second", random_fleet(FLEET, rng))
+    orders = {"first": rng.sample(_TARGETS, 100), "second": rng.sample(_TARGETS, 100)}
+    player = "first"
+    while game.get_current_state() == "UNFINISHED":
+        game.fire_torpedo(player, orders[player].pop())
+        player = "second" if player == "first" else "first"
+    return game
+
+
+def _game_with_moves(rng):
+    """A private function that creates a game with random fleets, and the alternating moves of a random game."""
+    game = ShipGame()
+    game.load_fleet("first", random_fleet(FLEET, rng))
+    game.load_fleet("second", random_fleet(FLEET, rng))
+    first_targets = rng.sample(_TARGETS, 100)
+    second_targets = rng.sample(_TARGETS, 100)
+    moves = []
+    for first_target, second_target in zip(first_targets, second_targets):
+        moves.append(("first", first_target))
+        moves.append(("second", second_target))
+    return game, moves
+
+
+def _game_before_last_shot(second_ships):
+    """A private function that creates a game in which the first player has hit one square of a ship of length 2
+    at C3 and the second player has missed, so the first player's next torpedo, at C4, sinks the ship."""
+    game = _new_game_with_ships([(2, "A1", "R")], second_ships)
+    game.fire_torpedo("first", "C3")
+    game.fire_torpedo("second", "J10")
+    return game
+
+
+def _rendered_game(rng):
+    """A private function that creates a game with one ship and renders the first player's board for the opponent,
+    so the board's rendered rows are cached."""
+    game = _new_game_with_ships(_ONE_SHIP, [])
+    game.render_game_grid("first", True)
+    return game
+
+
+# Every benchmark is (setup, operation): setup(rng) builds the state for one operation, and operation(state) runs it
+_NEAR_FULL = [(10, row + "1", "R") for row in "ABCDEFGHI"]
+_ONE_SHIP = [(3, "C3", "R")]
+BENCHMARKS = {
+    "add_ship_to_grid": (lambda rng: GameGrid(),
+                         lambda grid: grid.add_ship_to_grid("C3", "R", 4)),
+    "add_ship_to_grid_bit": (lambda rng: BitGameGrid(),
+                             lambda grid: grid.add_ship_to_grid("C3", "R", 4)),
+    "place_ship_empty": (lambda rng: ShipGame(),
+                         lambda game: game.place_ship("first", 4, "C3", "R")),
+    "place_ship_near_full": (lambda rng: _new_game_with_ships(_NEAR_FULL, []),
+                             lambda game: game.place_ship("first", 10, "J1", "R")),
+    "place_fleet": (lambda rng: (ShipGame(), random_fleet(FLEET, rng)),
+                    lambda state: state[0].place_fleet("first", state[1])),
+    "fire_torpedo_miss": (lambda rng: _new_game_with_ships([], _ONE_SHIP),
+                          lambda game: game.fire_torpedo("first", "J10")),
+    "fire_torpedo_hit": (lambda rng: _new_game_with_ships([], _ONE_SHIP),
+                         lambda game: game.fire_torpedo("first", "C3")),
+    "fire_torpedo_sink": (lambda rng: _game_before_last_shot([(2, "C3", "R"), (2, "J1", "R")]),
+                          lambda game: game.fire_torpedo("first", "C4")),
+    "fire_torpedo_win": (lambda rng: _game_before_last_shot([(2, "C3", "R")]),
+                         lambda game: game.fire_torpedo("first", "C4")),
+    "fire_sequence_game": (lambda rng: _game_with_moves(rng),
+                           lambda state: state[0].fire_sequence(state[1])),
+    "show_game_grid": (lambda rng: _play_random_game(rng),
+                       lambda game: game.show_game_grid("first")),
+    "render_game_grid_one_change": (lambda rng: _rendered_game(rng),
+                                    lambda game: (game.get_player("first").get_player_grid().add_torpedo_hit("J10"),
+                                                  game.render_game_grid("first", True))),
+    "full_random_game": (lambda rng: rng,
+                         _play_random_game),
+}
+
+
+def run_benchmark(name, num_ops=2000, rounds=5, seed=0):
+    """Runs one benchmark. Each round prepares num_ops fresh states, then times running the operation once on each.
+    A final round runs under tracemalloc to measure memory.
+
+    Parameters: name (str), a key of BENCHMARKS; num_ops (int); rounds (int); seed (int)
+
+    Returns: dict with "ops_per_sec" (median over rounds), "best_ops_per_sec", "blocks_per_op" (memory blocks
+    allocated by each operation and still alive when it returns, including its return value),
+    "retained_blocks_per_op" (the blocks each operation leaves allocated in its state once its return value is
+    released), and "peak_bytes_per_op" (the mean of how far each operation raised memory use above where it
+    started, which includes temporaries freed before it returned)
+    """
+    setup, operation = BENCHMARKS[name]
+    rng = random.Random(seed)
+    rates = []
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        for _ in range(rounds):
+            states = [setup(rng) for _ in range(num_ops)]
+            started = time.perf_counter()
+            for state in states:
+                operation(state)
+            rates.append(num_ops / (time.perf_counter() - started))
+            output.seek(0)
+            output.truncate()
+
+        states = [setup(rng) for _ in range(num_ops)]
+        results = [None] * num_ops
+        peak_total = 0
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        get_traced_memory = tracemalloc.get_traced_memory
+        reset_peak = tracemalloc.reset_peak
+        for index, state in enumerate(states):
+            start_memory = get_traced_memory()[0]
+            reset_peak()
+            results[index] = operation(state)
+            peak_total += get_traced_memory()[1] - start_memory
+        # Blocks freed inside an operation cannot be counted by tracemalloc; they are seen in the peak instead
+        allocated = tracemalloc.take_snapshot()
+        del results
+        retained = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    allocated_blocks = sum(stat.count_diff for stat in allocated.compare_to(before, "filename"))
+    retained_blocks = sum(stat.count_diff for stat in retained.compare_to(before, "filename"))
+    return {"ops_per_sec": statistics.median(rates), "best_ops_per_sec": max(rates),
+            "blocks_per_op": allocated_blocks / num_ops, "retained_blocks_per_op": retained_blocks / num_ops,
+            "peak_bytes_per_op": peak_total / num_ops}
+
+
+def run_all(names=None, quick=False, seed=0):
+    """Runs the selected benchmarks, or all of them.
+
+    Parameters: names (list of str or None); quick (bool), run fewer operations; seed (int)
+
+    Returns: dict with "python", "platform", and "results" mapping benchmark name to its results
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        num_ops = 200 if quick else 2000
+        if name == "full_random_game":
+            num_ops //= 10
+        results[name] = run_benchmark(name, num_ops, 3 if quick else 5, seed)
+    return {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compares two benchmark runs. A benchmark regressed if its median operations per second dropped by more than
+    threshold, or its blocks kept per operation grew by more than one.
+
+    Parameters: baseline (dict from run_all()); current (dict from run_all()); threshold (float)
+
+    Returns: list of (name, baseline ops/sec, current ops/sec, change, regressed (bool)) tuples
+    """
+    rows = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None:
+            continue
+        change = new["ops_per_sec"] / old["ops_per_sec"] - 1
+        regressed = change < -threshold or new["blocks_per_op"] > old["blocks_per_op"] + 1
+        rows.append((name, old["ops_per_sec"], new["ops_per_sec"], change, regressed))
+    return rows
+
+
+def _print_results(report):
+    """A private function that prints the results of run_all() as a table."""
+    print(f"{'benchmark':<24}{'ops/sec':>14}{'best':>14}{'blocks/op':>12}{'kept/op':>12}{'peak B/op':>12}")
+    for name, result in report["results"].items():
+        print(f"{name:<24}{result['ops_per_sec']:>14,.0f}{result['best_ops_per_sec']:>14,.0f}"
+              f"{result['blocks_per_op']:>12.2f}{result.get('retained_blocks_per_op', 0.0):>12.2f}"
+              f"{result['peak_bytes_per_op']:>12.0f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark ShipGame operations.")
+    parser.add_argument("--quick", action="store_true", help="run fewer operations per benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--save", help="save the results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two saved runs")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as baseline_file, open(args.compare[1]) as current_file:
+            comparison = compare(json.load(baseline_file), json.load(current_file), args.threshold)
+        for name, old_rate, new_rate, rate_change, is_regression in comparison:
+            flag = "REGRESSION" if is_regression else ""
+            print(f"{name:<24}{old_rate:>14,.0f}{new_rate:>14,.0f}{rate_change:>+10.1%}  {flag}")
+        sys.exit(1 if any(row[4] for row in comparison) else 0)
+
+    benchmark_report = run_all(args.only, args.quick)
+    _print_results(benchmark_report)
+    if args.save:
+        with open(args.save, "w") as save_file:
+            json.dump(benchmark_report, save_file, indent=2)
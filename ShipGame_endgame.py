@@ -0,0 +1,297 @@
+# Description: An exact endgame solver for the player firing torpedoes. When few opponent fleets are still consistent
+# with the torpedo results seen so far, EndgameSolver lists every such fleet and searches all firing orders for the
+# one that sinks the remaining ships in the fewest torpedoes on average, counting every consistent fleet as equally
+# likely. The search looks ahead at every possible result of every torpedo (a miss, a hit, or sinking a particular
+# ship) and remembers the value of every board it has solved in a transposition table of bounded size that evicts the
+# least recently used boards, so positions reached again on later moves are not searched twice. Boards are stored in a
+# canonical form that only keeps the squares some consistent fleet can still use, moved to the top left corner, so
+# the same endgame in another part of the grid, or after misses elsewhere, is found in the table too.
+#
+# A board is described by the lengths of the remaining ships, a mask of the cells that cannot hold one of them (misses
+# and the squares of sunk ships), and a mask of the hits that are not part of a sunk ship yet. Squares are numbered
+# as cells 0 to 99, as described next to COORD_CELLS in ShipGame.py.
+
+import time
+from collections import OrderedDict
+
+from ShipGame_ai import PLACEMENT_MASKS
+
+
+class _SolverBudgetExceeded(Exception):
+    """Raised inside EndgameSolver when a search runs out of layouts or time."""
+
+
+def board_from_game(game, player):
+    """Describes the opponent's board as the given player sees it: the lengths of the opponent's remaining ships,
+    taken from Player.get_ships(), the cells that cannot hold one of them, and the unresolved hits. A hit square
+    that is not covered by a remaining ship belongs to a sunk ship.
+
+    Parameters: game (ShipGame with 10 x 10 boards); player (str), the player firing the torpedoes
+
+    Returns: (lengths (tuple of ints), blocked (int), hits (int)) tuple
+    """
+    opponent = game.get_player("second" if player == "first" else "first")
+    afloat = 0
+    for ship in opponent.get_ships():
+        for row, column in ship.get_coords_on_grid():
+            afloat |= 1 << ((row - 1) * 10 + column - 1)
+    blocked = 0
+    hits = 0
+    grid = opponent.get_player_grid()
+    for row in range(1, 11):
+        for column in range(1, 11):
+            symbol = grid.get_square((row, column))
+            cell = 1 << ((row - 1) * 10 + column - 1)
+            if symbol == "*" or (symbol == "X" and not afloat & cell):
+                blocked |= cell
+            elif symbol == "X":
+                hits |= cell
+    return tuple(sorted((ship.get_length() for ship in opponent.get_ships()), reverse=True)), blocked, hits
+
+
+def _cells(mask):
+    """A private generator that yields the cells of a mask in increasing order.
+
+    Parameters: mask (int)
+
+    Returns: generator of cells (ints)
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class EndgameSolver:
+    """Finds the torpedo that minimizes the expected number of torpedoes needed to sink every remaining ship.
+
+    The solver only answers when the number of consistent fleets is at most max_layouts and the search finishes
+    within time_budget seconds; otherwise solve() returns None and the caller should choose the target some other
+    way. Values found before a search is stopped are exact and stay in the transposition table.
+    """
+    def __init__(self, max_layouts=64, time_budget=0.002, max_entries=100000):
+        """Creates a solver with an empty transposition table.
+
+        Parameters: max_layouts (int), the most consistent fleets a board may have to be solved; time_budget (float),
+        seconds a call to solve() may search; max_entries (int), the most boards kept in the transposition table
+        """
+        self._max_layouts = max_layouts
+        self._time_budget = time_budget
+        self._max_entries = max_entries
+        # Maps canonical boards to (expected torpedoes, best cell), or to (lower bound, None) for boards on which a
+        # search was cut off
+        self._table = OrderedDict()
+        self._deadline = 0.0
+        self._num_nodes = 0
+
+    def get_table_size(self):
+        """Returns the number of boards in the transposition table.
+
+        Parameters: None
+
+        Returns: number of boards (int)
+        """
+        return len(self._table)
+
+    def solve(self, lengths, blocked, hits):
+        """Finds the best torpedo for a board.
+
+        Parameters: lengths (list of ints), the remaining ships; blocked (int), mask of cells that cannot hold a
+        remaining ship; hits (int), mask of unresolved hits
+
+        Returns: (expected number of torpedoes to sink every remaining ship (float), best target as a (row, column)
+        tuple) tuple, or None if there are too many consistent fleets or the search ran out of time. The target is
+        None if no ship remains.
+        """
+        lengths = tuple(sorted(lengths, reverse=True))
+        self._deadline = time.perf_counter() + self._time_budget
+        self._num_nodes = 0
+        try:
+            layouts = self._find_layouts(lengths, blocked, hits)
+            if not layouts:
+                return None
+            value, cell = self._search(lengths, blocked, hits, layouts, float("inf"))
+        except _SolverBudgetExceeded:
+            return None
+        return value, None if cell is None else (cell // 10 + 1, cell % 10 + 1)
+
+    def _check_budget(self, interval=64):
+        """A private method that stops the search when it runs out of time. The clock is read every interval calls,
+        which must be a power of two.
+        """
+        self._num_nodes += 1
+        if not self._num_nodes & (interval - 1) and time.perf_counter() > self._deadline:
+            raise _SolverBudgetExceeded()
+
+    def _find_layouts(self, lengths, blocked, hits):
+        """A private method that lists every fleet of the given lengths that is consistent with the board: no ship
+        covers a blocked cell, ships do not overlap, every unresolved hit is covered, and no ship has every one of
+        its cells hit, since it would have been sunk.
+
+        Parameters: lengths (tuple of ints, longest first); blocked (int); hits (int)
+
+        Returns: list of fleets, each a tuple of (length, mask) pairs
+
+        Raises _SolverBudgetExceeded if there are more than max_layouts fleets or the time runs out.
+        """
+        layouts = []
+        num_ships = len(lengths)
+        fleet = []
+
+        def place(index, occupied, first_option):
+            self._check_budget()
+            if index == num_ships:
+                if hits & ~occupied == 0:
+                    layouts.append(tuple(fleet))
+                    if len(layouts) > self._max_layouts:
+                        raise _SolverBudgetExceeded()
+                return
+            length = lengths[index]
+            # Each uncovered hit must be covered by one of the ships still to be placed
+            if bin(hits & ~occupied).count("1") > sum(lengths[index:]):
+                return
+            masks = PLACEMENT_MASKS[length]
+            for option in range(first_option, len(masks)):
+                mask = masks[option]
+                if mask & occupied or mask & ~hits == 0:
+                    continue
+                fleet.append((length, mask))
+                # Ships of the same length are placed in increasing order so each fleet is listed once
+                same_length = index + 1 < num_ships and lengths[index + 1] == length
+                place(index + 1, occupied | mask, option + 1 if same_length else 0)
+                fleet.pop()
+
+        place(0, blocked, 0)
+        return layouts
+
+    def _search(self, lengths, blocked, hits, layouts, bound):
+        """A private method that returns the expected number of torpedoes needed to sink every remaining ship with
+        the best firing order, and the first torpedo of that order, for the consistent fleets given. Every fleet is
+        equally likely. Targets that cannot beat bound are not searched further, and a board on which no target
+        beats bound is stored in the transposition table with bound as a lower bound on its value.
+
+        Parameters: lengths (tuple of ints, longest first); blocked (int); hits (int); layouts (list of fleets);
+        bound (float)
+
+        Returns: (expected torpedoes (float), best cell (int)) tuple, or (bound, None) if no target beats bound
+        """
+        if not lengths:
+            return 0.0, None
+        total = len(layouts)
+        occupied = [0] * total
+        union = 0
+        for index, layout in enumerate(layouts):
+            for _, mask in layout:
+                occupied[index] |= mask
+            union |= occupied[index]
+
+        # The fleets are exactly those that fit in their union of squares, so the board is canonicalized by keeping
+        # only the torpedoes fired inside the union and moving the union to the top left corner. Boards that differ
+        # only in squares no remaining fleet can use, or by where on the grid they are, then share a table entry.
+        union_cells = list(_cells(union))
+        shift = union_cells[0] // 10 * 10 + min(cell % 10 for cell in union_cells)
+        key = (lengths, union >> shift, (blocked & union) >> shift, hits >> shift)
+        entry = self._table.get(key)
+        known_bound = 0.0
+        if entry is not None:
+            self._table.move_to_end(key)
+            if entry[1] is not None:
+                return entry[0], entry[1] + shift
+            if entry[0] >= bound:
+                return bound, None
+            known_bound = entry[0]
+        self._check_budget(1)       # A board can have thousands of fleets, so the clock is read at every board
+
+        fired = blocked | hits
+        candidates = union & ~fired
+        certain = candidates
+        unfired = 0
+        for mask in occupied:
+            certain &= mask
+            unfired += bin(mask & ~fired).count("1")
+        if certain:
+            # A square that holds a ship in every fleet must be fired at sooner or later, and firing at it first
+            # only tells us more, so it is as good as any other target and the rest need not be searched
+            candidates = certain & -certain
+        # Every unfired square of the true fleet must still be fired at
+        lower_bound = max(unfired / total, known_bound)
+
+        if total == 1:
+            cells = occupied[0] & ~fired
+            result = (float(bin(cells).count("1")), (cells & -cells).bit_length() - 1)
+        else:
+            # Fire first at the squares covered by the most fleets, which usually gives the tightest bound early
+            order = sorted((-sum(1 for mask in occupied if mask >> cell & 1), cell) for cell in _cells(candidates))
+            best_value, best_cell = bound, None
+            for _, cell in order:
+                if lower_bound >= best_value:
+                    break
+                value = 1 + self._value_after(lengths, blocked, hits, layouts, occupied, cell, best_value - 1)
+                if value < best_value:
+                    best_value, best_cell = value, cell
+            result = (best_value, best_cell)
+
+        # A board on which no target beat bound is stored with bound as a lower bound on its value
+        self._table[key] = (result[0], None if result[1] is None else result[1] - shift)
+        if len(self._table) > self._max_entries:
+            self._table.popitem(last=False)
+        return result
+
+    def _value_after(self, lengths, blocked, hits, layouts, occupied, cell, bound):
+        """A private method that returns the expected number of torpedoes still needed after firing at one cell,
+        averaged over the results the torpedo can have. It stops early, returning a value that is not below bound,
+        once the average cannot be below bound.
+
+        Parameters: lengths; blocked; hits; layouts; occupied (list of masks, one per fleet); cell (int);
+        bound (float)
+
+        Returns: expected torpedoes (float)
+        """
+        square = 1 << cell
+        total = len(layouts)
+        outcomes = {}       # Maps the result of the torpedo to the fleets that give it
+        for index, layout in enumerate(layouts):
+            if not occupied[index] & square:
+                outcomes.setdefault(None, []).append(layout)
+                continue
+            for ship_index, (length, mask) in enumerate(layout):
+                if mask & square:
+                    if mask & ~(hits | square) == 0:
+                        outcomes.setdefault((length, mask), []).append(layout[:ship_index] + layout[ship_index + 1:])
+                    else:
+                        outcomes.setdefault(True, []).append(layout)
+                    break
+
+        # A lower bound on the weighted value of each result, used to give up on this cell as soon as it cannot win
+        after_fired = blocked | hits | square
+        bounds = {}
+        for outcome, fleets in outcomes.items():
+            unfired = 0
+            for fleet in fleets:
+                for _, mask in fleet:
+                    unfired += bin(mask & ~after_fired).count("1")
+            bounds[outcome] = unfired / total
+        expected = 0.0
+        remaining_bound = sum(bounds.values())
+
+        for outcome, fleets in outcomes.items():
+            remaining_bound -= bounds[outcome]
+            weight = len(fleets) / total
+            if outcome is None:
+                child = (lengths, blocked | square, hits)
+            elif outcome is True:
+                child = (lengths, blocked, hits | square)
+            else:
+                length, mask = outcome
+                child_lengths = list(lengths)
+                child_lengths.remove(length)
+                child = (tuple(child_lengths), blocked | mask, hits & ~mask)
+            # The bound passed on is the most this result may cost for the cell to still beat bound
+            child_bound = (bound - expected - remaining_bound) / weight
+            value, child_cell = self._search(child[0], child[1], child[2], fleets, child_bound)
+            if child_cell is None and child[0]:
+                return bound        # The result cannot cost less than child_bound
+            expected += weight * value
+            if expected + remaining_bound >= bound:
+                return expected + remaining_bound
+        return expected
@@ -0,0 +1,172 @@
+# Description: A stream of small events describing what each torpedo of a ShipGame did, for spectators that follow a
+# game without reading its boards. A game publishes to a GameEventStream after ShipGame.set_event_stream() is called.
+# Each event is a dict with a sequence number, starting at 1, and a type:
+#   {"seq": 1, "type": "miss", "player": "first", "target": [row, column]}
+#   {"seq": 2, "type": "hit", "player": "second", "target": [row, column]}
+#   {"seq": 3, "type": "sunk", "player": "first", "target": [row, column], "cells": [[row, column], ...]}
+#   {"seq": 4, "type": "game_over", "state": "FIRST_WON"}
+#   {"seq": 5, "type": "undo", "player": "first", "target": [row, column], "square": " "}
+# "player" is the player who fired and the target is on the opponent's board. An undo event sets the target square
+# back to the symbol it had before the torpedo, as the opponent sees it (unhit ships are shown as water); a sunk ship
+# that was undone is afloat again. Every event is encoded as a JSON line once, when it is published, so sending it to
+# many watchers costs the size of the event rather than the size of the board.
+#
+# The most recent events are kept in a ring buffer, so a watcher that joins late or reconnects can resume from the
+# last sequence number it saw, as long as the events it missed are still in the buffer.
+
+import json
+
+
+class GameEventStream:
+    """Numbers the events of one game, keeps the most recent ones in a ring buffer of fixed size, and passes each
+    new event to the subscribed callbacks.
+    """
+    def __init__(self, capacity=1024):
+        """Creates an empty stream.
+
+        Parameters: capacity (int), the number of most recent events kept for watchers that resume
+        """
+        if capacity < 1:
+            raise ValueError(f"invalid capacity: {capacity}")
+        self._capacity = capacity
+        self._events = [None] * capacity    # Event number seq is kept in slot seq % capacity as (event, line)
+        self._last_seq = 0
+        self._subscribers = {}              # Maps subscription id to callback
+        self._next_subscription = 1
+
+    def get_last_seq(self):
+        """Returns the sequence number of the most recent event.
+
+        Parameters: None
+
+        Returns: sequence number (int), 0 if no event has been published
+        """
+        return self._last_seq
+
+    def get_first_seq(self):
+        """Returns the sequence number of the oldest event still in the buffer.
+
+        Parameters: None
+
+        Returns: sequence number (int)
+        """
+        return max(1, self._last_seq - self._capacity + 1)
+
+    def publish(self, event):
+        """Numbers an event, adds it to the buffer, and passes it to every subscriber.
+
+        Parameters: event (dict), without "seq"
+
+        Returns: the numbered event (dict)
+        """
+        self._last_seq += 1
+        event["seq"] = self._last_seq
+        line = json.dumps(event).encode() + b"\n"
+        self._events[self._last_seq % self._capacity] = (event, line)
+        for callback in list(self._subscribers.values()):
+            callback(event, line)
+        return event
+
+    def publish_torpedo(self, player, target, symbol, hit_ship, game_state):
+        """Publishes the events for one accepted torpedo: a miss, hit, or sunk event, followed by a game over event
+        if the torpedo ended the game. It is called by ShipGame.fire_torpedo().
+
+        Parameters: player (str), the player who fired; target ((row, column) tuple); symbol (str), the target
+        square after the torpedo, "X" for a hit; hit_ship (the Ship hit by the torpedo, or None if it hit water or a
+        square that was already hit); game_state (str), after the torpedo
+
+        Returns: None
+        """
+        event = {"type": "hit" if symbol == "X" else "miss", "player": player, "target": list(target)}
+        if hit_ship is not None and hit_ship.get_is_sunk():
+            event["type"] = "sunk"
+            event["cells"] = [list(cell) for cell in hit_ship.get_coords_on_grid()]
+        self.publish(event)
+        if game_state != "UNFINISHED":
+            self.publish({"type": "game_over", "state": game_state})
+
+    def publish_undo(self, player, target, symbol):
+        """Publishes the event for a torpedo that was taken back. It is called by ShipGame.undo_last_torpedo().
+
+        Parameters: player (str), the player who fired the torpedo; target ((row, column) tuple); symbol (str), the
+        symbol the target square has again
+
+        Returns: None
+        """
+        square = " " if symbol == "S" else symbol
+        self.publish({"type": "undo", "player": player, "target": list(target), "square": square})
+
+    def _get_since(self, seq):
+        """A private method that returns the buffered (event, line) pairs published after event number seq.
+
+        Parameters: seq (int)
+
+        Returns: list of (event, line) tuples, or None if some of those events are no longer in the buffer
+        """
+        if seq < self.get_first_seq() - 1:
+            return None
+        events = self._events
+        capacity = self._capacity
+        return [events[num % capacity] for num in range(max(seq, 0) + 1, self._last_seq + 1)]
+
+    def events_since(self, seq):
+        """Returns the events published after event number seq, for a watcher that last saw event seq. A watcher
+        that has seen nothing passes 0.
+
+        Parameters: seq (int)
+
+        Returns: list of events (dicts), or None if some of them are no longer in the buffer, in which case the
+        watcher has to read the boards again
+        """
+        pairs = self._get_since(seq)
+        return None if pairs is None else [event for event, _ in pairs]
+
+    def lines_since(self, seq):
+        """Returns the events published after event number seq as JSON lines, as events_since() does.
+
+        Parameters: seq (int)
+
+        Returns: bytes, or None if some of the events are no longer in the buffer
+        """
+        pairs = self._get_since(seq)
+        return None if pairs is None else b"".join([line for _, line in pairs])
+
+    def subscribe(self, callback, since=None):
+        """Calls callback(event, line) for every event published from now on, where line is the event encoded as a
+        JSON line. If since is given, the buffered events published after event number since are passed to the
+        callback first, so a watcher can resume without missing an event.
+
+        Parameters: callback (function); since (int or None)
+
+        Returns: subscription id (int), for unsubscribe()
+
+        Raises ValueError if events after since are no longer in the buffer.
+        """
+        if since is not None:
+            missed = self._get_since(since)
+            if missed is None:
+                raise ValueError(f"events after {since} are no longer buffered")
+            for event, line in missed:
+                callback(event, line)
+        subscription = self._next_subscription
+        self._next_subscription += 1
+        self._subscribers[subscription] = callback
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stops calling the callback of a subscription.
+
+        Parameters: subscription (int), as returned by subscribe()
+
+        Returns: True (bool) if the subscription existed, False (bool) otherwise
+        """
+        return self._subscribers.pop(subscription, None) is not None
+
+    def get_num_subscribers(self):
+        """Returns the number of subscriptions.
+
+        Parameters: None
+
+        Returns: number of subscriptions (int)
+        """
+        return len(self._subscribers)
@@ -0,0 +1,185 @@
+# Description: Opt-in instrumentation for ShipGame. ShipGame.enable_instrumentation() switches a game to the
+# InstrumentedShipGame class below, which counts accepted and rejected calls by reason, keeps a latency histogram for
+# every public method, and times the phases of fire_torpedo() and place_ship(). Games that never enable
+# instrumentation keep running the plain ShipGame methods, so they pay nothing for it.
+
+import time
+
+from ShipGame import ShipGame
+
+# Public methods whose latency is recorded, besides the methods InstrumentedShipGame overrides
+_TIMED_METHODS = ("get_current_state", "get_num_ships_remaining", "show_game_grid", "render_game_grid", "load_fleet",
+                  "get_player", "to_bytes")
+
+
+class GameInstrumentation:
+    """Collects the measurements of one instrumented game: call counts by outcome, a latency histogram per method
+    with power-of-two nanosecond buckets, and total time per phase of fire_torpedo() and place_ship(). An optional
+    callback is called after every instrumented call.
+    """
+    def __init__(self, callback=None):
+        """Creates empty measurements.
+
+        Parameters: callback (function or None), called as callback(method, elapsed_ns, outcome, phases) where
+        outcome is "accepted" or the reason the call was rejected and phases is a tuple of (phase, ns) pairs
+        """
+        self._callback = callback
+        self._outcomes = {}         # Maps (method, outcome) to number of calls
+        self._latency = {}          # Maps method to [number of calls, total ns, {bucket upper bound: calls}]
+        self._phases = {}           # Maps "method.phase" to [number of calls, total ns]
+
+    def record(self, method, elapsed_ns, outcome="accepted", phases=()):
+        """Records one call.
+
+        Parameters: method (str); elapsed_ns (int); outcome (str); phases (tuple of (phase (str), ns (int)) pairs)
+
+        Returns: None
+        """
+        key = (method, outcome)
+        self._outcomes[key] = self._outcomes.get(key, 0) + 1
+        latency = self._latency.get(method)
+        if latency is None:
+            latency = self._latency[method] = [0, 0, {}]
+        latency[0] += 1
+        latency[1] += elapsed_ns
+        bucket = 1 << elapsed_ns.bit_length()
+        latency[2][bucket] = latency[2].get(bucket, 0) + 1
+        for phase, phase_ns in phases:
+            phase_key = method + "." + phase
+            totals = self._phases.get(phase_key)
+            if totals is None:
+                totals = self._phases[phase_key] = [0, 0]
+            totals[0] += 1
+            totals[1] += phase_ns
+        if self._callback is not None:
+            self._callback(method, elapsed_ns, outcome, phases)
+
+    def snapshot(self):
+        """Returns a copy of the measurements.
+
+        Parameters: None
+
+        Returns: dict with "calls" ({method: {outcome: count}}), "latency" ({method: {"count", "total_ns",
+        "buckets": {upper bound in ns: count}}}), and "phases" ({"method.phase": {"count", "total_ns"}})
+        """
+        calls = {}
+        for (method, outcome), count in self._outcomes.items():
+            calls.setdefault(method, {})[outcome] = count
+        return {"calls": calls,
+                "latency": {method: {"count": count, "total_ns": total, "buckets": dict(sorted(buckets.items()))}
+                            for method, (count, total, buckets) in self._latency.items()},
+                "phases": {phase: {"count": count, "total_ns": total}
+                           for phase, (count, total) in self._phases.items()}}
+
+
+def _timed(name):
+    """A private function that builds an InstrumentedShipGame method recording the latency of the ShipGame method
+    with the given name.
+    """
+    method = getattr(ShipGame, name)
+
+    def timed_method(self, *args, **kwargs):
+        started = time.perf_counter_ns()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._instrumentation.record(name, time.perf_counter_ns() - started)
+
+    timed_method.__name__ = name
+    timed_method.__doc__ = method.__doc__
+    return timed_method
+
+
+class InstrumentedShipGame(ShipGame):
+    """A ShipGame that records its calls in a GameInstrumentation stored in _instrumentation. Games are switched to
+    and from this class by ShipGame.enable_instrumentation() and ShipGame.disable_instrumentation().
+
+    fire_torpedo() and place_ship() call the same private ShipGame helpers as the ShipGame methods, with a timer
+    between the steps, so the rules are only written once.
+    """
+    __slots__ = ()      # Same layout as ShipGame, so games can switch between the two classes
+
+    def fire_torpedo(self, player, target_coords):
+        """Fires a torpedo with the same steps as ShipGame.fire_torpedo(), timing the check of the game state and
+        turn (ShipGame._check_turn()), the coordinate validation on the opponent's GameGrid, and the bookkeeping for
+        the accepted torpedo (ShipGame._accept_torpedo()).
+        """
+        clock = time.perf_counter_ns
+        started = clock()
+        reason = self._check_turn(player)
+        checked = clock()
+        if reason is not None:
+            self._instrumentation.record("fire_torpedo", checked - started, reason, (("check", checked - started),))
+            return False
+
+        target_player = self._players["second"] if player == "first" else self._players["first"]
+        validated_coords = target_player.get_player_grid()._parse_coord(target_coords)
+        validated = clock()
+        if validated_coords is None:
+            self._instrumentation.record("fire_torpedo", validated - started, "invalid_coords",
+                                         (("check", checked - started), ("validate", validated - checked)))
+            return False
+
+        self._accept_torpedo(player, target_player, validated_coords)
+        finished = clock()
+        self._instrumentation.record("fire_torpedo", finished - started, "accepted",
+                                     (("check", checked - started), ("validate", validated - checked),
+                                      ("resolve", finished - validated)))
+        return True
+
+    def place_ship(self, player, ship_length, ship_coords, ship_orientation):
+        """Places a ship with the same steps as ShipGame.place_ship(), timing the length check
+        (ShipGame._is_valid_length()), the placement on the player's GameGrid, and adding the new Ship to the player
+        (ShipGame._register_ship()).
+        """
+        clock = time.perf_counter_ns
+        started = clock()
+        if not self._is_valid_length(ship_length):
+            checked = clock()
+            self._instrumentation.record("place_ship", checked - started, "invalid_length",
+                                         (("check", checked - started),))
+            return False
+
+        checked = clock()
+        complete_coords = self._players[player].get_player_grid().add_ship_to_grid(ship_coords, ship_orientation,
+                                                                                   ship_length)
+        placed = clock()
+        if not complete_coords:
+            self._instrumentation.record("place_ship", placed - started, "invalid_placement",
+                                         (("check", checked - started), ("grid", placed - checked)))
+            return False
+
+        self._register_ship(player, ship_length, complete_coords, ship_orientation)
+        finished = clock()
+        self._instrumentation.record("place_ship", finished - started, "accepted",
+                                     (("check", checked - started), ("grid", placed - checked),
+                                      ("register", finished - placed)))
+        return True
+
+    def place_fleet(self, player, fleet):
+        """Places a fleet as ShipGame.place_fleet() does, recording the call as "accepted" only if the whole fleet
+        was placed, and otherwise as "invalid_length" or "invalid_placement", as place_ship() would.
+        """
+        started = time.perf_counter_ns()
+        outcome = "accepted"
+        if not all(self._is_valid_length(length) for length, _, _ in fleet):
+            outcome = "invalid_length"
+        elif not ShipGame.place_fleet(self, player, fleet):
+            outcome = "invalid_placement"
+        self._instrumentation.record("place_fleet", time.perf_counter_ns() - started, outcome)
+        return outcome == "accepted"
+
+    def fire_sequence(self, moves):
+        """Fires a sequence of torpedoes through fire_torpedo() above, so every move is counted under fire_torpedo
+        by its own outcome. The sequence is recorded as "accepted" if every move was accepted, and otherwise as
+        "rejected_moves".
+        """
+        started = time.perf_counter_ns()
+        results = [self.fire_torpedo(player, target_coords) for player, target_coords in moves]
+        self._instrumentation.record("fire_sequence", time.perf_counter_ns() - started,
+                                     "accepted" if all(results) else "rejected_moves")
+        return results
+
+
+for _name in _TIMED_METHODS:
+    setattr(InstrumentedShipGame, _name, _timed(_name))
@@ -0,0 +1,157 @@
+# Description: An append-only log of the moves accepted by ShipGame, and a replay tool that rebuilds games from it.
+# A game sends its moves to a MoveLog after ShipGame.set_move_log() is called. Every move is a fixed-size binary
+# record, so many games can share one log and the replay tool can stream a log of any size by memory-mapping it
+# instead of reading it into memory.
+#
+# Each record is 10 bytes: game id (4 bytes), move kind (0 for place_ship, 1 for fire_torpedo), player (0 for
+# "first", 1 for "second"), ship length, orientation (0 for "R", 1 for "C"), row, and column. Torpedo records leave
+# the length and orientation at 0.
+
+import mmap
+import struct
+
+from ShipGame import ShipGame, GameGrid, BitGameGrid
+
+RECORD = struct.Struct("<IBBBBBB")
+PLACE_SHIP = 0
+FIRE_TORPEDO = 1
+_PLAYERS = ("first", "second")
+_ORIENTATIONS = ("R", "C")
+
+
+class MoveLog:
+    """Appends move records to a log file. Records are buffered and written when the buffer fills, when flush() is
+    called, and when the log is closed.
+    """
+    def __init__(self, path, buffer_size=1 << 16):
+        """Opens the log file for appending, creating it if needed.
+
+        Parameters: path (str); buffer_size (int), bytes buffered before they are written
+        """
+        self._file = open(path, "ab", buffering=buffer_size)
+
+    def log_place_ship(self, game_id, player, length, start, orientation):
+        """Appends a record for a ship placement. It is called by ShipGame.place_ship().
+
+        Parameters: game_id (int); player (str); length (int); start ((row, column) tuple of the ship's top or left
+        square); orientation (str)
+
+        Returns: None
+        """
+        self._file.write(RECORD.pack(game_id, PLACE_SHIP, _PLAYERS.index(player), length,
+                                     _ORIENTATIONS.index(orientation), start[0], start[1]))
+
+    def log_fire_torpedo(self, game_id, player, target):
+        """Appends a record for a torpedo. It is called by ShipGame.fire_torpedo().
+
+        Parameters: game_id (int); player (str); target ((row, column) tuple)
+
+        Returns: None
+        """
+        self._file.write(RECORD.pack(game_id, FIRE_TORPEDO, _PLAYERS.index(player), 0, 0, target[0], target[1]))
+
+    def flush(self):
+        """Writes any buffered records to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Writes any buffered records and closes the file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_records(path, chunk_records=1 << 16):
+    """Streams the records of a log file by memory-mapping it and unpacking it chunk_records records at a time, so
+    the file is never read into memory as a whole.
+
+    Parameters: path (str); chunk_records (int)
+
+    Returns: generator of (game id, kind, player, length, orientation, row, column) tuples
+    """
+    with open(path, "rb") as log_file:
+        size = log_file.seek(0, 2)
+        if size == 0:
+            return
+        complete = size - size % RECORD.size    # Ignore a record cut short by a crash
+        chunk_size = RECORD.size * chunk_records
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, complete, chunk_size):
+                yield from RECORD.iter_unpack(mapped[start:min(start + chunk_size, complete)])
+
+
+def apply_record(game, record):
+    """Applies one log record to a game through place_ship() or fire_torpedo().
+
+    Parameters: game (ShipGame); record (tuple from iter_records())
+
+    Returns: None
+    """
+    game_id, kind, player, length, orientation, row, column = record
+    if kind == PLACE_SHIP:
+        accepted = game.place_ship(_PLAYERS[player], length, (row, column), _ORIENTATIONS[orientation])
+    else:
+        accepted = game.fire_torpedo(_PLAYERS[player], (row, column))
+    if not accepted:
+        raise ValueError(f"game {game_id}: logged move was rejected on replay: {record}")
+
+
+def replay_game(path, game_id, num_moves=None, grid_type=GameGrid):
+    """Rebuilds one game from a log, either completely or as it was after its first num_moves moves.
+
+    Parameters: path (str); game_id (int); num_moves (int or None); grid_type (GameGrid or BitGameGrid)
+
+    Returns: ShipGame object
+    """
+    game = ShipGame(grid_type)
+    applied = 0
+    for record in iter_records(path):
+        if record[0] != game_id:
+            continue
+        if num_moves is not None and applied == num_moves:
+            break
+        apply_record(game, record)
+        applied += 1
+    return game
+
+
+def replay_all(path, grid_type=GameGrid):
+    """Rebuilds every game in a log in a single pass. BitGameGrid keeps the memory used by each game small when a
+    log holds many games.
+
+    Parameters: path (str); grid_type (GameGrid or BitGameGrid)
+
+    Returns: dict mapping game id (int) to ShipGame object
+    """
+    games = {}
+    for record in iter_records(path):
+        game = games.get(record[0])
+        if game is None:
+            game = games[record[0]] = ShipGame(grid_type)
+        apply_record(game, record)
+    return games
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay games from a ShipGame move log.")
+    parser.add_argument("log")
+    parser.add_argument("--game", type=int, help="replay only this game and show its boards")
+    parser.add_argument("--moves", type=int, help="stop after this many moves of the game")
+    args = parser.parse_args()
+
+    if args.game is not None:
+        replayed = replay_game(args.log, args.game, args.moves)
+        print(f"game {args.game}: {replayed.get_current_state()}")
+        replayed.show_game_grid("first")
+        replayed.show_game_grid("second")
+    else:
+        states = {}
+        for replayed in replay_all(args.log, BitGameGrid).values():
+            states[replayed.get_current_state()] = states.get(replayed.get_current_state(), 0) + 1
+        print(states)
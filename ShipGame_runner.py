@@ -0,0 +1,92 @@
+# Description: Runs ShipGame commands from a script without a server. Commands are read as JSON lines from a file or
+# from stdin and every command is answered with one JSON line, in order, using the requests and responses of
+# ShipGame_server. Games are kept by id until an "end_game" command, so one command stream can drive many games at
+# once. Input is read and output is written in batches of lines through large buffers, so a command file of any size
+# is processed in constant memory apart from the games that are still live.
+#
+# Usage:
+#   python -m ShipGame_runner [commands.jsonl] [--output results.jsonl] [--batch-size 4096]
+#
+# For example, the commands
+#   {"op": "new_game", "game": "g1"}
+#   {"op": "place_ship", "game": "g1", "player": "second", "length": 2, "coord": "A1", "orientation": "R"}
+#   {"op": "fire_torpedo", "game": "g1", "player": "first", "coord": "A1"}
+#   {"op": "get_current_state", "game": "g1", "id": 7}
+# are answered with
+#   {"ok": true, "result": "g1"}
+#   {"ok": true, "result": true}
+#   {"ok": true, "result": true}
+#   {"id": 7, "ok": true, "result": "UNFINISHED"}
+
+import itertools
+import json
+import math
+import sys
+
+from ShipGame_server import GameServer
+
+_BUFFER_SIZE = 1 << 20
+
+
+def run_commands(commands, output, batch_size=4096, server=None):
+    """Answers every command line read from commands, writing one response line to output per command. Blank lines
+    are skipped. Lines are handled batch_size at a time and the responses of a batch are written with one call.
+
+    Parameters: commands (iterable of bytes or str lines, such as a file opened in binary mode); output (binary
+    file); batch_size (int); server (GameServer or None), holding the games, a new one by default
+
+    Returns: number of commands answered (int)
+    """
+    if server is None:
+        server = GameServer(idle_timeout=math.inf)
+    handle_line = server.handle_line
+    dumps = json.dumps
+    commands = iter(commands)
+    answered = 0
+    while True:
+        batch = list(itertools.islice(commands, batch_size))
+        if not batch:
+            break
+        responses = []
+        try:
+            for line in batch:
+                if not line.isspace():
+                    responses.append(dumps(handle_line(line)))
+        finally:
+            # The responses already computed are written even if the batch is interrupted
+            if responses:
+                output.write(("\n".join(responses) + "\n").encode())
+                answered += len(responses)
+    output.flush()
+    return answered
+
+
+def main(argv=None):
+    """Runs the command line interface.
+
+    Parameters: argv (list of str or None), the arguments, sys.argv[1:] by default
+
+    Returns: None
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m ShipGame_runner",
+                                     description="Answer ShipGame commands read as JSON lines.")
+    parser.add_argument("commands", nargs="?", help="file of commands, stdin by default")
+    parser.add_argument("--output", "-o", help="file for the responses, stdout by default")
+    parser.add_argument("--batch-size", type=int, default=4096, help="lines handled per batch")
+    args = parser.parse_args(argv)
+
+    commands = open(args.commands, "rb", buffering=_BUFFER_SIZE) if args.commands else sys.stdin.buffer
+    output = open(args.output, "wb", buffering=_BUFFER_SIZE) if args.output else sys.stdout.buffer
+    try:
+        run_commands(commands, output, args.batch_size)
+    finally:
+        if args.commands:
+            commands.close()
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
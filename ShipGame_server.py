@@ -0,0 +1,379 @@
+# Description: An asyncio server that hosts many ShipGame sessions in one process. Clients connect over TCP or a Unix
+# socket and send one JSON request per line; the server replies with one JSON response per line, in order. Sessions
+# that receive no requests for idle_timeout seconds are evicted, and the games of ended and evicted sessions are
+# recycled through a GamePool. Running this module with "loadtest" plays many concurrent sessions against a server
+# and reports the latency of every move.
+#
+# Requests are JSON objects with an "op" and its arguments, and may carry an "id" that is echoed in the response:
+#   {"op": "new_game"}                                                -> {"ok": true, "result": "<game id>"}
+#   {"op": "new_game", "game": g}                                     -> {"ok": true, "result": g}
+#   {"op": "place_ship", "game": g, "player": "first", "length": 3, "coord": "A1", "orientation": "R"}
+#   {"op": "fire_torpedo", "game": g, "player": "first", "coord": "B2"}
+#   {"op": "get_current_state", "game": g}
+#   {"op": "get_num_ships_remaining", "game": g, "player": "second"}
+#   {"op": "get_events", "game": g, "since": n}                       -> {"ok": true, "result": {"events": [...],
+#                                                                          "last": <sequence number of last event>}}
+#   {"op": "end_game", "game": g}
+# get_events returns the events of ShipGame_events published after event number n. A game publishes events once it
+# has been watched with get_events, and only the most recent events are kept, so a watcher that falls too far behind
+# is answered with an error.
+# Failed requests are answered with {"ok": false, "error": "<reason>"}. A line longer than the stream reader's limit
+# (64 KiB) is answered with an error and the connection is closed.
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+from ShipGame import GamePool, random_fleet
+from ShipGame_events import GameEventStream
+
+
+class GameServer:
+    """Routes line-delimited JSON requests to the ShipGame sessions they name. Sessions are kept in least recently
+    used order, so evicting idle sessions only looks at the sessions that are actually idle.
+    """
+    def __init__(self, idle_timeout=300.0, sweep_interval=5.0):
+        """Creates a server with no sessions.
+
+        Parameters: idle_timeout (float), seconds without requests after which a session is evicted;
+        sweep_interval (float), seconds between checks for idle sessions
+        """
+        self._idle_timeout = idle_timeout
+        self._sweep_interval = sweep_interval
+        self._sessions = OrderedDict()      # Maps game id to [ShipGame, time of last request]
+        self._next_game_id = 1
+        self._pool = GamePool()
+        self._servers = []
+        self._sweeper = None
+
+    def get_num_sessions(self):
+        """Returns the number of live sessions.
+
+        Parameters: None
+
+        Returns: number of sessions (int)
+        """
+        return len(self._sessions)
+
+    @staticmethod
+    def _is_game_id(game_id):
+        """A private method that checks that a value from a request can name a session. Game ids are strings or
+        integers; JSON true and false are rejected, although Python treats them as the integers 1 and 0.
+
+        Parameters: game_id (any type)
+
+        Returns: True (bool) if game_id can name a session, or False (bool) if not
+        """
+        return isinstance(game_id, (str, int)) and not isinstance(game_id, bool)
+
+    def _get_game(self, game_id):
+        """A private method that looks up a session and marks it as used.
+
+        Parameters: game_id (str or int, anything else names no session)
+
+        Returns: ShipGame object, or None if there is no such session
+        """
+        if not self._is_game_id(game_id):
+            return None
+        session = self._sessions.get(game_id)
+        if session is None:
+            return None
+        session[1] = time.monotonic()
+        self._sessions.move_to_end(game_id)
+        return session[0]
+
+    def handle_request(self, request):
+        """Carries out one request and builds its response.
+
+        Parameters: request (dict)
+
+        Returns: response (dict)
+        """
+        response = {"id": request["id"]} if "id" in request else {}
+        op = request.get("op")
+        if op == "new_game":
+            # Clients may choose the id of a new game; otherwise the next unused number is given
+            game_id = request.get("game")
+            if game_id is None:
+                while str(self._next_game_id) in self._sessions:
+                    self._next_game_id += 1
+                game_id = str(self._next_game_id)
+                self._next_game_id += 1
+            elif not self._is_game_id(game_id) or game_id in self._sessions:
+                response.update(ok=False, error="invalid game id")
+                return response
+            self._sessions[game_id] = [self._pool.acquire(), time.monotonic()]
+            response.update(ok=True, result=game_id)
+            return response
+
+        game = self._get_game(request.get("game"))
+        if game is None:
+            response.update(ok=False, error="unknown game")
+            return response
+        try:
+            if op == "place_ship":
+                result = game.place_ship(request["player"], request["length"], request["coord"],
+                                         request["orientation"])
+            elif op == "fire_torpedo":
+                result = game.fire_torpedo(request["player"], request["coord"])
+            elif op == "get_current_state":
+                result = game.get_current_state()
+            elif op == "get_num_ships_remaining":
+                result = game.get_num_ships_remaining(request["player"])
+            elif op == "get_events":
+                event_stream = game.get_event_stream()
+                if event_stream is None:
+                    event_stream = GameEventStream()
+                    game.set_event_stream(event_stream)
+                events = event_stream.events_since(request.get("since", 0))
+                if events is None:
+                    response.update(ok=False, error="events dropped")
+                    return response
+                result = {"events": events, "last": event_stream.get_last_seq()}
+            elif op == "end_game":
+                self._pool.release(self._sessions.pop(request["game"])[0])
+                result = True
+            else:
+                response.update(ok=False, error="unknown op")
+                return response
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            response.update(ok=False, error=f"invalid request: {error!r}")
+            return response
+        response.update(ok=True, result=result)
+        return response
+
+    def handle_line(self, line):
+        """Carries out one request given as a line of JSON, answering invalid JSON with an error response. It never
+        raises: a request that fails in a way handle_request() does not expect is answered with an error response
+        too, so one bad request cannot stop a connection or a command stream.
+
+        Parameters: line (bytes or str)
+
+        Returns: response (dict)
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+        except ValueError as error:
+            return {"ok": False, "error": f"invalid json: {error}"}
+        try:
+            return self.handle_request(request)
+        except Exception as error:
+            response = {"id": request["id"]} if "id" in request else {}
+            response.update(ok=False, error=f"internal error: {error!r}")
+            return response
+
+    def evict_idle_sessions(self, now=None):
+        """Removes every session that has not received a request for idle_timeout seconds.
+
+        Parameters: now (float or None), the current time.monotonic() value
+
+        Returns: number of sessions evicted (int)
+        """
+        deadline = (time.monotonic() if now is None else now) - self._idle_timeout
+        evicted = 0
+        while self._sessions:
+            game_id, session = next(iter(self._sessions.items()))
+            if session[1] > deadline:
+                break
+            del self._sessions[game_id]
+            self._pool.release(session[0])
+            evicted += 1
+        return evicted
+
+    async def _handle_connection(self, reader, writer):
+        """A private coroutine that serves one client connection until it is closed.
+
+        Parameters: reader (asyncio.StreamReader); writer (asyncio.StreamWriter)
+
+        Returns: None
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line is longer than the reader's limit; the rest of it cannot be told apart from the next
+                    # request, so the client is told why and the connection is closed
+                    writer.write(json.dumps({"ok": False, "error": "line too long"}).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                response = self.handle_line(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _sweep(self):
+        """A private coroutine that evicts idle sessions every sweep_interval seconds."""
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            self.evict_idle_sessions()
+
+    def _start_sweeper(self):
+        """A private method that starts the idle session sweeper if it is not running."""
+        if self._sweeper is None:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def start_tcp(self, host="127.0.0.1", port=0):
+        """Starts listening on a TCP port.
+
+        Parameters: host (str); port (int), 0 picks a free port
+
+        Returns: the port being listened on (int)
+        """
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self._servers.append(server)
+        self._start_sweeper()
+        return server.sockets[0].getsockname()[1]
+
+    async def start_unix(self, path):
+        """Starts listening on a Unix socket.
+
+        Parameters: path (str)
+
+        Returns: None
+        """
+        server = await asyncio.start_unix_server(self._handle_connection, path)
+        self._servers.append(server)
+        self._start_sweeper()
+
+    async def close(self):
+        """Stops listening and stops the idle session sweeper.
+
+        Parameters: None
+
+        Returns: None
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+
+async def _play_sessions(host, port, num_sessions, lengths, seed, latencies):
+    """A private coroutine used by run_load_test() to play num_sessions games over one connection. The games are
+    interleaved one move at a time, so all of them stay live until they finish.
+
+    Parameters: host (str); port (int); num_sessions (int); lengths (list of ints); seed (int);
+    latencies (list), to which the round trip time of every move is appended
+
+    Returns: None
+    """
+    import random
+
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(request):
+        started = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - started)
+        return response
+
+    games = []
+    for _ in range(num_sessions):
+        game_id = (await call({"op": "new_game"}))["result"]
+        for player in ("first", "second"):
+            for length, coord, orientation in random_fleet(lengths, rng):
+                await call({"op": "place_ship", "game": game_id, "player": player, "length": length,
+                            "coord": coord, "orientation": orientation})
+        targets = {player: [row + str(column) for row in "ABCDEFGHIJ" for column in range(1, 11)]
+                   for player in ("first", "second")}
+        for player_targets in targets.values():
+            rng.shuffle(player_targets)
+        games.append([game_id, "first", targets])
+
+    while games:
+        unfinished = []
+        for game in games:
+            game_id, player, targets = game
+            response = await call({"op": "fire_torpedo", "game": game_id, "player": player,
+                                   "coord": targets[player].pop()})
+            state = await call({"op": "get_current_state", "game": game_id})
+            if response["ok"] and state["result"] == "UNFINISHED":
+                game[1] = "second" if player == "first" else "first"
+                unfinished.append(game)
+            else:
+                await call({"op": "end_game", "game": game_id})
+        games = unfinished
+    writer.close()
+
+
+async def run_load_test(host, port, num_sessions=10000, connections=100, lengths=(5, 4, 3, 3, 2), seed=0):
+    """Plays num_sessions concurrent games against a running server, spread over the given number of connections,
+    and reports the latency of every request.
+
+    Parameters: host (str); port (int); num_sessions (int); connections (int); lengths (list of ints); seed (int)
+
+    Returns: dict with "requests" (int), "seconds" (float), and "p50", "p99" and "max" latencies in milliseconds
+    """
+    latencies = []
+    started = time.perf_counter()
+    per_connection = [num_sessions // connections + (1 if index < num_sessions % connections else 0)
+                      for index in range(connections)]
+    await asyncio.gather(*(_play_sessions(host, port, count, list(lengths), seed * connections + index, latencies)
+                           for index, count in enumerate(per_connection) if count))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {"requests": len(latencies), "seconds": elapsed,
+            "p50": latencies[len(latencies) // 2] * 1000,
+            "p99": latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000,
+            "max": latencies[-1] * 1000}
+
+
+async def _main(args):
+    """A private coroutine that runs the command line interface."""
+    if args.command == "serve":
+        server = GameServer(args.idle_timeout)
+        if args.unix:
+            await server.start_unix(args.unix)
+            print(f"listening on {args.unix}")
+        else:
+            port = await server.start_tcp(args.host, args.port)
+            print(f"listening on {args.host}:{port}")
+        await asyncio.Event().wait()
+    else:
+        server = None
+        port = args.port
+        if not args.port:
+            # Without a port, the load test runs against a server in this process
+            server = GameServer()
+            port = await server.start_tcp(args.host, 0)
+        report = await run_load_test(args.host, port, args.sessions, args.connections, seed=args.seed)
+        if server is not None:
+            print(f"sessions still live at the end: {server.get_num_sessions()}")
+            await server.close()
+        print(f"{report['requests']} requests in {report['seconds']:.1f} s "
+              f"({report['requests'] / report['seconds']:.0f} requests/s)")
+        print(f"latency p50 {report['p50']:.2f} ms, p99 {report['p99']:.2f} ms, max {report['max']:.2f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Host ShipGame sessions, or load test a ShipGame server.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    serve = subcommands.add_parser("serve")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    serve.add_argument("--idle-timeout", type=float, default=300.0)
+    loadtest = subcommands.add_parser("loadtest")
+    loadtest.add_argument("--host", default="127.0.0.1")
+    loadtest.add_argument("--port", type=int, default=0, help="server port; 0 starts a server in this process")
+    loadtest.add_argument("--sessions", type=int, default=10000)
+    loadtest.add_argument("--connections", type=int, default=100)
+    loadtest.add_argument("--seed", type=int, default=0)
+    asyncio.run(_main(parser.parse_args()))
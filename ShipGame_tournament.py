@@ -0,0 +1,386 @@
+# Description: Plays firing strategies and fleet placement strategies against each other over many games of ShipGame.
+# Games are split into chunks and played across a pool of worker processes; every game gets its own seed derived from
+# the tournament seed and the game number, so any single game can be replayed exactly with play_game(). The results of
+# each chunk are streamed back and merged into win counts, shots-to-win distributions, and confidence intervals.
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ShipGame import ShipGame, coord_to_str, game_seed, get_legal_placements, random_fleet
+from ShipGame_ai import ProbabilityFiring
+
+DEFAULT_FLEET = (5, 4, 3, 3, 2)
+_MAX_TURNS = 1000   # Games that are still unfinished after this many torpedoes are recorded as unfinished
+_MAX_RANDOM_PLACEMENTS = 1000   # Random positions tried for a ship before every legal position is tried in turn
+
+
+class RandomFiring:
+    """A firing strategy that fires at every square of the opponent's board once, in a random order."""
+    def __init__(self, rng, lengths):
+        """Creates the strategy for one game.
+
+        Parameters: rng (random.Random); lengths (list of ints), the lengths of the opponent's ships
+        """
+        self._targets = [(row, column) for row in range(1, 11) for column in range(1, 11)]
+        rng.shuffle(self._targets)
+
+    def next_target(self):
+        """Returns the next square to fire at as a (row, column) tuple."""
+        return self._targets.pop()
+
+    def observe(self, target, is_hit, sunk_ship):
+        """Records the result of the last torpedo. Random firing ignores it.
+
+        Parameters: target (tuple); is_hit (bool); sunk_ship (the Ship sunk by the torpedo, or None)
+        """
+
+
+class HuntTargetFiring:
+    """A firing strategy that hunts on a checkerboard pattern in a random order and, after a hit, targets the
+    neighbouring squares until the ship is sunk.
+    """
+    def __init__(self, rng, lengths):
+        """Creates the strategy for one game.
+
+        Parameters: rng (random.Random); lengths (list of ints), the lengths of the opponent's ships
+        """
+        squares = [(row, column) for row in range(1, 11) for column in range(1, 11)]
+        rng.shuffle(squares)
+        # Hunt the checkerboard squares first; every ship of length 2 or more covers at least one of them
+        squares.sort(key=lambda square: (square[0] + square[1]) % 2 == 0)
+        self._hunt = squares
+        self._targets = []
+        self._fired = set()
+
+    def next_target(self):
+        """Returns the next square to fire at as a (row, column) tuple."""
+        while self._targets:
+            target = self._targets.pop()
+            if target not in self._fired:
+                return target
+        while self._hunt[-1] in self._fired:
+            self._hunt.pop()
+        return self._hunt.pop()
+
+    def observe(self, target, is_hit, sunk_ship):
+        """Records the result of the last torpedo, queueing the neighbours of a hit as targets.
+
+        Parameters: target (tuple); is_hit (bool); sunk_ship (the Ship sunk by the torpedo, or None)
+        """
+        self._fired.add(target)
+        if is_hit and sunk_ship is None:
+            row, column = target
+            for neighbour in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1)):
+                if 1 <= neighbour[0] <= 10 and 1 <= neighbour[1] <= 10 and neighbour not in self._fired:
+                    self._targets.append(neighbour)
+
+
+def _place_randomly(game, length, rng):
+    """A private function that places a ship of the given length at a random valid position on the first
+    player's board of game. After _MAX_RANDOM_PLACEMENTS random positions have been rejected, every legal position
+    of the ship is tried in board order, so a crowded board either gets the ship or fails quickly.
+
+    Parameters: game (ShipGame); length (int); rng (random.Random)
+
+    Returns: the placement as a (length, coordinate, orientation) tuple. Raises ValueError if the ship does not fit.
+    """
+    for _ in range(_MAX_RANDOM_PLACEMENTS):
+        placement = (length, coord_to_str(rng.randint(1, 10), rng.randint(1, 10)), rng.choice("RC"))
+        if game.place_ship("first", *placement):
+            return placement
+    for coord, orientation, _, _, _ in get_legal_placements(length):
+        if game.place_ship("first", length, coord, orientation):
+            return length, coord, orientation
+    raise ValueError(f"a ship of length {length} does not fit on the board")
+
+
+def random_placement(lengths, rng):
+    """A placement strategy that draws a uniformly random layout of the fleet.
+
+    Parameters: lengths (list of ints); rng (random.Random)
+
+    Returns: list of (length, coordinate, orientation) tuples
+    """
+    return random_fleet(list(lengths), rng)
+
+
+def edge_placement(lengths, rng):
+    """A placement strategy that places every ship along one of the edges of the board when it can, and at a
+    random valid position otherwise.
+
+    Parameters: lengths (list of ints); rng (random.Random)
+
+    Returns: list of (length, coordinate, orientation) tuples
+    """
+    game = ShipGame()
+    fleet = []
+    for length in lengths:
+        start = rng.randint(1, 11 - length)
+        edges = [(length, coord_to_str(1, start), "R"), (length, coord_to_str(10, start), "R"),
+                 (length, coord_to_str(start, 1), "C"), (length, coord_to_str(start, 10), "C")]
+        rng.shuffle(edges)
+        for placement in edges:
+            if game.place_ship("first", *placement):
+                fleet.append(placement)
+                break
+        else:
+            fleet.append(_place_randomly(game, length, rng))
+    return fleet
+
+
+FIRING_STRATEGIES = {"random": RandomFiring, "hunt_target": HuntTargetFiring, "probability": ProbabilityFiring}
+PLACEMENT_STRATEGIES = {"random": random_placement, "edge": edge_placement}
+
+
+def _resolve_strategy(strategy, registry):
+    """A private function that looks up a strategy by name, or returns it unchanged if it is not a name.
+
+    Parameters: strategy (str, class or function); registry (dict)
+
+    Returns: the strategy
+    """
+    return registry[strategy] if isinstance(strategy, str) else strategy
+
+
+def play_game(first, second, lengths=DEFAULT_FLEET, seed=None):
+    """Plays a single game of ShipGame between two entrants. An entrant is a (firing strategy, placement strategy)
+    pair; strategies may be given by their name in FIRING_STRATEGIES and PLACEMENT_STRATEGIES or directly. Given
+    the same seed, the game is always played the same way.
+
+    A firing strategy is a class created with (rng, lengths) for each game. Its next_target() method returns the
+    (row, column) to fire at, and its observe(target, is_hit, sunk_ship) method is told the result of that torpedo,
+    including the Ship it sank, if any. A placement strategy is a function taking (lengths, rng) and returning a list
+    of (length, coordinate, orientation) tuples.
+
+    Parameters: first (tuple), the entrant playing "first"; second (tuple), the entrant playing "second";
+    lengths (list of ints); seed (any value accepted by random.Random)
+
+    Returns: (game state (str), number of torpedoes fired by the winner (int)). Raises ValueError if a placement
+    strategy returns a ship that cannot be placed.
+    """
+    rng = random.Random(seed)
+    game = ShipGame()
+    players = (("first", first), ("second", second))
+    for player, entrant in players:
+        for placement in _resolve_strategy(entrant[1], PLACEMENT_STRATEGIES)(lengths, rng):
+            if not game.place_ship(player, *placement):
+                raise ValueError(f"the placement strategy of {player} returned an invalid placement: {placement}")
+    firing = {player: _resolve_strategy(entrant[0], FIRING_STRATEGIES)(rng, lengths) for player, entrant in players}
+    opponents = {"first": game.get_player("second"), "second": game.get_player("first")}
+    shots = {"first": 0, "second": 0}
+
+    player = "first"
+    for _ in range(_MAX_TURNS):
+        opponent = opponents[player]
+        intact_cells = opponent.get_num_intact_cells()
+        ships_before = opponent.get_ships()[:]
+        target = firing[player].next_target()
+        game.fire_torpedo(player, target)
+        shots[player] += 1
+        sunk_ship = None
+        if len(opponent.get_ships()) < len(ships_before):
+            sunk_ship = next(ship for ship in ships_before if ship.get_is_sunk())
+        firing[player].observe(target, opponent.get_num_intact_cells() < intact_cells, sunk_ship)
+        if game.get_current_state() != "UNFINISHED":
+            return game.get_current_state(), shots[player]
+        player = "second" if player == "first" else "first"
+    return game.get_current_state(), 0
+
+
+class MatchResult:
+    """Holds the merged results of games played between two entrants, "a" and "b". Results from separate chunks of
+    games are combined with merge().
+    """
+    def __init__(self):
+        """Creates an empty result and initializes the private data members _wins, _unfinished, and _shots_to_win.
+        """
+        self._wins = {"a": 0, "b": 0}
+        self._unfinished = 0
+        self._shots_to_win = {"a": {}, "b": {}}     # Maps number of torpedoes to number of games won with that many
+
+    def add_game(self, winner, shots):
+        """Records the result of one game.
+
+        Parameters: winner ("a", "b", or None if the game was unfinished); shots (int), torpedoes fired by the winner
+
+        Returns: None
+        """
+        if winner is None:
+            self._unfinished += 1
+        else:
+            self._wins[winner] += 1
+            self._shots_to_win[winner][shots] = self._shots_to_win[winner].get(shots, 0) + 1
+
+    def merge(self, other):
+        """Adds the games recorded in another MatchResult to this one.
+
+        Parameters: other (MatchResult)
+
+        Returns: None
+        """
+        self._unfinished += other._unfinished
+        for entrant in ("a", "b"):
+            self._wins[entrant] += other._wins[entrant]
+            for shots, count in other._shots_to_win[entrant].items():
+                self._shots_to_win[entrant][shots] = self._shots_to_win[entrant].get(shots, 0) + count
+
+    def get_num_games(self):
+        """Returns the number of games recorded.
+
+        Parameters: None
+
+        Returns: number of games (int)
+        """
+        return self._wins["a"] + self._wins["b"] + self._unfinished
+
+    def get_wins(self, entrant):
+        """Returns the number of games the entrant won.
+
+        Parameters: entrant ("a" or "b")
+
+        Returns: number of wins (int)
+        """
+        return self._wins[entrant]
+
+    def get_shots_to_win(self, entrant):
+        """Returns the distribution of the number of torpedoes the entrant needed to win.
+
+        Parameters: entrant ("a" or "b")
+
+        Returns: dict mapping number of torpedoes (int) to number of games (int)
+        """
+        return dict(self._shots_to_win[entrant])
+
+    def win_rate(self, entrant, z=1.96):
+        """Returns the entrant's win rate with a Wilson score confidence interval.
+
+        Parameters: entrant ("a" or "b"); z (float), 1.96 for a 95% interval
+
+        Returns: (win rate, lower bound, upper bound) as floats
+        """
+        return wilson_interval(self._wins[entrant], self.get_num_games(), z)
+
+    def mean_shots_to_win(self, entrant, z=1.96):
+        """Returns the mean number of torpedoes the entrant needed to win, with a normal confidence interval.
+
+        Parameters: entrant ("a" or "b"); z (float), 1.96 for a 95% interval
+
+        Returns: (mean, lower bound, upper bound) as floats, or None if the entrant won no games
+        """
+        distribution = self._shots_to_win[entrant]
+        count = sum(distribution.values())
+        if count == 0:
+            return None
+        mean = sum(shots * games for shots, games in distribution.items()) / count
+        variance = sum(games * (shots - mean) ** 2 for shots, games in distribution.items()) / max(count - 1, 1)
+        margin = z * math.sqrt(variance / count)
+        return mean, mean - margin, mean + margin
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """Returns a proportion with its Wilson score confidence interval.
+
+    Parameters: successes (int); trials (int); z (float)
+
+    Returns: (proportion, lower bound, upper bound) as floats
+    """
+    if trials == 0:
+        return 0.0, 0.0, 1.0
+    proportion = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (proportion + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials)) / denominator
+    return proportion, centre - margin, centre + margin
+
+
+def _play_chunk(entrant_a, entrant_b, lengths, seed, start, stop):
+    """A private function run by the worker processes to play games start to stop - 1 of a match. Entrant "a"
+    plays first in even-numbered games and entrant "b" plays first in odd-numbered games.
+
+    Parameters: entrant_a (tuple); entrant_b (tuple); lengths (list of ints); seed (int); start (int); stop (int)
+
+    Returns: MatchResult
+    """
+    result = MatchResult()
+    for game_number in range(start, stop):
+        if game_number % 2 == 0:
+            sides = {"FIRST_WON": "a", "SECOND_WON": "b"}
+            state, shots = play_game(entrant_a, entrant_b, lengths, game_seed(seed, game_number))
+        else:
+            sides = {"FIRST_WON": "b", "SECOND_WON": "a"}
+            state, shots = play_game(entrant_b, entrant_a, lengths, game_seed(seed, game_number))
+        result.add_game(sides.get(state), shots)
+    return result
+
+
+def run_match(entrant_a, entrant_b, num_games, lengths=DEFAULT_FLEET, seed=0, chunk_size=500, max_workers=None,
+              on_chunk=None):
+    """Plays num_games games between two entrants across a pool of worker processes, alternating which entrant
+    plays first. Game number n is played with the seed game_seed(seed, n), so the merged result does not depend on
+    the number of workers. Custom strategies must be defined at module level so that they can be sent to workers.
+
+    Parameters: entrant_a (tuple); entrant_b (tuple); num_games (int); lengths (list of ints); seed (int);
+    chunk_size (int), games per task; max_workers (int or None), 0 plays every game in this process;
+    on_chunk (function or None), called with the merged MatchResult each time a chunk finishes
+
+    Returns: MatchResult
+    """
+    chunks = [(start, min(start + chunk_size, num_games)) for start in range(0, num_games, chunk_size)]
+    result = MatchResult()
+    if max_workers == 0:
+        for start, stop in chunks:
+            result.merge(_play_chunk(entrant_a, entrant_b, lengths, seed, start, stop))
+            if on_chunk is not None:
+                on_chunk(result)
+        return result
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_play_chunk, entrant_a, entrant_b, lengths, seed, start, stop)
+                   for start, stop in chunks]
+        for future in as_completed(futures):
+            result.merge(future.result())
+            if on_chunk is not None:
+                on_chunk(result)
+    return result
+
+
+def run_tournament(entrants, num_games, lengths=DEFAULT_FLEET, seed=0, chunk_size=500, max_workers=None):
+    """Plays a round robin between named entrants, num_games games per pairing.
+
+    Parameters: entrants (dict mapping name to entrant tuple); num_games (int); lengths (list of ints); seed (int);
+    chunk_size (int); max_workers (int or None)
+
+    Returns: dict mapping (name a, name b) to MatchResult
+    """
+    names = list(entrants)
+    results = {}
+    for index, name_a in enumerate(names):
+        for name_b in names[index + 1:]:
+            results[(name_a, name_b)] = run_match(entrants[name_a], entrants[name_b], num_games, lengths, seed,
+                                                  chunk_size, max_workers)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Play a round robin tournament between the built-in strategies.")
+    parser.add_argument("--games", type=int, default=2000, help="games per pairing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    all_entrants = {f"{firing}/{placement}": (firing, placement)
+                    for firing in FIRING_STRATEGIES for placement in PLACEMENT_STRATEGIES}
+    started = time.perf_counter()
+    for (name_a, name_b), match in run_tournament(all_entrants, args.games, seed=args.seed,
+                                                  max_workers=args.workers).items():
+        rate, low, high = match.win_rate("a")
+        print(f"{name_a} vs {name_b}: {name_a} wins {rate:.3f} [{low:.3f}, {high:.3f}]")
+        for entrant, name in (("a", name_a), ("b", name_b)):
+            shots = match.mean_shots_to_win(entrant)
+            if shots is not None:
+                print(f"    {name} mean shots to win {shots[0]:.2f} [{shots[1]:.2f}, {shots[2]:.2f}]")
+    print(f"{time.perf_counter() - started:.1f} s")
@@ -1,7 +1,24 @@
 # Unit tests for ShipGame
 
+import asyncio
+import io
+import json
+import os
+import tempfile
+import random
 import unittest
-from ShipGame import ShipGame, Player, GameGrid, Ship
+from concurrent.futures import ThreadPoolExecutor
+from ShipGame import ShipGame, Player, GameGrid, BitGameGrid, SparseGameGrid, Ship, GamePool, get_legal_placements, \
+    random_fleet, iter_snapshots, row_letters, COORD_CELLS, CELL_COORDS
+import ShipGame_ai
+import ShipGame_benchmarks
+import ShipGame_endgame
+import ShipGame_events
+import ShipGame_log
+import ShipGame_runner
+import ShipGame_server
+import ShipGame_tournament
+import ShipGame_verify
 
 
 class TestShipGame(unittest.TestCase):
@@ -35,6 +52,23 @@ class TestPlayer(unittest.TestCase):
             player_dict["third"]
         self.assertEqual(len(player_dict), 2)
 
+    def test_receive_torpedo(self):
+        """Confirm that the player's ship index resolves hits, sinks ships, and ignores repeated hits."""
+        new_player = Player("first")
+        new_ship = Ship(2)
+        new_ship.set_coords_on_grid([(1, 1), (1, 2)])
+        new_player.add_ship(new_ship)
+        self.assertEqual(new_player.get_num_intact_cells(), 2)
+        self.assertIsNone(new_player.receive_torpedo((2, 1)))
+        self.assertIs(new_player.receive_torpedo((1, 1)), new_ship)
+        self.assertIsNone(new_player.receive_torpedo((1, 1)))
+        self.assertEqual(new_player.get_num_intact_cells(), 1)
+        self.assertEqual(len(new_player.get_ships()), 1)
+        self.assertIs(new_player.receive_torpedo((1, 2)), new_ship)
+        self.assertTrue(new_ship.get_is_sunk())
+        self.assertEqual(new_player.get_ships(), [])
+        self.assertEqual(new_player.get_num_intact_cells(), 0)
+
 
 class TestShipPlacement(unittest.TestCase):
     """Test placement of ships with ShipGame."""
@@ -157,6 +191,765 @@ class TestTorpedo(unittest.TestCase):
         self.assertEqual(self.new_game.__getattribute__("_current_turn"), "second")
 
 
+class TestPlacementTable(unittest.TestCase):
+    """Contains unit tests for the table of legal ship placements."""
+
+    def test_placement_counts(self):
+        for length in range(2, 11):
+            placements = get_legal_placements(length)
+            self.assertEqual(len(placements), 2 * 10 * (11 - length))
+            for coord, orientation, coords, cells, mask in placements:
+                self.assertEqual(len(coords), length)
+                self.assertEqual(bin(mask).count("1"), length)
+                self.assertEqual(GameGrid().add_ship_to_grid(coord, orientation, length), list(coords))
+
+    def test_non_canonical_coordinates(self):
+        """Coordinates that are not in the table are validated the same way they always were, except that malformed
+        columns are rejected instead of raising ValueError."""
+        for grid_type in (GameGrid, BitGameGrid):
+            new_grid = grid_type()
+            self.assertEqual(new_grid.add_ship_to_grid("B03", "R", 2), [(2, 3), (2, 4)])
+            self.assertEqual(new_grid.add_ship_to_grid("B3", "C", 2), [])
+            self.assertEqual(new_grid.add_ship_to_grid("C10", "R", 2), [])
+            self.assertEqual(new_grid.add_ship_to_grid("C10", "C", 1), [(3, 10)])
+            self.assertEqual(new_grid.add_ship_to_grid("D1", "R", 0), [])
+            for coord in ("Dx", "D", "", "K1", "D11", "d1", 100, -1, (0, 1), (1, 11), [1, 1], None):
+                self.assertEqual(new_grid.add_ship_to_grid(coord, "R", 2), [])
+                self.assertIsNone(new_grid.add_torpedo_hit(coord))
+
+    def test_cell_and_tuple_coordinates(self):
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            with self.subTest(grid_type=grid_type):
+                new_game = ShipGame(grid_type)
+                self.assertTrue(new_game.place_ship("first", 3, 12, "R"))
+                self.assertTrue(new_game.place_ship("second", 2, (4, 5), "C"))
+                self.assertFalse(new_game.place_ship("second", 2, "E5", "R"))
+                self.assertEqual(new_game.get_player("second").get_ships()[0].get_coords_on_grid(), [(4, 5), (5, 5)])
+                self.assertTrue(new_game.fire_torpedo("first", COORD_CELLS["D5"]))
+                self.assertTrue(new_game.fire_torpedo("second", (2, 3)))
+                self.assertTrue(new_game.fire_torpedo("first", (5, 5)))
+                self.assertEqual(new_game.get_current_state(), "FIRST_WON")
+                self.assertEqual(new_game.render_game_grid("first").splitlines()[2], "B     X S S          ")
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            with self.subTest(grid_type=grid_type):
+                new_grid = grid_type()
+                # Equal to a cell number or a tuple of the table, but not coordinates
+                for coord in (True, False, 1.0, 12.0, (1.0, 2), (True, 1), (1, 2, 3), b"A1", [1, 1], {}):
+                    self.assertEqual(new_grid.add_ship_to_grid(coord, "R", 2), [])
+                    self.assertIsNone(new_grid.add_torpedo_hit(coord))
+        self.assertEqual(CELL_COORDS[0], "A1")
+        self.assertEqual(CELL_COORDS[99], "J10")
+        self.assertEqual(len(COORD_CELLS), 100)
+
+
+class TestRandomFleet(unittest.TestCase):
+    """Contains unit tests for random fleet generation."""
+
+    def test_fleet_is_valid(self):
+        rng = random.Random(4)
+        for lengths in ([5, 4, 3, 3, 2], [10] * 10, [9] * 11, [2] * 50, [3, 10, 2, 10]):
+            fleet = random_fleet(lengths, rng)
+            self.assertEqual([ship[0] for ship in fleet], lengths)
+            new_game = ShipGame()
+            for placement in fleet:
+                self.assertTrue(new_game.place_ship("first", *placement))
+
+    def test_fleet_is_uniform(self):
+        """Two ships of length 10 have 180 ordered layouts, which should be drawn about equally often."""
+        rng = random.Random(5)
+        counts = {}
+        for _ in range(18000):
+            fleet = tuple(random_fleet([10, 10], rng))
+            counts[fleet] = counts.get(fleet, 0) + 1
+        self.assertEqual(len(counts), 180)
+        self.assertTrue(all(50 < count < 150 for count in counts.values()))
+
+    def test_fleet_cannot_fit(self):
+        rng = random.Random(6)
+        for lengths in ([10] * 11, [4] * 25, [7] * 14, [1, 2], [11]):
+            with self.assertRaises(ValueError):
+                random_fleet(lengths, rng)
+
+    def test_load_fleet(self):
+        fleet = random_fleet([5, 4, 3], random.Random(7))
+        for grid_type in (GameGrid, BitGameGrid):
+            loaded_game = ShipGame(grid_type)
+            placed_game = ShipGame(grid_type)
+            loaded_game.load_fleet("second", fleet)
+            for placement in fleet:
+                placed_game.place_ship("second", *placement)
+            self.assertEqual(loaded_game.get_num_ships_remaining("second"), 3)
+            self.assertEqual(loaded_game.get_player("second").get_num_intact_cells(), 12)
+            self.assertEqual(loaded_game.get_player("second").get_player_grid().get_grid(),
+                             placed_game.get_player("second").get_player_grid().get_grid())
+
+
+class TestBitGameGrid(unittest.TestCase):
+    """Contains unit tests for the bitmask game board."""
+
+    def test_matches_game_grid(self):
+        """Confirm that BitGameGrid accepts the same moves and shows the same board as GameGrid."""
+        list_grid = GameGrid()
+        bit_grid = BitGameGrid()
+        placements = [("A1", "R", 5), ("A5", "C", 3), ("B1", "C", 9), ("A9", "C", 2), ("J8", "R", 3),
+                      ("C3", "X", 2), ("A0", "R", 2), ("J10", "C", 1)]
+        for coord, orientation, length in placements:
+            self.assertEqual(list_grid.add_ship_to_grid(coord, orientation, length),
+                             bit_grid.add_ship_to_grid(coord, orientation, length))
+        for torpedo in ["A1", "A1", "B1", "E5", "J10", "K1", "A10"]:
+            self.assertEqual(list_grid.add_torpedo_hit(torpedo), bit_grid.add_torpedo_hit(torpedo))
+        # Ships may be placed over squares that were already hit
+        self.assertEqual(list_grid.add_ship_to_grid("A1", "C", 2), bit_grid.add_ship_to_grid("A1", "C", 2))
+        self.assertEqual(list_grid.add_ship_to_grid("E4", "R", 2), bit_grid.add_ship_to_grid("E4", "R", 2))
+        self.assertEqual(list_grid.get_grid(), bit_grid.get_grid())
+
+    def test_game_with_bit_grid(self):
+        new_game = ShipGame(BitGameGrid)
+        self.assertTrue(new_game.place_ship("first", 2, "A9", "C"))
+        self.assertTrue(new_game.place_ship("second", 2, "J1", "R"))
+        self.assertFalse(new_game.place_ship("second", 2, "J10", "R"))
+        self.assertTrue(new_game.fire_torpedo("first", "J1"))
+        self.assertTrue(new_game.fire_torpedo("second", "A1"))
+        self.assertTrue(new_game.fire_torpedo("first", "J2"))
+        self.assertEqual(new_game.get_current_state(), "FIRST_WON")
+        self.assertEqual(new_game.get_num_ships_remaining("second"), 0)
+
+
+def play_random_moves(game, rng, num_moves):
+    """Makes random ship placements and torpedo shots, valid or not, in both players' names."""
+    for _ in range(num_moves):
+        player = rng.choice(["first", "second"])
+        coord = rng.choice("ABCDEFGHIJ") + str(rng.randint(1, 10))
+        if rng.random() < 0.2:
+            game.place_ship(player, rng.randint(2, 6), coord, rng.choice("RC"))
+        else:
+            game.fire_torpedo(player, coord)
+
+
+class TestSnapshots(unittest.TestCase):
+    """Contains unit tests for binary snapshots of games."""
+
+    def assert_same_game(self, game, restored):
+        self.assertEqual(game.get_current_state(), restored.get_current_state())
+        self.assertEqual(game.__getattribute__("_current_turn"), restored.__getattribute__("_current_turn"))
+        for player in ("first", "second"):
+            original_player = game.get_player(player)
+            restored_player = restored.get_player(player)
+            self.assertIs(type(original_player.get_player_grid()), type(restored_player.get_player_grid()))
+            self.assertEqual(original_player.get_player_grid().get_grid(), restored_player.get_player_grid().get_grid())
+            self.assertEqual(original_player.get_num_intact_cells(), restored_player.get_num_intact_cells())
+            self.assertEqual([(ship.get_coords_on_grid(), sorted(ship.get_hits()))
+                              for ship in original_player.get_ships()],
+                             [(ship.get_coords_on_grid(), sorted(ship.get_hits()))
+                              for ship in restored_player.get_ships()])
+
+    def test_round_trip(self):
+        rng = random.Random(8)
+        snapshots = []
+        games = []
+        for index in range(60):
+            new_game = ShipGame(BitGameGrid if index % 2 else GameGrid)
+            for player in ("first", "second"):
+                new_game.load_fleet(player, random_fleet([5, 4, 3], rng))
+            play_random_moves(new_game, rng, rng.randint(0, 150))
+            snapshot = new_game.to_bytes()
+            restored = ShipGame.from_bytes(snapshot)
+            self.assert_same_game(new_game, restored)
+            self.assertEqual(restored.to_bytes(), snapshot)
+            # Both games must also carry on the same way
+            moves_seed = rng.random()
+            play_random_moves(new_game, random.Random(moves_seed), 40)
+            play_random_moves(restored, random.Random(moves_seed), 40)
+            self.assert_same_game(new_game, restored)
+            snapshots.append(snapshot)
+            games.append(ShipGame.from_bytes(snapshot))
+        self.assertLessEqual(len(ShipGame().to_bytes()), 60)
+        for game, restored in zip(games, iter_snapshots(memoryview(b"".join(snapshots)))):
+            self.assertEqual(game.to_bytes(), restored.to_bytes())
+
+    def test_max_ship_length_round_trip(self):
+        for max_ship_length, longest in ((4, 4), (10, 10), (25, 10)):
+            new_game = ShipGame(BitGameGrid, max_ship_length=max_ship_length)
+            restored = ShipGame.from_bytes(new_game.to_bytes())
+            self.assertTrue(restored.place_ship("first", longest, "A1", "R"))
+            self.assertEqual(restored.place_ship("second", 6, "A1", "R"), new_game.place_ship("second", 6, "A1", "R"))
+            self.assertEqual(restored.to_bytes()[1] >> 4, 0 if max_ship_length >= 10 else max_ship_length)
+
+    def test_unknown_version(self):
+        snapshot = bytearray(ShipGame().to_bytes())
+        snapshot[0] = 99
+        with self.assertRaises(ValueError):
+            ShipGame.from_bytes(bytes(snapshot))
+
+
+class TestMoveLog(unittest.TestCase):
+    """Contains unit tests for the append-only move log and replay."""
+
+    def setUp(self) -> None:
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.log_dir.name, "moves.log")
+
+    def tearDown(self) -> None:
+        self.log_dir.cleanup()
+
+    def test_replay(self):
+        rng = random.Random(9)
+        games = {}
+        with ShipGame_log.MoveLog(self.log_path) as move_log:
+            for game_id in (3, 11, 12):
+                games[game_id] = ShipGame()
+                games[game_id].set_move_log(move_log, game_id)
+                games[game_id].load_fleet("second", random_fleet([4, 3], rng))
+            for _ in range(200):
+                play_random_moves(games[rng.choice([3, 11, 12])], rng, 1)
+        replayed = ShipGame_log.replay_all(self.log_path)
+        self.assertEqual(sorted(replayed), [3, 11, 12])
+        for game_id, game in games.items():
+            self.assertEqual(replayed[game_id].to_bytes(), game.to_bytes())
+            self.assertEqual(ShipGame_log.replay_game(self.log_path, game_id, grid_type=BitGameGrid)
+                             .get_player("first").get_player_grid().get_grid(),
+                             game.get_player("first").get_player_grid().get_grid())
+
+    def test_replay_part_of_game(self):
+        with ShipGame_log.MoveLog(self.log_path) as move_log:
+            new_game = ShipGame()
+            new_game.set_move_log(move_log, 1)
+            self.assertTrue(new_game.place_ship("first", 2, "A1", "R"))
+            self.assertFalse(new_game.place_ship("first", 2, "A1", "C"))
+            self.assertTrue(new_game.place_ship("second", 3, "B2", "C"))
+            self.assertTrue(new_game.fire_torpedo("first", "B2"))
+            self.assertFalse(new_game.fire_torpedo("first", "B3"))
+            self.assertTrue(new_game.fire_torpedo("second", "J10"))
+        with open(self.log_path, "ab") as log_file:
+            log_file.write(b"\x01\x02\x03")      # A record cut short
+        self.assertEqual(len(list(ShipGame_log.iter_records(self.log_path))), 4)
+        after_three = ShipGame_log.replay_game(self.log_path, 1, num_moves=3)
+        self.assertEqual(after_three.__getattribute__("_current_turn"), "second")
+        self.assertEqual(after_three.get_player("second").get_num_intact_cells(), 2)
+        self.assertEqual(ShipGame_log.replay_game(self.log_path, 1).to_bytes(), new_game.to_bytes())
+
+    def test_rejects_boards_a_log_cannot_hold(self):
+        with ShipGame_log.MoveLog(self.log_path) as move_log:
+            large_game = ShipGame(rows=300, columns=300)
+            with self.assertRaises(ValueError):
+                large_game.set_move_log(move_log, 1)
+            with self.assertRaises(ValueError):
+                ShipGame().set_move_log(move_log, 1 << 32)
+            large_game.set_move_log(None, 1)
+            self.assertTrue(large_game.place_ship("second", 2, (299, 5), "R"))
+            self.assertTrue(large_game.fire_torpedo("first", (299, 5)))
+            self.assertEqual(large_game.__getattribute__("_current_turn"), "second")
+            ShipGame(SparseGameGrid).set_move_log(move_log, 2)
+
+    def test_replay_after_undo(self):
+        # A logged game refuses undo, so the log always replays; lookahead is done on a clone instead
+        with ShipGame_log.MoveLog(self.log_path) as move_log:
+            new_game = ShipGame()
+            new_game.enable_undo()
+            new_game.set_move_log(move_log, 1)
+            new_game.place_ship("first", 2, "A1", "R")
+            new_game.place_ship("second", 2, "B1", "R")
+            self.assertTrue(new_game.fire_torpedo("first", "B1"))
+            with self.assertRaises(ValueError):
+                new_game.undo_last_torpedo()
+            self.assertEqual(new_game.get_player("second").get_num_intact_cells(), 1)
+            branch = new_game.clone()
+            self.assertTrue(branch.fire_torpedo("second", "A1"))
+            self.assertTrue(branch.undo_last_torpedo())
+            self.assertTrue(new_game.fire_torpedo("second", "J1"))
+        self.assertEqual(len(list(ShipGame_log.iter_records(self.log_path))), 4)
+        self.assertEqual(ShipGame_log.replay_game(self.log_path, 1).to_bytes(), new_game.to_bytes())
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Contains unit tests for opt-in instrumentation."""
+
+    def test_disabled_by_default(self):
+        new_game = ShipGame()
+        self.assertIs(type(new_game), ShipGame)
+        self.assertIsNone(new_game.get_instrumentation_snapshot())
+
+    def test_counts_and_phases(self):
+        events = []
+        new_game = ShipGame()
+        new_game.enable_instrumentation(lambda *event: events.append(event))
+        self.assertTrue(new_game.place_ship("first", 2, "A1", "R"))
+        self.assertFalse(new_game.place_ship("first", 11, "A1", "R"))
+        self.assertFalse(new_game.place_ship("first", 2, "A1", "C"))
+        self.assertTrue(new_game.place_ship("second", 2, "B1", "R"))
+        self.assertFalse(new_game.fire_torpedo("second", "A1"))
+        self.assertFalse(new_game.fire_torpedo("first", "K1"))
+        self.assertFalse(new_game.fire_torpedo("first", "Bx"))
+        self.assertTrue(new_game.fire_torpedo("first", "B1"))
+        self.assertTrue(new_game.fire_torpedo("second", "J1"))
+        self.assertTrue(new_game.fire_torpedo("first", "B2"))
+        self.assertFalse(new_game.fire_torpedo("second", "J2"))
+        self.assertEqual(new_game.get_current_state(), "FIRST_WON")
+
+        snapshot = new_game.get_instrumentation_snapshot()
+        self.assertEqual(snapshot["calls"]["place_ship"],
+                         {"accepted": 2, "invalid_length": 1, "invalid_placement": 1})
+        self.assertEqual(snapshot["calls"]["fire_torpedo"],
+                         {"accepted": 3, "out_of_turn": 1, "invalid_coords": 2, "game_over": 1})
+        self.assertEqual(snapshot["calls"]["get_current_state"], {"accepted": 1})
+        self.assertEqual(snapshot["latency"]["fire_torpedo"]["count"], 7)
+        self.assertEqual(sum(snapshot["latency"]["fire_torpedo"]["buckets"].values()), 7)
+        self.assertEqual(snapshot["phases"]["fire_torpedo.resolve"]["count"], 3)
+        self.assertEqual(snapshot["phases"]["place_ship.register"]["count"], 2)
+        self.assertEqual(len(events), 12)
+
+        new_game.disable_instrumentation()
+        self.assertIs(type(new_game), ShipGame)
+        self.assertIsNone(new_game.get_instrumentation_snapshot())
+
+    def test_counts_with_undo(self):
+        # Undo records every torpedo, but rejected torpedoes must still be counted by reason
+        new_game = ShipGame()
+        new_game.enable_undo()
+        new_game.enable_instrumentation()
+        new_game.place_ship("first", 2, "A1", "R")
+        new_game.place_ship("second", 2, "B1", "R")
+        self.assertFalse(new_game.fire_torpedo("second", "A1"))
+        self.assertFalse(new_game.fire_torpedo("first", "K1"))
+        self.assertTrue(new_game.fire_torpedo("first", "B1"))
+        self.assertTrue(new_game.undo_last_torpedo())
+        self.assertTrue(new_game.fire_torpedo("first", "B1"))
+        snapshot = new_game.get_instrumentation_snapshot()
+        self.assertEqual(snapshot["calls"]["fire_torpedo"], {"accepted": 2, "out_of_turn": 1, "invalid_coords": 1})
+        self.assertEqual(snapshot["phases"]["fire_torpedo.resolve"]["count"], 2)
+
+    def test_batch_calls_count_rejections(self):
+        new_game = ShipGame()
+        new_game.enable_instrumentation()
+        self.assertFalse(new_game.place_fleet("first", [(2, "A1", "R"), (11, "C1", "R")]))
+        self.assertFalse(new_game.place_fleet("first", [(2, "A1", "R"), (2, "A2", "C")]))
+        self.assertTrue(new_game.place_fleet("first", [(2, "A1", "R")]))
+        self.assertTrue(new_game.place_fleet("second", [(2, "B1", "R")]))
+        self.assertEqual(new_game.fire_sequence([("first", "J1"), ("second", "J1")]), [True, True])
+        self.assertEqual(new_game.fire_sequence([("second", "J2"), ("first", "K1"), ("first", "J2")]),
+                         [False, False, True])
+        snapshot = new_game.get_instrumentation_snapshot()
+        self.assertEqual(snapshot["calls"]["place_fleet"],
+                         {"accepted": 2, "invalid_length": 1, "invalid_placement": 1})
+        self.assertEqual(snapshot["calls"]["fire_sequence"], {"accepted": 1, "rejected_moves": 1})
+        self.assertEqual(snapshot["calls"]["fire_torpedo"], {"accepted": 3, "out_of_turn": 1, "invalid_coords": 1})
+
+
+class TestLargeBoards(unittest.TestCase):
+    """Contains unit tests for boards of other sizes stored in a SparseGameGrid."""
+
+    def test_row_letters(self):
+        self.assertEqual([row_letters(row) for row in (1, 10, 26, 27, 52, 703, 1000)],
+                         ["A", "J", "Z", "AA", "AZ", "AAA", "ALL"])
+        new_grid = SparseGameGrid(1000, 1000)
+        for row in (1, 26, 27, 702, 1000):
+            self.assertEqual(new_grid.add_torpedo_hit(row_letters(row) + "7"), (row, 7))
+        self.assertIsNone(new_grid.add_torpedo_hit("ALM1"))
+        self.assertIsNone(new_grid.add_torpedo_hit("A1001"))
+        self.assertIsNone(new_grid.add_torpedo_hit("a1"))
+        self.assertIsNone(new_grid.add_torpedo_hit("AB"))
+        self.assertEqual(new_grid.add_torpedo_hit(1000 * 999 + 6), (1000, 7))
+        self.assertEqual(new_grid.add_torpedo_hit((1000, 1000)), (1000, 1000))
+        self.assertIsNone(new_grid.add_torpedo_hit(1000 * 1000))
+        self.assertIsNone(new_grid.add_torpedo_hit((1001, 1)))
+
+    def test_matches_game_grid(self):
+        # On a 10 x 10 board, SparseGameGrid must behave exactly like GameGrid
+        rng = random.Random(3)
+        list_grid = GameGrid()
+        sparse_grid = SparseGameGrid()
+        for _ in range(300):
+            coord = rng.choice("ABCDEFGHIJK") + str(rng.randint(0, 11))
+            if rng.random() < 0.5:
+                orientation, length = rng.choice("RCX"), rng.randint(0, 11)
+                self.assertEqual(list_grid.add_ship_to_grid(coord, orientation, length),
+                                 sparse_grid.add_ship_to_grid(coord, orientation, length))
+            else:
+                self.assertEqual(list_grid.add_torpedo_hit(coord), sparse_grid.add_torpedo_hit(coord))
+            self.assertEqual(list_grid.get_grid(), sparse_grid.get_grid())
+
+    def test_placement_over_torpedoes(self):
+        grids = [GameGrid(), BitGameGrid(), SparseGameGrid()]
+        for new_grid in grids:
+            new_grid.add_ship_to_grid("A2", "R", 2)
+            for target in ("A1", "A2", "B1"):
+                new_grid.add_torpedo_hit(target)
+            new_grid.add_placement(get_legal_placements(3)[0])      # A1 to A3
+        self.assertEqual(grids[0].get_grid()[1][:4], ["A", "S", "S", "S"])
+        self.assertEqual(grids[0].get_grid()[2][1], "*")
+        for new_grid in grids[1:]:
+            self.assertEqual(new_grid.get_grid(), grids[0].get_grid())
+
+    def test_large_game(self):
+        new_game = ShipGame(rows=1000, columns=1000, max_ship_length=20)
+        self.assertEqual(new_game.get_player("first").get_player_grid().get_size(), (1000, 1000))
+        self.assertTrue(new_game.place_ship("first", 20, "ALL981", "R"))
+        self.assertFalse(new_game.place_ship("first", 21, "A1", "R"))
+        self.assertFalse(new_game.place_ship("first", 2, "ALL1000", "R"))
+        self.assertFalse(new_game.place_ship("first", 2, "ALK990", "C"))
+        new_game.load_fleet("second", [(2, "ZZ500", "R"), (3, "A1", "R")])
+        with self.assertRaises(ValueError):
+            new_game.load_fleet("second", [(2, "A3", "C")])
+        for target in ("ZZ500", "AAA500", "A1", "A2", "A3"):
+            self.assertTrue(new_game.fire_torpedo("first", target))
+            self.assertTrue(new_game.fire_torpedo("second", "B1"))
+        self.assertEqual(new_game.get_current_state(), "UNFINISHED")
+        self.assertTrue(new_game.fire_torpedo("first", "ZZ501"))
+        self.assertEqual(new_game.get_current_state(), "FIRST_WON")
+        with self.assertRaises(ValueError):
+            new_game.to_bytes()
+
+    def test_board_size_checks(self):
+        self.assertIs(type(ShipGame().get_player("first").get_player_grid()), GameGrid)
+        with self.assertRaises(ValueError):
+            ShipGame(BitGameGrid, rows=20, columns=20)
+        with self.assertRaises(ValueError):
+            ShipGame(rows=0, columns=5)
+        with self.assertRaises(ValueError):
+            ShipGame(max_ship_length=1)
+        small_game = ShipGame(rows=3, columns=4, max_ship_length=4)
+        self.assertTrue(small_game.place_ship("first", 4, "C1", "R"))
+        self.assertFalse(small_game.place_ship("first", 4, "A1", "C"))
+
+
+class TestBatchCalls(unittest.TestCase):
+    """Contains unit tests for place_fleet() and fire_sequence()."""
+
+    def test_place_fleet_is_atomic(self):
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            with self.subTest(grid_type=grid_type):
+                new_game = ShipGame(grid_type)
+                self.assertTrue(new_game.place_ship("first", 2, "J1", "R"))
+                before = new_game.get_player("first").get_player_grid().get_grid()
+                for fleet in ([(3, "A1", "R"), (2, "A3", "C")],           # Overlap within the fleet
+                              [(3, "A1", "R"), (2, "I1", "C")],           # Overlap with a placed ship
+                              [(3, "A1", "R"), (2, "A10", "R")],          # Off the grid
+                              [(3, "A1", "R"), (11, "B1", "R")],          # Invalid length
+                              [(3, "A1", "R"), (2, "K1", "R")]):          # Invalid row
+                    self.assertFalse(new_game.place_fleet("first", fleet))
+                    self.assertEqual(new_game.get_player("first").get_player_grid().get_grid(), before)
+                    self.assertEqual(new_game.get_num_ships_remaining("first"), 1)
+                self.assertTrue(new_game.place_fleet("first", []))
+                self.assertTrue(new_game.place_fleet("first", [(3, "A1", "R"), (2, "B1", "C"), (2, "J3", "R")]))
+                self.assertEqual([ship.get_coords_on_grid() for ship in new_game.get_player("first").get_ships()],
+                                 [[(10, 1), (10, 2)], [(1, 1), (1, 2), (1, 3)], [(2, 1), (3, 1)],
+                                  [(10, 3), (10, 4)]])
+
+    def test_place_fleet_matches_place_ship(self):
+        rng = random.Random(8)
+        for _ in range(20):
+            fleet = random_fleet([5, 4, 3, 3, 2], rng)
+            one_by_one = ShipGame()
+            for placement in fleet:
+                one_by_one.place_ship("second", *placement)
+            all_at_once = ShipGame(BitGameGrid)
+            self.assertTrue(all_at_once.place_fleet("second", fleet))
+            self.assertEqual(one_by_one.get_player("second").get_player_grid().get_packed_squares(),
+                             all_at_once.get_player("second").get_player_grid().get_packed_squares())
+            self.assertEqual([ship.get_coords_on_grid() for ship in one_by_one.get_player("second").get_ships()],
+                             [ship.get_coords_on_grid() for ship in all_at_once.get_player("second").get_ships()])
+
+    def test_fire_sequence_matches_fire_torpedo(self):
+        rng = random.Random(9)
+        targets = [row + str(column) for row in "ABCDEFGHIJK" for column in range(1, 12)]
+        for _ in range(20):
+            first_fleet = random_fleet([4, 3, 2], rng)
+            second_fleet = random_fleet([4, 3, 2], rng)
+            moves = [(rng.choice(("first", "first", "second")), rng.choice(targets)) for _ in range(250)]
+            one_by_one = ShipGame()
+            batched = ShipGame()
+            for new_game in (one_by_one, batched):
+                new_game.load_fleet("first", first_fleet)
+                new_game.load_fleet("second", second_fleet)
+            expected = [one_by_one.fire_torpedo(player, coord) for player, coord in moves]
+            self.assertEqual(batched.fire_sequence(moves), expected)
+            self.assertEqual(batched.to_bytes(), one_by_one.to_bytes())
+        self.assertEqual(ShipGame().fire_sequence([("first", "Ax")]), [False])
+
+
+class TestCloneUndo(unittest.TestCase):
+    """Contains unit tests for cloning games and undoing torpedoes."""
+
+    def game_state(self, game):
+        """Returns everything about a game that a torpedo can change."""
+        state = [game.get_current_state(), game._current_turn]
+        for player in ("first", "second"):
+            current_player = game.get_player(player)
+            state.append(current_player.get_player_grid().get_grid())
+            state.append([(ship.get_coords_on_grid(), list(ship.get_hits()), ship.get_is_sunk())
+                          for ship in current_player.get_ships()])
+            state.append(current_player.get_num_intact_cells())
+        return state
+
+    def test_clone_is_independent(self):
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            with self.subTest(grid_type=grid_type):
+                new_game = ShipGame(grid_type)
+                new_game.place_ship("first", 2, "A1", "R")
+                new_game.place_ship("second", 3, "B1", "R")
+                new_game.fire_torpedo("first", "B1")
+                before = self.game_state(new_game)
+                copy = new_game.clone()
+                self.assertEqual(self.game_state(copy), before)
+                self.assertTrue(copy.fire_torpedo("second", "A1"))
+                self.assertTrue(copy.fire_torpedo("first", "B2"))
+                self.assertTrue(copy.fire_torpedo("second", "A2"))
+                self.assertEqual(copy.get_current_state(), "SECOND_WON")
+                self.assertEqual(self.game_state(new_game), before)
+                self.assertTrue(new_game.fire_torpedo("second", "J10"))
+                self.assertEqual(copy.get_player("first").get_player_grid().get_square((10, 10)), " ")
+
+    def test_undo_restores_every_earlier_state(self):
+        rng = random.Random(18)
+        targets = [row + str(column) for row in "ABCDEFGHIJ" for column in range(1, 11)]
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            with self.subTest(grid_type=grid_type):
+                for _ in range(10):
+                    new_game = ShipGame(grid_type)
+                    new_game.load_fleet("first", random_fleet([4, 3, 2], rng))
+                    new_game.load_fleet("second", random_fleet([4, 3, 2], rng))
+                    new_game.enable_undo()
+                    states = [self.game_state(new_game)]
+                    while new_game.get_current_state() == "UNFINISHED":
+                        # Repeated and out of turn shots are included; only accepted shots can be undone
+                        if new_game.fire_torpedo(rng.choice(("first", "second")), rng.choice(targets)):
+                            states.append(self.game_state(new_game))
+                    copy = new_game.clone()
+                    self.assertFalse(copy.undo_last_torpedo())
+                    self.assertEqual(self.game_state(copy), states[-1])
+                    states.pop()
+                    while states:
+                        self.assertTrue(new_game.undo_last_torpedo())
+                        self.assertEqual(self.game_state(new_game), states.pop())
+                    self.assertFalse(new_game.undo_last_torpedo())
+
+    def test_undo_after_fire_sequence(self):
+        new_game = ShipGame(BitGameGrid)
+        new_game.place_ship("first", 2, "A1", "R")
+        new_game.place_ship("second", 2, "A1", "R")
+        before = new_game.to_bytes()
+        new_game.enable_undo()
+        self.assertEqual(new_game.fire_sequence([("first", "A1"), ("second", "C3"), ("first", "A2")]),
+                         [True, True, True])
+        self.assertEqual(new_game.get_current_state(), "FIRST_WON")
+        self.assertEqual(new_game.get_num_ships_remaining("second"), 0)
+        for _ in range(3):
+            self.assertTrue(new_game.undo_last_torpedo())
+        self.assertEqual(new_game.to_bytes(), before)
+        self.assertEqual(new_game.get_num_ships_remaining("second"), 1)
+
+    def test_undo_disabled_or_cleared(self):
+        new_game = ShipGame()
+        new_game.place_ship("first", 2, "B1", "R")
+        new_game.place_ship("second", 2, "A1", "R")
+        new_game.fire_torpedo("first", "A1")
+        self.assertFalse(new_game.undo_last_torpedo())
+        new_game.enable_undo()
+        new_game.fire_torpedo("second", "A1")
+        new_game.place_ship("second", 2, "J1", "R")
+        self.assertFalse(new_game.undo_last_torpedo())
+        new_game.enable_instrumentation()
+        self.assertTrue(new_game.fire_torpedo("first", "A2"))
+        self.assertTrue(new_game.undo_last_torpedo())
+        self.assertEqual(new_game.get_current_state(), "UNFINISHED")
+        self.assertEqual(new_game.get_instrumentation_snapshot()["calls"]["fire_torpedo"], {"accepted": 1})
+
+
+class TestEventStream(unittest.TestCase):
+    """Contains unit tests for the spectator event stream."""
+
+    def test_events_rebuild_opponent_view(self):
+        rng = random.Random(21)
+        targets = [(row, column) for row in range(1, 11) for column in range(1, 11)]
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            for mode in ("fire_torpedo", "fire_sequence", "undo", "instrumented"):
+                with self.subTest(grid_type=grid_type, mode=mode):
+                    new_game = ShipGame(grid_type)
+                    new_game.load_fleet("first", random_fleet([4, 3, 2], rng))
+                    new_game.load_fleet("second", random_fleet([4, 3, 2], rng))
+                    event_stream = ShipGame_events.GameEventStream()
+                    new_game.set_event_stream(event_stream)
+                    if mode == "undo":
+                        new_game.enable_undo()
+                    elif mode == "instrumented":
+                        new_game.enable_instrumentation()
+                    player = "first"
+                    while new_game.get_current_state() == "UNFINISHED":
+                        if mode == "fire_sequence":
+                            new_game.fire_sequence([(player, rng.choice(targets))])
+                        else:
+                            new_game.fire_torpedo(player, rng.choice(targets))
+                        if mode == "undo" and rng.random() < 0.2:
+                            new_game.undo_last_torpedo()
+                        player = new_game._current_turn
+
+                    boards = {"first": [[" "] * 10 for _ in range(10)], "second": [[" "] * 10 for _ in range(10)]}
+                    ships_sunk = 0
+                    events = event_stream.events_since(0)
+                    self.assertEqual([event["seq"] for event in events], list(range(1, len(events) + 1)))
+                    for event in events:
+                        if event["type"] == "game_over":
+                            self.assertEqual(event["state"], new_game.get_current_state())
+                            continue
+                        board = boards["second" if event["player"] == "first" else "first"]
+                        row, column = event["target"]
+                        board[row - 1][column - 1] = {"miss": "*", "hit": "X", "sunk": "X"}.get(event["type"],
+                                                                                           event.get("square"))
+                        if event["type"] == "sunk":
+                            self.assertIn(event["target"], event["cells"])
+                            ships_sunk += 1
+                    self.assertEqual(events[-1]["type"], "game_over")
+                    for board_player, board in boards.items():
+                        view = new_game.render_game_grid(board_player, opponent_view=True).splitlines()[1:]
+                        self.assertEqual([line.split(" ", 1)[1] for line in view], [" ".join(row) for row in board])
+                    if mode != "undo":
+                        winner = "first" if new_game.get_current_state() == "FIRST_WON" else "second"
+                        loser = "second" if winner == "first" else "first"
+                        self.assertEqual(ships_sunk, 3 + 3 - new_game.get_num_ships_remaining(winner) -
+                                         new_game.get_num_ships_remaining(loser))
+
+    def test_ring_buffer_and_resume(self):
+        event_stream = ShipGame_events.GameEventStream(capacity=4)
+        received = []
+        subscription = event_stream.subscribe(lambda event, line: received.append(line))
+        for num in range(6):
+            event_stream.publish({"type": "miss", "player": "first", "target": [1, num + 1]})
+        self.assertEqual(event_stream.get_last_seq(), 6)
+        self.assertEqual(event_stream.get_first_seq(), 3)
+        self.assertEqual(len(received), 6)
+        self.assertEqual(json.loads(received[0]), {"type": "miss", "player": "first", "target": [1, 1], "seq": 1})
+        self.assertIsNone(event_stream.events_since(1))
+        self.assertEqual([event["seq"] for event in event_stream.events_since(2)], [3, 4, 5, 6])
+        self.assertEqual(event_stream.events_since(6), [])
+        self.assertEqual(event_stream.lines_since(4), b"".join(received[4:]))
+        with self.assertRaises(ValueError):
+            event_stream.subscribe(lambda event, line: None, since=1)
+        late = []
+        event_stream.subscribe(lambda event, line: late.append(event["seq"]), since=4)
+        event_stream.publish({"type": "game_over", "state": "FIRST_WON"})
+        self.assertEqual(late, [5, 6, 7])
+        self.assertTrue(event_stream.unsubscribe(subscription))
+        self.assertFalse(event_stream.unsubscribe(subscription))
+        self.assertEqual(event_stream.get_num_subscribers(), 1)
+
+    def test_server_get_events(self):
+        server = ShipGame_server.GameServer()
+        server.handle_request({"op": "new_game", "game": "g"})
+        self.assertEqual(server.handle_request({"op": "get_events", "game": "g"})["result"],
+                         {"events": [], "last": 0})
+        server.handle_request({"op": "place_ship", "game": "g", "player": "second", "length": 2, "coord": "A1",
+                               "orientation": "R"})
+        server.handle_request({"op": "fire_torpedo", "game": "g", "player": "first", "coord": "A1"})
+        server.handle_request({"op": "fire_torpedo", "game": "g", "player": "second", "coord": "A1"})
+        result = server.handle_request({"op": "get_events", "game": "g", "since": 1})["result"]
+        self.assertEqual(result, {"events": [{"type": "miss", "player": "second", "target": [1, 1], "seq": 2},
+                                             {"type": "game_over", "state": "SECOND_WON", "seq": 3}], "last": 3})
+
+
+class TestRendering(unittest.TestCase):
+    """Contains unit tests for cached board rendering."""
+
+    def test_render_matches_grid(self):
+        rng = random.Random(5)
+        for grid_type in (GameGrid, BitGameGrid, SparseGameGrid):
+            with self.subTest(grid_type=grid_type):
+                new_grid = grid_type()
+                for _ in range(150):
+                    coord = rng.choice("ABCDEFGHIJ") + str(rng.randint(1, 10))
+                    if rng.random() < 0.3:
+                        new_grid.add_ship_to_grid(coord, rng.choice("RC"), rng.randint(2, 4))
+                    else:
+                        new_grid.add_torpedo_hit(coord)
+                    rows = new_grid.get_grid()
+                    self.assertEqual(new_grid.render(), "\n".join(" ".join(row) for row in rows))
+                    self.assertEqual(new_grid.render(True),
+                                     "\n".join(" ".join([row[0]] + [" " if square == "S" else square
+                                                                   for square in row[1:]]) for row in rows))
+                new_grid.clear()
+                self.assertEqual(new_grid.render(), "\n".join(" ".join(row) for row in GameGrid().get_grid()))
+
+    def test_cached_until_changed(self):
+        new_game = ShipGame()
+        new_game.place_ship("first", 3, "B2", "R")
+        new_game.place_ship("second", 2, "J1", "R")
+        opponent_view = new_game.render_game_grid("first", opponent_view=True)
+        self.assertNotIn("S", opponent_view)
+        self.assertIn("B   S S S", new_game.render_game_grid("first"))
+        self.assertIs(new_game.render_game_grid("first", opponent_view=True), opponent_view)
+        new_game.fire_torpedo("first", "A1")
+        self.assertIs(new_game.render_game_grid("first", opponent_view=True), opponent_view)
+        new_game.fire_torpedo("second", "B3")
+        self.assertEqual(new_game.render_game_grid("first", opponent_view=True).splitlines()[2],
+                         "B     X              ")
+        self.assertIn("B   S X S", new_game.render_game_grid("first"))
+        restored = ShipGame.from_bytes(new_game.to_bytes())
+        self.assertEqual(restored.render_game_grid("first"), new_game.render_game_grid("first"))
+
+    def test_large_board(self):
+        new_game = ShipGame(rows=30, columns=12)
+        new_game.place_ship("first", 2, "S11", "R")
+        new_game.place_ship("first", 2, "AC1", "C")
+        lines = new_game.render_game_grid("first").splitlines()
+        self.assertEqual(len(lines), 31)
+        self.assertEqual(lines[0], "0 1 2 3 4 5 6 7 8 9 10 11 12")
+        self.assertEqual(lines[19], "S                     S S")
+        self.assertEqual(lines[29], "AC S                      ")
+        hidden = new_game.render_game_grid("first", opponent_view=True).splitlines()
+        self.assertEqual(hidden[19], "S                        ")
+
+
+class TestGamePool(unittest.TestCase):
+    """Contains unit tests for resetting and recycling games."""
+
+    def test_objects_have_no_dict(self):
+        for obj in (ShipGame(), Player("first"), GameGrid(), BitGameGrid(), Ship(2)):
+            self.assertFalse(hasattr(obj, "__dict__"))
+            with self.assertRaises(AttributeError):
+                obj.extra = 1
+
+    def test_reset(self):
+        for grid_type in (GameGrid, BitGameGrid):
+            with self.subTest(grid_type=grid_type):
+                new_game = ShipGame(grid_type)
+                new_game.place_ship("first", 2, "A1", "R")
+                new_game.place_ship("second", 2, "B1", "R")
+                new_game.fire_torpedo("first", "B1")
+                new_game.fire_torpedo("second", "J1")
+                new_game.fire_torpedo("first", "B2")
+                new_game.enable_instrumentation()
+                new_game.reset()
+                self.assertIs(type(new_game), ShipGame)
+                self.assertEqual(new_game.to_bytes(), ShipGame(grid_type).to_bytes())
+                self.assertEqual(new_game.get_player("second").get_player_grid().get_grid(), GameGrid().get_grid())
+                self.assertEqual(new_game.get_num_ships_remaining("first"), 0)
+                self.assertTrue(new_game.place_ship("second", 3, "B1", "R"))
+                self.assertTrue(new_game.fire_torpedo("first", "B3"))
+                self.assertFalse(new_game.fire_torpedo("first", "B2"))
+
+    def test_pool_reuses_games(self):
+        pool = GamePool(BitGameGrid, max_size=1)
+        first_game = pool.acquire()
+        second_game = pool.acquire()
+        self.assertIsNot(first_game, second_game)
+        first_game.place_ship("first", 2, "A1", "R")
+        pool.release(first_game)
+        pool.release(second_game)
+        pool.release(ShipGame(GameGrid))
+        self.assertEqual(pool.get_num_free(), 1)
+        self.assertIs(pool.acquire(), first_game)
+        self.assertEqual(first_game.get_num_ships_remaining("first"), 0)
+        self.assertIsNot(pool.acquire(), second_game)
+
+    def test_pool_keeps_only_default_games(self):
+        pool = GamePool(SparseGameGrid)
+        pool.release(ShipGame(SparseGameGrid, max_ship_length=4))
+        pool.release(ShipGame(rows=20, columns=20))
+        self.assertEqual(pool.get_num_free(), 0)
+        pool.release(ShipGame(SparseGameGrid))
+        self.assertEqual(pool.get_num_free(), 1)
+        self.assertTrue(pool.acquire().place_ship("first", 10, "A1", "R"))
+
+
 class TestTurnTracking(unittest.TestCase):
     """Contains unit tests for turn tracking."""
 
@@ -179,5 +972,589 @@ class TestTurnTracking(unittest.TestCase):
         self.assertEqual(self.new_game.get_current_state(), "UNFINISHED")
 
 
+try:
+    import numpy
+    from ShipGame_batch import BatchShipGame, random_ship_boards, simulate_random_games
+    import ShipGame_analytics
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestBatchShipGame(unittest.TestCase):
+    """Contains unit tests for the vectorized batch engine."""
+
+    def test_matches_ship_game(self):
+        """Play the same random moves in ShipGame and in a batch and confirm the results agree after every step."""
+        rng = random.Random(7)
+        num_games = 40
+        games = [ShipGame() for _ in range(num_games)]
+        batch = BatchShipGame(num_games)
+        for index, game in enumerate(games):
+            for _ in range(6):
+                move = (rng.choice(["first", "second"]), rng.randint(1, 11), rng.choice("ABCDEFGHIJ") +
+                        str(rng.randint(1, 10)), rng.choice("RC"))
+                self.assertEqual(game.place_ship(*move), batch.place_ship(index, *move))
+        for _ in range(150):
+            targets = numpy.array([rng.randrange(-1, 101) for _ in range(num_games)])
+            accepted = batch.fire_torpedoes(targets)
+            for index, game in enumerate(games):
+                if targets[index] == -1:
+                    continue
+                coord = "ABCDEFGHIJK"[targets[index] // 10] + str(targets[index] % 10 + 1)
+                self.assertEqual(game.fire_torpedo(game.__getattribute__("_current_turn"), coord),
+                                 bool(accepted[index]))
+                self.assertEqual(game.get_current_state(), batch.get_current_state(index))
+                for player in ("first", "second"):
+                    self.assertEqual(game.get_num_ships_remaining(player),
+                                     batch.get_num_ships_remaining(player)[index])
+
+    def test_place_ship_coordinates(self):
+        batch = BatchShipGame(1)
+        game = ShipGame()
+        for coord in ("A", "Ax", "", "K1", "A11", (1, 1), (1.0, 2), 23, True, None, "B03", [1, 1]):
+            with self.subTest(coord=coord):
+                self.assertEqual(batch.place_ship(0, "first", 2, coord, "C"), game.place_ship("first", 2, coord, "C"))
+        self.assertEqual(batch.get_num_ships_remaining("first")[0], 3)
+
+    def test_ship_table_is_bounded(self):
+        # A ship placed over squares that were fired at takes a new entry in the ship table, up to 50 per player
+        batch = BatchShipGame(1)
+        batch.place_ship(0, "first", 2, "J9", "R")
+        batch.place_ship(0, "second", 2, "J9", "R")
+        placed = 1
+        while placed < 60 and batch.place_ship(0, "first", 2, "A1", "R"):
+            placed += 1
+            for target in (50, 0, 50, 1):
+                self.assertTrue(batch.fire_torpedoes(numpy.array([target]))[0])
+        self.assertEqual(placed, 50)
+        self.assertEqual(batch.get_current_state(0), "UNFINISHED")
+
+    def test_random_ship_boards(self):
+        boards = random_ship_boards(500, [5, 4, 3, 3, 2], numpy.random.default_rng(1))
+        for ship_id, length in enumerate([5, 4, 3, 3, 2]):
+            self.assertTrue(((boards == ship_id).sum(axis=1) == length).all())
+        for lengths in ([10] * 11, [4] * 25, [9] * 11, [1, 2]):
+            with self.assertRaises(ValueError):
+                random_ship_boards(1, lengths, numpy.random.default_rng(1), max_attempts=1000)
+
+    def test_simulate_random_games(self):
+        results = simulate_random_games(1000, [5, 4, 3, 3, 2], seed=3, chunk_size=300)
+        self.assertEqual(results["UNFINISHED"], 0)
+        self.assertEqual(results["FIRST_WON"] + results["SECOND_WON"], 1000)
+        self.assertEqual(len(results["shots"]), 1000)
+        self.assertTrue((results["shots"] >= 17).all())
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestAnalytics(unittest.TestCase):
+    """Contains unit tests for the game statistics pipeline."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        rng = random.Random(22)
+        targets = [(row, column) for row in range(1, 11) for column in range(1, 11)]
+        self.games = []
+        self.log_paths = []
+        for shard in range(3):
+            path = os.path.join(self.directory.name, f"moves{shard}.log")
+            with ShipGame_log.MoveLog(path) as move_log:
+                shard_games = [ShipGame() for _ in range(20)]
+                for game_id, new_game in enumerate(shard_games):
+                    new_game.set_move_log(move_log, game_id)
+                    for player in ("first", "second"):
+                        for placement in random_fleet([5, 3, 2], rng):
+                            new_game.place_ship(player, *placement)
+                # Interleave the games' torpedoes, and leave the last game unfinished
+                orders = [{player: rng.sample(targets, 100) for player in ("first", "second")} for _ in shard_games]
+                for _ in range(200):
+                    for new_game, order in zip(shard_games[:-1], orders):
+                        if new_game.get_current_state() == "UNFINISHED":
+                            new_game.fire_torpedo(new_game._current_turn, order[new_game._current_turn].pop())
+                move_log.log_fire_torpedo(19, "second", (1, 1))     # Rejected: out of turn
+            self.games.extend(shard_games)
+            self.log_paths.append(path)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_log_matches_final_boards(self):
+        from_boards = ShipGame_analytics.GameStats().add_games(self.games)
+        from_logs = ShipGame_analytics.analyze_files(self.log_paths, max_workers=0)
+        self.assertEqual(from_logs.states.tolist(), from_boards.states.tolist())
+        self.assertEqual(from_logs.states[0], 3)
+        self.assertEqual(from_logs.rejected_records, 3)
+        for name in ("shots", "hits", "ship_squares"):
+            self.assertTrue((getattr(from_logs, name) == getattr(from_boards, name)).all(), name)
+        self.assertEqual(from_logs.ship_squares_by_length.sum(axis=1).tolist(),
+                         [0, 0, 240, 360, 0, 600, 0, 0, 0, 0, 0])
+        finished = int(from_logs.states[1] + from_logs.states[2])
+        ships_sunk = sum(3 - new_game.get_num_ships_remaining(player) for new_game in self.games
+                         for player in ("first", "second"))
+        self.assertEqual(from_logs.sink_shots.sum(), ships_sunk)
+        self.assertEqual(from_logs.sink_shots[:, :2].sum(), 0)
+        self.assertEqual(sorted(from_logs.mean_sink_shots()), [2, 3, 5])
+        rate, low, high = from_logs.first_mover_win_rate()
+        self.assertEqual(rate, from_logs.states[1] / finished)
+        self.assertLessEqual(low, rate)
+
+    def test_parallel_snapshots_match(self):
+        path = os.path.join(self.directory.name, "games.bin")
+        with open(path, "wb") as snapshot_file:
+            for new_game in self.games:
+                snapshot_file.write(new_game.to_bytes())
+        empty_path = os.path.join(self.directory.name, "empty.bin")
+        open(empty_path, "wb").close()
+        from_snapshots = ShipGame_analytics.analyze_files([path, empty_path], "snapshots", max_workers=2)
+        from_boards = ShipGame_analytics.GameStats().add_games(self.games)
+        self.assertEqual(from_snapshots.get_num_games(), 60)
+        self.assertTrue((from_snapshots.shots == from_boards.shots).all())
+        merged = ShipGame_analytics.GameStats().merge(from_boards).merge(from_boards)
+        self.assertEqual(merged.ship_squares.sum(), 2 * from_boards.ship_squares.sum())
+
+
+class TestTournament(unittest.TestCase):
+    """Contains unit tests for the strategy tournament runner."""
+
+    def test_play_game_is_reproducible(self):
+        game_seed = ShipGame_tournament.game_seed(5, 17)
+        result = ShipGame_tournament.play_game(("hunt_target", "edge"), ("random", "random"), seed=game_seed)
+        self.assertIn(result[0], ("FIRST_WON", "SECOND_WON"))
+        self.assertGreaterEqual(result[1], 17)
+        for _ in range(3):
+            self.assertEqual(ShipGame_tournament.play_game(("hunt_target", "edge"), ("random", "random"),
+                                                           seed=game_seed), result)
+
+    def test_invalid_placements(self):
+        def overlapping(lengths, rng):
+            return [(2, "A1", "R"), (2, "A1", "C")]
+        with self.assertRaises(ValueError):
+            ShipGame_tournament.play_game(("random", overlapping), ("random", "random"), seed=1)
+        # Ten ships of length 10 fill the board, so the eleventh cannot be placed anywhere
+        with self.assertRaises(ValueError):
+            ShipGame_tournament.edge_placement([10] * 11, random.Random(1))
+        self.assertEqual(len(ShipGame_tournament.edge_placement([10] * 10, random.Random(1))), 10)
+
+    def test_match_does_not_depend_on_workers(self):
+        entrant_a = ("hunt_target", "random")
+        entrant_b = ("random", "edge")
+        in_process = ShipGame_tournament.run_match(entrant_a, entrant_b, 40, seed=3, chunk_size=7, max_workers=0)
+        pooled = ShipGame_tournament.run_match(entrant_a, entrant_b, 40, seed=3, chunk_size=7, max_workers=2)
+        self.assertEqual(in_process.get_num_games(), 40)
+        for entrant in ("a", "b"):
+            self.assertEqual(in_process.get_wins(entrant), pooled.get_wins(entrant))
+            self.assertEqual(in_process.get_shots_to_win(entrant), pooled.get_shots_to_win(entrant))
+        rate, low, high = in_process.win_rate("a")
+        self.assertTrue(0 <= low <= rate <= high <= 1)
+
+
+class TestProbabilityTargetingAI(unittest.TestCase):
+    """Contains unit tests for the probability density targeting AI."""
+
+    def test_heatmap_matches_full_recount(self):
+        """Confirm that the incrementally updated heatmap equals a heatmap counted from scratch."""
+        lengths = [5, 3, 3, 2]
+        ai = ShipGame_ai.ProbabilityTargetingAI(lengths, random.Random(1))
+        ai.record_miss(1, 1)
+        ai.record_miss(5, 5)
+        ai.record_hit(3, 3)
+        ai.record_hit(3, 4)
+        ai.record_sunk([(7, 2), (7, 3), (7, 4)])
+        blocked = {0, 44, 61, 62, 63}
+        hits = {22, 23}
+        heat = [0] * 100
+        for length, count in ((5, 1), (3, 1), (2, 1)):
+            for cells in ShipGame_ai._PLACEMENTS[length]:
+                if not blocked.intersection(cells):
+                    for cell in cells:
+                        heat[cell] += count * ShipGame_ai.HIT_WEIGHT ** len(hits.intersection(cells))
+        self.assertEqual(ai.get_heatmap(), [heat[row * 10:row * 10 + 10] for row in range(10)])
+        self.assertEqual(ai.get_ships_left(), {5: 1, 3: 1, 2: 1})
+        self.assertIn(ai.choose_target(), [(3, 2), (3, 5), (2, 3), (4, 3), (2, 4), (4, 4)])
+
+    def test_sinks_fleet(self):
+        new_game = ShipGame()
+        for placement in [(2, "A1", "R"), (4, "C3", "C"), (10, "J1", "R"), (3, "E7", "C")]:
+            self.assertTrue(new_game.place_ship("second", *placement))
+        opponent = new_game.get_player("second")
+        ai = ShipGame_ai.ProbabilityTargetingAI([2, 4, 10, 3], random.Random(2))
+        shots = 0
+        while opponent.get_ships() and shots < 100:
+            target = ai.choose_target()
+            hit_ship = opponent.receive_torpedo(opponent.get_player_grid().add_torpedo_hit(
+                ShipGame_tournament.coord_to_str(*target)))
+            ai.observe(target, hit_ship is not None, hit_ship if hit_ship and hit_ship.get_is_sunk() else None)
+            shots += 1
+        self.assertEqual(opponent.get_ships(), [])
+        self.assertLess(shots, 100)
+
+
+class TestMonteCarloTargetingAI(unittest.TestCase):
+    """Contains unit tests for the Monte Carlo targeting AI."""
+
+    def test_layouts_are_consistent(self):
+        rng = random.Random(3)
+        blocked = (1 << 0) | (1 << 45) | (1 << 99)
+        for _ in range(200):
+            layout = ShipGame_ai.sample_layout(rng, [10, 5, 2, 2], blocked, [33, 34, 70])
+            if layout is None:
+                continue
+            self.assertEqual(bin(layout).count("1"), 19)
+            self.assertFalse(layout & blocked)
+            self.assertTrue(all(layout >> hit & 1 for hit in (33, 34, 70)))
+        self.assertIsNone(ShipGame_ai.sample_layout(rng, [10], (1 << 100) - 1 - (1 << 5), [5]))
+
+    def test_sampler_counts(self):
+        for workers in (0, 2):
+            with self.subTest(workers=workers):
+                with ShipGame_ai.MonteCarloSampler(workers, time_budget=5.0, max_samples=300, seed=1) as sampler:
+                    counts, samples = sampler.sample([3, 2], 1 << 12, [13])
+                self.assertEqual(samples, 300 * max(workers, 1))
+                self.assertEqual(counts[12], 0)
+                self.assertEqual(counts[13], samples)
+                self.assertEqual(sum(counts), 5 * samples)
+                with ShipGame_ai.MonteCarloSampler(workers, time_budget=5.0, max_samples=300, seed=1) as sampler:
+                    self.assertEqual(sampler.sample([3, 2], 1 << 12, [13]), (counts, samples))
+
+    def test_sampler_shared_by_threads(self):
+        # Two sessions sampling opposite halves of the board must never see each other's counts
+        halves = {"top": (1 << 100) - (1 << 50), "bottom": (1 << 50) - 1}
+        with ShipGame_ai.MonteCarloSampler(2, time_budget=5.0, max_samples=50, seed=2) as sampler:
+            with ThreadPoolExecutor(max_workers=4) as threads:
+                calls = [(half, threads.submit(sampler.sample, [3, 2], blocked, []))
+                         for half, blocked in list(halves.items()) * 6]
+                results = [(half, call.result()) for half, call in calls]
+        for half, (counts, samples) in results:
+            self.assertEqual(samples, 100)
+            self.assertEqual(sum(counts), 5 * samples)
+            blocked = halves[half]
+            self.assertFalse(any(counts[cell] for cell in range(100) if blocked >> cell & 1))
+
+    def test_sinks_fleet(self):
+        new_game = ShipGame()
+        for placement in [(2, "A1", "R"), (4, "C3", "C"), (10, "J1", "R"), (3, "E7", "C")]:
+            self.assertTrue(new_game.place_ship("second", *placement))
+        opponent = new_game.get_player("second")
+        sampler = ShipGame_ai.MonteCarloSampler(0, max_samples=100, seed=4)
+        ai = ShipGame_ai.MonteCarloTargetingAI([2, 4, 10, 3], random.Random(4), sampler)
+        shots = 0
+        while opponent.get_ships() and shots < 100:
+            target = ai.choose_target()
+            hit_ship = opponent.receive_torpedo(opponent.get_player_grid().add_torpedo_hit(target))
+            ai.observe(target, hit_ship is not None, hit_ship if hit_ship and hit_ship.get_is_sunk() else None)
+            shots += 1
+        self.assertEqual(opponent.get_ships(), [])
+        self.assertLess(shots, 100)
+        self.assertEqual(ai.get_ships_left(), {})
+
+    def test_from_game_matches_recorded_view(self):
+        new_game = ShipGame()
+        new_game.place_ship("first", 2, "J9", "R")
+        for placement in [(2, "A1", "R"), (4, "C3", "C"), (3, "E7", "C")]:
+            new_game.place_ship("second", *placement)
+        opponent = new_game.get_player("second")
+        recorded = ShipGame_ai.MonteCarloTargetingAI([2, 4, 3], random.Random(5),
+                                                      ShipGame_ai.MonteCarloSampler(0, max_samples=200, seed=5))
+        for target in ((1, 1), (1, 2), (3, 3), (6, 6), (5, 7)):
+            ships_before = opponent.get_ships()[:]
+            self.assertTrue(new_game.fire_torpedo("first", target))
+            sunk_ship = next((ship for ship in ships_before if ship.get_is_sunk()), None)
+            recorded.observe(target, opponent.get_player_grid().get_square(target) == "X", sunk_ship)
+            new_game.fire_torpedo("second", "A10")
+        from_game = ShipGame_ai.MonteCarloTargetingAI.from_game(
+            new_game, "first", random.Random(5), ShipGame_ai.MonteCarloSampler(0, max_samples=200, seed=5))
+        self.assertEqual(from_game.get_ships_left(), {4: 1, 3: 1})
+        self.assertEqual(from_game.choose_target(), recorded.choose_target())
+
+
+class TestEndgameSolver(unittest.TestCase):
+    """Contains unit tests for the exact endgame solver."""
+
+    def test_solves_small_boards(self):
+        solver = ShipGame_endgame.EndgameSolver()
+        # A length 2 ship next to a hit in open water can lie in any of four directions
+        self.assertEqual(solver.solve([2], 0, 1 << 44), (2.5, (4, 5)))
+        # A length 3 ship in a corridor of three squares is sunk with three torpedoes
+        corridor = (1 << 100) - 1 - (0b111 << 21)
+        self.assertEqual(solver.solve([3], corridor, 0), (3.0, (3, 2)))
+        self.assertEqual(solver.solve([], corridor, 0), (0.0, None))
+        # The same board shifted elsewhere on the grid is answered from the transposition table
+        size = solver.get_table_size()
+        self.assertEqual(solver.solve([3], (1 << 100) - 1 - (0b111 << 75), 0), (3.0, (8, 6)))
+        self.assertEqual(solver.get_table_size(), size)
+
+    def test_matches_brute_force(self):
+        values = {}
+
+        def brute_force(lengths, blocked, hits):
+            if not lengths:
+                return 0.0
+            if (lengths, blocked, hits) in values:
+                return values[lengths, blocked, hits]
+            layouts = ShipGame_endgame.EndgameSolver(10 ** 6, 60.0)._find_layouts(lengths, blocked, hits)
+            best = None
+            for cell in range(100):
+                if (blocked | hits) >> cell & 1 or not any(mask >> cell & 1 for fleet in layouts for _, mask in fleet):
+                    continue
+                outcomes = {}
+                for fleet in layouts:
+                    ship = [(length, mask) for length, mask in fleet if mask >> cell & 1]
+                    if not ship:
+                        outcomes.setdefault((lengths, blocked | 1 << cell, hits), []).append(fleet)
+                    elif ship[0][1] & ~(hits | 1 << cell):
+                        outcomes.setdefault((lengths, blocked, hits | 1 << cell), []).append(fleet)
+                    else:
+                        remaining = list(lengths)
+                        remaining.remove(ship[0][0])
+                        outcomes.setdefault((tuple(remaining), blocked | ship[0][1], hits & ~ship[0][1]),
+                                            []).append(fleet)
+                value = 1 + sum(len(fleets) / len(layouts) * brute_force(*board)
+                                for board, fleets in outcomes.items())
+                best = value if best is None else min(best, value)
+            values[lengths, blocked, hits] = best
+            return best
+
+        rng = random.Random(5)
+        for _ in range(12):
+            top, left = rng.randrange(8), rng.randrange(6)
+            blocked = (1 << 100) - 1
+            for row in range(top, top + 2):
+                for column in range(left, left + 4):
+                    blocked &= ~(1 << (row * 10 + column))
+            lengths = rng.choice([(2,), (3,), (2, 2)])
+            result = ShipGame_endgame.EndgameSolver(time_budget=60.0).solve(lengths, blocked, 0)
+            self.assertAlmostEqual(result[0], brute_force(lengths, blocked, 0))
+
+    def test_gives_up_and_evicts(self):
+        self.assertIsNone(ShipGame_endgame.EndgameSolver().solve([5, 4, 3, 3, 2], 0, 0))
+        self.assertIsNone(ShipGame_endgame.EndgameSolver(time_budget=0.0).solve([3, 2], 0, 1 << 55))
+        solver = ShipGame_endgame.EndgameSolver(max_entries=3)
+        for cell in (11, 44, 77):
+            self.assertIsNotNone(solver.solve([2], 0, 1 << cell))
+            self.assertLessEqual(solver.get_table_size(), 3)
+
+    def test_board_from_game(self):
+        new_game = ShipGame()
+        self.assertTrue(new_game.place_ship("first", 2, "J9", "R"))
+        self.assertTrue(new_game.place_ship("second", 2, "A1", "R"))
+        self.assertTrue(new_game.place_ship("second", 3, "C3", "C"))
+        for first_target, second_target in [("A1", "J1"), ("A2", "J2"), ("B5", "J3"), ("C3", "J4")]:
+            self.assertTrue(new_game.fire_torpedo("first", first_target))
+            self.assertTrue(new_game.fire_torpedo("second", second_target))
+        lengths, blocked, hits = ShipGame_endgame.board_from_game(new_game, "first")
+        self.assertEqual(lengths, (3,))
+        self.assertEqual(blocked, 1 << 0 | 1 << 1 | 1 << 14)
+        self.assertEqual(hits, 1 << 22)
+        target = ShipGame_endgame.EndgameSolver().solve(lengths, blocked, hits)[1]
+        self.assertIn(target, [(2, 3), (4, 3), (3, 2), (3, 4)])
+
+    def test_ai_sinks_fleet(self):
+        new_game = ShipGame()
+        for placement in [(2, "A1", "R"), (4, "C3", "C"), (3, "E7", "C")]:
+            self.assertTrue(new_game.place_ship("second", *placement))
+        opponent = new_game.get_player("second")
+        sampler = ShipGame_ai.MonteCarloSampler(0, max_samples=100, seed=4)
+        ai = ShipGame_ai.MonteCarloTargetingAI([2, 4, 3], random.Random(4), sampler, ShipGame_endgame.EndgameSolver())
+        shots = 0
+        while opponent.get_ships() and shots < 100:
+            target = ai.choose_target()
+            hit_ship = opponent.receive_torpedo(opponent.get_player_grid().add_torpedo_hit(target))
+            ai.observe(target, hit_ship is not None, hit_ship if hit_ship and hit_ship.get_is_sunk() else None)
+            shots += 1
+        self.assertEqual(opponent.get_ships(), [])
+        self.assertLess(shots, 100)
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Contains unit tests for the benchmark suite."""
+
+    def test_benchmarks_run(self):
+        report = ShipGame_benchmarks.run_all(["fire_torpedo_win", "show_game_grid"], quick=True)
+        for result in report["results"].values():
+            self.assertGreater(result["ops_per_sec"], 0)
+            self.assertIn("blocks_per_op", result)
+        # The list of squares returned by add_ship_to_grid() is allocated by the operation but not kept by the grid
+        result = ShipGame_benchmarks.run_benchmark("add_ship_to_grid", num_ops=200, rounds=1)
+        self.assertGreater(result["blocks_per_op"], result["retained_blocks_per_op"] + 0.9)
+        self.assertGreater(result["peak_bytes_per_op"], 0)
+        self.assertEqual(ShipGame_benchmarks.compare(report, report), [
+            (name, result["ops_per_sec"], result["ops_per_sec"], 0.0, False)
+            for name, result in report["results"].items()])
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"fast": {"ops_per_sec": 100.0, "blocks_per_op": 1.0},
+                                "lean": {"ops_per_sec": 100.0, "blocks_per_op": 1.0}}}
+        current = {"results": {"fast": {"ops_per_sec": 80.0, "blocks_per_op": 1.0},
+                               "lean": {"ops_per_sec": 95.0, "blocks_per_op": 3.0}}}
+        self.assertEqual([row[4] for row in ShipGame_benchmarks.compare(baseline, current)], [True, True])
+        self.assertEqual([row[4] for row in ShipGame_benchmarks.compare(baseline, current, 0.25)], [False, True])
+
+
+class TestGameServer(unittest.TestCase):
+    """Contains unit tests for the asyncio session server."""
+
+    def test_handle_request(self):
+        server = ShipGame_server.GameServer()
+        game_id = server.handle_request({"op": "new_game"})["result"]
+        self.assertEqual(server.handle_request({"op": "place_ship", "game": game_id, "player": "first", "length": 2,
+                                                "coord": "A1", "orientation": "R", "id": 7}),
+                         {"id": 7, "ok": True, "result": True})
+        self.assertEqual(server.handle_request({"op": "fire_torpedo", "game": game_id, "player": "second",
+                                                "coord": "A1"})["result"], False)
+        self.assertEqual(server.handle_request({"op": "get_current_state", "game": game_id})["result"], "UNFINISHED")
+        self.assertFalse(server.handle_request({"op": "fire_torpedo", "game": game_id, "player": "first"})["ok"])
+        self.assertFalse(server.handle_request({"op": "get_current_state", "game": "nope"})["ok"])
+        self.assertEqual(server.handle_request({"op": "fire_torpedo", "game": [1], "player": "first",
+                                                "coord": "A1"}), {"ok": False, "error": "unknown game"})
+        self.assertFalse(server.handle_request({"op": "end_game", "game": {"id": 1}})["ok"])
+        # JSON true equals 1 in Python, so it must not create or name the game 1
+        self.assertEqual(server.handle_request({"op": "new_game", "game": True}),
+                         {"ok": False, "error": "invalid game id"})
+        self.assertTrue(server.handle_request({"op": "new_game", "game": 1})["ok"])
+        self.assertEqual(server.handle_request({"op": "get_current_state", "game": True}),
+                         {"ok": False, "error": "unknown game"})
+        self.assertEqual(server.handle_request({"op": "end_game", "game": False}),
+                         {"ok": False, "error": "unknown game"})
+        self.assertTrue(server.handle_request({"op": "end_game", "game": 1})["result"])
+        self.assertFalse(server.handle_request({"op": "launch", "game": game_id})["ok"])
+        self.assertTrue(server.handle_request({"op": "end_game", "game": game_id})["result"])
+        self.assertEqual(server.get_num_sessions(), 0)
+
+    def test_idle_sessions_are_evicted(self):
+        server = ShipGame_server.GameServer(idle_timeout=10.0)
+        old_game = server.handle_request({"op": "new_game"})["result"]
+        new_game = server.handle_request({"op": "new_game"})["result"]
+        server.handle_request({"op": "get_current_state", "game": old_game})
+        self.assertEqual(server.evict_idle_sessions(), 0)
+        self.assertEqual(server.evict_idle_sessions(now=ShipGame_server.time.monotonic() + 11), 2)
+        self.assertFalse(server.handle_request({"op": "get_current_state", "game": new_game})["ok"])
+
+    def test_tcp_session(self):
+        async def play():
+            server = ShipGame_server.GameServer()
+            port = await server.start_tcp()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for line in [b'{"op": "new_game"}', b'not json',
+                         b'{"op": "place_ship", "game": "1", "player": "second", "length": 2, "coord": "B2", '
+                         b'"orientation": "C"}',
+                         b'{"op": "fire_torpedo", "game": "1", "player": "first", "coord": "B2"}',
+                         b'{"op": "get_num_ships_remaining", "game": "1", "player": "second"}']:
+                writer.write(line + b"\n")
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"op": "get_current_state", "game": "' + b"1" * 100000 + b'"}\n')
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+            self.assertEqual(await reader.readline(), b"")
+            writer.close()
+            report = await ShipGame_server.run_load_test("127.0.0.1", port, num_sessions=6, connections=2)
+            await server.close()
+            return responses, report, server.get_num_sessions()
+
+        responses, report, sessions_left = asyncio.run(play())
+        self.assertEqual([response["ok"] for response in responses], [True, False, True, True, True, False])
+        self.assertEqual(responses[5]["error"], "line too long")
+        self.assertEqual(responses[4]["result"], 1)
+        self.assertGreater(report["requests"], 6 * 20)
+        self.assertEqual(sessions_left, 1)
+
+
+class TestCommandRunner(unittest.TestCase):
+    """Contains unit tests for the JSON lines command runner."""
+
+    def test_run_commands(self):
+        commands = [b'{"op": "new_game", "game": "g1"}\n', b'{"op": "new_game", "game": "g1"}\n', b'\n',
+                    b'{"op": "new_game"}\n',
+                    b'{"op": "place_ship", "game": "g1", "player": "second", "length": 2, "coord": "A1", '
+                    b'"orientation": "R"}\n',
+                    b'{"op": "fire_torpedo", "game": "g1", "player": "first", "coord": "A1"}\n',
+                    b'[1]\n',
+                    b'{"op": "get_current_state", "game": "g1", "id": 7}\n',
+                    b'{"op": "end_game", "game": "g1"}\n',
+                    b'{"op": "get_current_state", "game": "g1"}\n']
+        output = io.BytesIO()
+        server = ShipGame_server.GameServer()
+        self.assertEqual(ShipGame_runner.run_commands(commands, output, batch_size=3, server=server), 9)
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([response["ok"] for response in responses],
+                         [True, False, True, True, True, False, True, True, False])
+        self.assertEqual(responses[0]["result"], "g1")
+        self.assertEqual(responses[2]["result"], "1")
+        self.assertEqual(responses[6], {"id": 7, "ok": True, "result": "UNFINISHED"})
+        self.assertEqual(server.get_num_sessions(), 1)
+
+    def test_failing_request_does_not_stop_the_stream(self):
+        def failing_request(request):
+            if request.get("op") == "explode":
+                raise RuntimeError("boom")
+            return {"ok": True, "result": None}
+
+        server = ShipGame_server.GameServer()
+        server.handle_request = failing_request
+        output = io.BytesIO()
+        commands = [b'{"op": "new_game"}\n', b'{"op": "explode", "id": 3}\n', b'{"op": "new_game"}\n',
+                    b'{"op": "fire_torpedo", "game": [1], "player": "first", "coord": "A1"}\n']
+        self.assertEqual(ShipGame_runner.run_commands(commands, output, server=server), 4)
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(responses[1], {"id": 3, "ok": False, "error": "internal error: RuntimeError('boom')"})
+        self.assertEqual([response["ok"] for response in responses], [True, False, True, True])
+        output = io.BytesIO()
+        ShipGame_runner.run_commands(commands[3:], output)
+        self.assertEqual(json.loads(output.getvalue()), {"ok": False, "error": "unknown game"})
+
+    def test_main_with_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            commands_path = os.path.join(directory, "commands.jsonl")
+            output_path = os.path.join(directory, "output.jsonl")
+            with open(commands_path, "w") as commands_file:
+                for game_id in range(50):
+                    commands_file.write(json.dumps({"op": "new_game", "game": game_id}) + "\n")
+                    commands_file.write(json.dumps({"op": "get_num_ships_remaining", "game": game_id,
+                                                    "player": "first"}) + "\n")
+            ShipGame_runner.main([commands_path, "--output", output_path, "--batch-size", "7"])
+            with open(output_path) as output_file:
+                responses = [json.loads(line) for line in output_file]
+        self.assertEqual(responses[98:], [{"ok": True, "result": 49}, {"ok": True, "result": 0}])
+        self.assertEqual(len(responses), 100)
+
+
+class TestLockstepVerification(unittest.TestCase):
+    """Contains unit tests for the differential verification of the engines."""
+
+    def test_engines_agree(self):
+        for name, make_game in ShipGame_verify.ENGINES.items():
+            with self.subTest(engine=name):
+                self.assertIsNone(ShipGame_verify.verify(make_game, seed=2, num_streams=10, num_commands=300))
+
+    def test_shrinks_to_minimal_reproducer(self):
+        class OldSparseGameGrid(SparseGameGrid):
+            """SparseGameGrid as it was before it read columns with int(), which rejected "A1 "."""
+            __slots__ = ()
+
+            def _split_coord(self, coord):
+                row = coord.rstrip("0123456789")
+                return row, coord[len(row):]
+
+        result = ShipGame_verify.verify(lambda: ShipGame(OldSparseGameGrid), seed=0, num_streams=20)
+        self.assertIsNotNone(result)
+        commands = result["commands"]
+        self.assertIn("A1 ", repr(commands[-1]))
+        for index in range(len(commands)):
+            shorter = commands[:index] + commands[index + 1:]
+            self.assertIsNone(ShipGame_verify.find_mismatch(shorter, lambda: ShipGame(OldSparseGameGrid)))
+        self.assertNotEqual(result["reference"], result["candidate"])
+        self.assertIn("'A1 '", ShipGame_verify.format_reproducer(commands))
+        with self.assertRaises(ValueError):
+            ShipGame_verify.shrink([("fire_torpedo", "first", "A1")], lambda: ShipGame(OldSparseGameGrid))
+
+    def test_random_commands_are_reproducible(self):
+        commands = ShipGame_verify.random_commands(random.Random(5), 200)
+        self.assertEqual(commands, ShipGame_verify.random_commands(random.Random(5), 200))
+        self.assertEqual({command[0] for command in commands}, {"place_ship", "fire_torpedo", "fire_sequence"})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,270 @@
+# Description: Differential verification of the ShipGame engines. The same seeded stream of random commands is run in
+# lockstep on a reference game (ShipGame with the original list-of-lists GameGrid) and on a candidate engine, and
+# after every command the two games are compared: the return value or the type of exception raised, the game state,
+# the number of ships each player has left, and both players' boards. Command streams are weighted towards the edge
+# cases of the rules: coordinates such as "A10", "K1", "b03", out of range cell numbers and tuples, ships placed off
+# the edge or over other ships, invalid lengths and orientations, repeated shots at the same square, torpedoes fired
+# out of turn, and torpedoes fired after the game is over.
+#
+# When the engines disagree, the stream is shrunk to a minimal reproducer: commands are removed for as long as the
+# engines still disagree, so every command that is left is needed to show the difference.
+#
+# Usage:
+#   python ShipGame_verify.py [--engine bit|sparse|undo|instrumented|all] [--seed 0] [--streams 200] [--commands 400]
+
+import random
+
+from ShipGame import ShipGame, GameGrid, BitGameGrid, SparseGameGrid, coord_to_str, game_seed
+
+_PLAYERS = ("first", "second")
+# Coordinates that are not plain "A1" to "J10" squares, as strings, cell numbers, tuples, and other types
+_ODD_COORDS = ("A10", "J10", "K1", "A11", "A0", "J0", "a1", "b03", "B03", "A01", "", "A", "1A", "AA1", " A1", "A1 ",
+               -1, 0, 99, 100, (0, 1), (1, 0), (10, 10), (11, 1), (1, 11), (1,), None, [1, 1], True, 1.0, (1.0, 2))
+
+
+def _undo_game():
+    """A private function that creates a game with undo enabled, so every torpedo is recorded for undo.
+
+    Parameters: None
+
+    Returns: ShipGame object
+    """
+    game = ShipGame()
+    game.enable_undo()
+    return game
+
+
+def _instrumented_game():
+    """A private function that creates a game running ShipGame_instrumentation.InstrumentedShipGame.
+
+    Parameters: None
+
+    Returns: ShipGame object
+    """
+    game = ShipGame()
+    game.enable_instrumentation()
+    return game
+
+
+# Engines checked against the reference, by name: each is a function that creates a new, empty game
+ENGINES = {"bit": lambda: ShipGame(BitGameGrid),
+           "sparse": lambda: ShipGame(SparseGameGrid),
+           "undo": _undo_game,
+           "instrumented": _instrumented_game}
+
+
+def reference_game():
+    """Creates a new game of the reference engine, ShipGame with GameGrid boards.
+
+    Parameters: None
+
+    Returns: ShipGame object
+    """
+    return ShipGame(GameGrid)
+
+
+def _random_coord(rng):
+    """A private function that draws a target coordinate: mostly a square of the board, written in any of the forms
+    ShipGame accepts, and sometimes one of _ODD_COORDS. Squares are drawn from the top left half of the board more
+    often, so the same squares are fired at again and ships placed there are sunk.
+
+    Parameters: rng (random.Random)
+
+    Returns: coordinate (str, int, tuple, list, or None)
+    """
+    draw = rng.random()
+    if draw < 0.1:
+        return rng.choice(_ODD_COORDS)
+    row = rng.randint(1, 10) if draw < 0.5 else rng.randint(1, 5)
+    column = rng.randint(1, 10) if draw < 0.5 else rng.randint(1, 5)
+    form = rng.random()
+    if form < 0.7:
+        return coord_to_str(row, column)
+    if form < 0.85:
+        return (row - 1) * 10 + column - 1
+    return row, column
+
+
+def random_commands(rng, num_commands):
+    """Draws a stream of commands for one game. The first tenth of the stream, up to 16 commands, is mostly ship
+    placements; after that the players mostly take turns firing torpedoes, with torpedoes fired out of turn,
+    torpedo sequences, and late ship placements mixed in. Most of each player's torpedoes sweep the board in a
+    random order, so many games are won before the stream ends and the rest of the stream fires at a finished game.
+    Each command is a tuple naming a ShipGame method followed by its arguments:
+    ("place_ship", player, length, coord, orientation), ("fire_torpedo", player, coord), or
+    ("fire_sequence", [(player, coord), ...]).
+
+    Parameters: rng (random.Random); num_commands (int)
+
+    Returns: list of commands (tuples)
+    """
+    commands = []
+    turn = 0
+    sweeps = [rng.sample(range(100), 100), rng.sample(range(100), 100)]     # Squares for each player's sweep
+    swept = [0, 0]
+    opening = min(num_commands // 10, 16)
+    for index in range(num_commands):
+        draw = rng.random()
+        placing = 0.95 if index < opening else 0.005
+        if draw < placing:
+            player = rng.choice(_PLAYERS) if rng.random() < 0.98 else "third"
+            length = rng.randint(2, 5) if rng.random() < 0.9 else rng.choice((-1, 0, 1, 11, 12))
+            orientation = rng.choice("RC") if rng.random() < 0.95 else rng.choice(("r", "X", "", "RC"))
+            commands.append(("place_ship", player, length, _random_coord(rng), orientation))
+        elif draw < placing + 0.05:
+            moves = []
+            for _ in range(rng.randint(0, 6)):
+                moves.append((_PLAYERS[turn] if rng.random() < 0.8 else _PLAYERS[1 - turn], _random_coord(rng)))
+                turn = 1 - turn
+            commands.append(("fire_sequence", moves))
+        else:
+            # Players mostly fire in turn; turn only follows the stream, so it drifts from the game's actual turn
+            shooter = turn if rng.random() < 0.85 else 1 - turn
+            if rng.random() < 0.7:
+                cell = sweeps[shooter][swept[shooter] % 100]
+                swept[shooter] += 1
+                coord = coord_to_str(cell // 10 + 1, cell % 10 + 1)
+            else:
+                coord = _random_coord(rng)
+            commands.append(("fire_torpedo", _PLAYERS[shooter], coord))
+            turn = 1 - turn
+    return commands
+
+
+def apply_command(game, command):
+    """Runs one command on a game.
+
+    Parameters: game (ShipGame); command (tuple), as made by random_commands()
+
+    Returns: the value the method returned, or ("raised", exception type name) if it raised an exception
+    """
+    try:
+        return getattr(game, command[0])(*command[1:])
+    except Exception as error:
+        return "raised", type(error).__name__
+
+
+def observe(game):
+    """Returns everything about a game that the engines must agree on between commands. Each board is compared
+    both as the 2D list returned by GameGrid.get_grid() and as rendered by ShipGame.render_game_grid(), since
+    grids such as BitGameGrid build the two separately.
+
+    Parameters: game (ShipGame)
+
+    Returns: (game state, ships left for "first", ships left for "second", grid of "first", grid of "second",
+    rendered board of "first", rendered board of "second") tuple
+    """
+    # GameGrid.get_grid() returns the live board, so the rows are copied
+    grids = tuple([list(row) for row in game.get_player(player).get_player_grid().get_grid()] for player in _PLAYERS)
+    return (game.get_current_state(), game.get_num_ships_remaining("first"), game.get_num_ships_remaining("second"),
+            *grids, game.render_game_grid("first"), game.render_game_grid("second"))
+
+
+def find_mismatch(commands, make_candidate, make_reference=reference_game):
+    """Runs commands in lockstep on a new reference game and a new candidate game and compares them after every
+    command.
+
+    Parameters: commands (list of commands); make_candidate (function), creates the candidate game; make_reference
+    (function), creates the reference game
+
+    Returns: None if the games agree after every command, or (index of the first command after which they disagree
+    (int), (result, observation) of the reference, (result, observation) of the candidate) tuple
+    """
+    reference = make_reference()
+    candidate = make_candidate()
+    for index, command in enumerate(commands):
+        expected = (apply_command(reference, command), observe(reference))
+        actual = (apply_command(candidate, command), observe(candidate))
+        if expected != actual:
+            return index, expected, actual
+    return None
+
+
+def shrink(commands, make_candidate, make_reference=reference_game):
+    """Shrinks a stream on which the engines disagree to a minimal reproducer. The stream is first cut after the
+    first disagreement, then chunks of commands, halving in size down to single commands, are removed for as long
+    as the engines still disagree. No single command can be removed from the result.
+
+    Parameters: commands (list of commands), on which find_mismatch() finds a disagreement; make_candidate
+    (function); make_reference (function)
+
+    Returns: list of commands
+    """
+    mismatch = find_mismatch(commands, make_candidate, make_reference)
+    if mismatch is None:
+        raise ValueError("the engines agree on every command")
+    commands = list(commands[:mismatch[0] + 1])
+    chunk = max(len(commands) // 2, 1)
+    while True:
+        removed = False
+        start = 0
+        while start < len(commands):
+            trial = commands[:start] + commands[start + chunk:]
+            mismatch = find_mismatch(trial, make_candidate, make_reference) if trial else None
+            if mismatch is not None:
+                # Later commands cannot matter, so the trial is cut after its own first disagreement too
+                commands = trial[:mismatch[0] + 1]
+                removed = True
+            else:
+                start += chunk
+        if chunk == 1 and not removed:
+            return commands
+        if not removed:
+            chunk //= 2
+
+
+def format_reproducer(commands):
+    """Writes a stream of commands as Python statements on a game named game, for a bug report or a unit test.
+
+    Parameters: commands (list of commands)
+
+    Returns: str
+    """
+    return "\n".join(f"game.{command[0]}({', '.join(repr(argument) for argument in command[1:])})"
+                     for command in commands)
+
+
+def verify(make_candidate, seed=0, num_streams=200, num_commands=400, make_reference=reference_game):
+    """Runs num_streams random command streams in lockstep on the reference and the candidate engine. Stream number
+    n is drawn from random.Random(ShipGame.game_seed(seed, n)), with game_seed() from the ShipGame module, so any
+    stream can be drawn again on its own.
+
+    Parameters: make_candidate (function), creates a candidate game; seed (int); num_streams (int); num_commands
+    (int), commands per stream; make_reference (function), creates a reference game
+
+    Returns: None if the engines agree on every stream, or a dict describing the first disagreement: "stream" (int),
+    "commands" (the minimal reproducer from shrink()), "reference" and "candidate" ((result, observation) after the
+    last command of the reproducer)
+    """
+    for stream in range(num_streams):
+        commands = random_commands(random.Random(game_seed(seed, stream)), num_commands)
+        if find_mismatch(commands, make_candidate, make_reference) is None:
+            continue
+        reproducer = shrink(commands, make_candidate, make_reference)
+        _, expected, actual = find_mismatch(reproducer, make_candidate, make_reference)
+        return {"stream": stream, "commands": reproducer, "reference": expected, "candidate": actual}
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Check ShipGame engines against the reference engine.")
+    parser.add_argument("--engine", choices=sorted(ENGINES) + ["all"], default="all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--commands", type=int, default=400, help="commands per stream")
+    args = parser.parse_args()
+
+    for name in sorted(ENGINES) if args.engine == "all" else [args.engine]:
+        started = time.perf_counter()
+        result = verify(ENGINES[name], args.seed, args.streams, args.commands)
+        elapsed = time.perf_counter() - started
+        if result is None:
+            print(f"{name}: {args.streams * args.commands} commands agree with the reference ({elapsed:.1f} s)")
+            continue
+        print(f"{name}: disagrees with the reference on stream {result['stream']}, reproduced by:")
+        print(format_reproducer(result["commands"]))
+        print(f"    reference: {result['reference'][0]!r}, state {result['reference'][1][:3]}")
+        print(f"    {name}: {result['candidate'][0]!r}, state {result['candidate'][1][:3]}")